@@ -0,0 +1,72 @@
+# benchmarks/bench_batch_lookups.py
+"""
+Latency of looking up a batch of flights and reservations one query per ID, as the
+per-item endpoints do, against one `= ANY(%s)` query for the batch.
+
+Needs a seeded database (python db_infra/scripts/generator.py uselocaldb):
+
+    python benchmarks/bench_batch_lookups.py uselocaldb [iterations]
+"""
+import asyncio
+import sys
+
+from common import benchmark_dsn, report, Timer
+
+from psycopg import AsyncConnection
+from config import batch_lookup_max
+from src.db.statements import STATEMENTS
+
+ITERATIONS = int(next((arg for arg in sys.argv[1:] if arg.isdigit()), "500"))
+
+BATCH_SIZES = sorted({10, batch_lookup_max})
+
+
+async def sample_keys(conn, size):
+    async with conn.cursor() as cursor:
+        await cursor.execute("SELECT flight_number FROM Flights LIMIT %s", (size,))
+        flight_numbers = [row[0] for row in await cursor.fetchall()]
+        await cursor.execute("SELECT booking_id FROM Bookings LIMIT %s", (size,))
+        booking_ids = [row[0] for row in await cursor.fetchall()]
+    return {
+        ("flight_snapshot", "flight_snapshots"): flight_numbers,
+        ("flight_reservation", "flight_reservations"): booking_ids,
+    }
+
+
+async def run_per_item(conn, name, keys):
+    samples = []
+    async with conn.cursor() as cursor:
+        for _ in range(ITERATIONS):
+            with Timer() as timer:
+                for key in keys:
+                    await cursor.execute(STATEMENTS[name], (key,), prepare=True)
+                    await cursor.fetchone()
+            samples.append(timer.elapsed)
+    return samples
+
+
+async def run_batch(conn, name, keys):
+    samples = []
+    async with conn.cursor() as cursor:
+        for _ in range(ITERATIONS):
+            with Timer() as timer:
+                await cursor.execute(STATEMENTS[name], (keys,), prepare=True)
+                await cursor.fetchall()
+            samples.append(timer.elapsed)
+    return samples
+
+
+async def main():
+    # autocommit so every call is one round trip, like a pooled read
+    conn = await AsyncConnection.connect(benchmark_dsn(), autocommit=True, prepare_threshold=None)
+    try:
+        for size in BATCH_SIZES:
+            for (single, batch), keys in (await sample_keys(conn, size)).items():
+                report(f"{single} x{len(keys)} (one query per ID)", await run_per_item(conn, single, keys))
+                report(f"{batch} x{len(keys)} (= ANY)", await run_batch(conn, batch, keys))
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
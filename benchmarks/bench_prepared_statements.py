@@ -0,0 +1,56 @@
+# benchmarks/bench_prepared_statements.py
+"""
+Per-call latency of the hot model queries with and without server-side prepared statements.
+
+Needs a seeded database (python db_infra/scripts/generator.py uselocaldb):
+
+    python benchmarks/bench_prepared_statements.py uselocaldb [iterations]
+"""
+import asyncio
+import sys
+
+from common import benchmark_dsn, report, Timer
+
+from psycopg import AsyncConnection
+from src.db.statements import STATEMENTS
+
+ITERATIONS = int(next((arg for arg in sys.argv[1:] if arg.isdigit()), "2000"))
+
+
+async def sample_keys(conn):
+    async with conn.cursor() as cursor:
+        await cursor.execute("SELECT booking_id FROM Boarding_Passes LIMIT 1")
+        booking_id = (await cursor.fetchone())[0]
+        await cursor.execute("SELECT flight_number FROM Flights LIMIT 1")
+        flight_number = (await cursor.fetchone())[0]
+    return {
+        "boarding_pass": (booking_id,),
+        "flight_reservation": (booking_id,),
+        "flight_status": (flight_number,),
+    }
+
+
+async def run(conn, name, params, prepare):
+    samples = []
+    async with conn.cursor() as cursor:
+        for _ in range(ITERATIONS):
+            with Timer() as timer:
+                await cursor.execute(STATEMENTS[name], params, prepare=prepare)
+                await cursor.fetchone()
+            samples.append(timer.elapsed)
+    return samples
+
+
+async def main():
+    # autocommit so every call is one round trip, like a pooled read
+    conn = await AsyncConnection.connect(benchmark_dsn(), autocommit=True, prepare_threshold=None)
+    try:
+        for name, params in (await sample_keys(conn)).items():
+            report(f"{name} (text protocol)", await run(conn, name, params, prepare=False))
+            report(f"{name} (prepared)", await run(conn, name, params, prepare=True))
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
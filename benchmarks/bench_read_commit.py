@@ -0,0 +1,65 @@
+# benchmarks/bench_read_commit.py
+"""
+Latency of a lookup in an implicit transaction ended by COMMIT (the old read handlers)
+versus an autocommit read connection (get_read_connection), under concurrency.
+
+Needs a seeded database (python db_infra/scripts/generator.py uselocaldb):
+
+    python benchmarks/bench_read_commit.py uselocaldb [concurrency]
+"""
+import asyncio
+import sys
+
+from common import benchmark_dsn, report, Timer
+
+from psycopg_pool import AsyncConnectionPool
+from src.db.connection import autocommit
+from src.db.statements import STATEMENTS
+
+CONCURRENCY = int(next((arg for arg in sys.argv[1:] if arg.isdigit()), "32"))
+REQUESTS_PER_WORKER = 200
+
+
+async def with_commit(pool, flight_number):
+    async with pool.connection() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(STATEMENTS["flight_status"], (flight_number,))
+            await cursor.fetchone()
+        await conn.commit()
+
+
+async def with_autocommit(pool, flight_number):
+    async with pool.connection() as conn:
+        async with autocommit(conn):
+            async with conn.cursor() as cursor:
+                await cursor.execute(STATEMENTS["flight_status"], (flight_number,))
+                await cursor.fetchone()
+
+
+async def run(pool, request, flight_number):
+    samples = []
+
+    async def worker():
+        for _ in range(REQUESTS_PER_WORKER):
+            with Timer() as timer:
+                await request(pool, flight_number)
+            samples.append(timer.elapsed)
+
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    return samples
+
+
+async def main():
+    async with AsyncConnectionPool(benchmark_dsn(), min_size=20, max_size=20, open=False) as pool:
+        await pool.wait()
+        async with pool.connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute("SELECT flight_number FROM Flights LIMIT 1")
+                flight_number = (await cursor.fetchone())[0]
+        for label, request in (("SELECT + COMMIT", with_commit), ("autocommit SELECT", with_autocommit)):
+            await run(pool, request, flight_number)  # warm up
+            report(f"{label} x{CONCURRENCY} concurrent", await run(pool, request, flight_number))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
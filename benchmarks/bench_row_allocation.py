@@ -0,0 +1,75 @@
+# benchmarks/bench_row_allocation.py
+"""
+Memory and time to fetch a large search result: plain tuples turned into dicts (how
+search_flights_data built its rows) against FlightRow records made by the row factory
+(src/db/records.py). The rows come from generate_series, so any Postgres will do:
+
+    python benchmarks/bench_row_allocation.py uselocaldb [rows]
+"""
+import asyncio
+import sys
+import tracemalloc
+
+from common import benchmark_dsn, report, Timer
+
+from psycopg import AsyncConnection
+from src.db.records import FlightRow, fetchall
+
+ROWS = int(next((arg for arg in sys.argv[1:] if arg.isdigit()), "100000"))
+ITERATIONS = 20
+
+# Same columns and types as the search_flights statement
+QUERY = """
+    SELECT 'FL' || lpad(i::text, 6, '0'), 'SYD'::varchar, 'MEL'::varchar,
+           timestamp '2025-06-08 00:00' + i * interval '1 minute', 250.00::numeric(10, 2), 42
+    FROM generate_series(1, %s) i
+"""
+
+
+async def as_dicts(cursor):
+    await cursor.execute(QUERY, (ROWS,))
+    rows = await cursor.fetchall()
+    return [{"flight_number": row[0], "departure": row[1], "destination": row[2], "departure_time": row[3],
+             "price": row[4], "availability": row[5]} for row in rows]
+
+
+async def as_records(cursor):
+    await cursor.execute(QUERY, (ROWS,))
+    return await fetchall(cursor, FlightRow)
+
+
+async def allocation(cursor, fetch):
+    tracemalloc.start()
+    try:
+        result = await fetch(cursor)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return retained, peak
+
+
+async def run(cursor, fetch):
+    samples = []
+    for _ in range(ITERATIONS):
+        with Timer() as timer:
+            await fetch(cursor)
+        samples.append(timer.elapsed)
+    return samples
+
+
+async def main():
+    conn = await AsyncConnection.connect(benchmark_dsn(), autocommit=True)
+    try:
+        async with conn.cursor() as cursor:
+            for label, fetch in (("tuples + dicts", as_dicts), ("FlightRow records", as_records)):
+                retained, peak = await allocation(cursor, fetch)
+                print(f"{label:<40} rows={ROWS:<8} retained={retained / 2**20:8.1f}MiB "
+                      f"peak={peak / 2**20:8.1f}MiB ({retained / ROWS:.0f} bytes/row)")
+                report(f"{label} (fetch time)", await run(cursor, fetch))
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+# benchmarks/bench_serialization.py
+"""
+Cost of turning a handler's return value into response bytes, per endpoint: the old path
+(jsonable_encoder, then the stdlib json JSONResponse) against the response model and
+FastJSONResponse (src/api/schemas.py, src/api/responses.py). No database needed:
+
+    python benchmarks/bench_serialization.py [iterations]
+"""
+import asyncio
+import sys
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from common import report, Timer
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from src.api.main import app
+
+ITERATIONS = int(next((arg for arg in sys.argv[1:] if arg.isdigit()), "2000"))
+
+DEPARTURE = datetime(2025, 6, 8, 9, 0)
+ARRIVAL = DEPARTURE + timedelta(hours=1, minutes=30)
+
+
+def flights(count):
+    return [{"flight_number": f"FL{i:06d}", "departure": "SYD", "destination": "MEL",
+             "departure_time": DEPARTURE + timedelta(minutes=i), "price": Decimal("250.00"), "availability": 42}
+            for i in range(count)]
+
+
+def offers(count):
+    return [{"offer_id": f"O{i:06d}", "description": "Early bird", "price": Decimal("199.99"), "discount": "10%"}
+            for i in range(count)]
+
+
+SAMPLES = {
+    "/api/v1/flight-status/{flight_number}": {
+        "status": "success",
+        "flight_status": {"departure": "SYD", "destination": "MEL", "status": "On Time",
+                          "departure_time": DEPARTURE, "arrival_time": ARRIVAL, "gate": "A1"},
+    },
+    "/api/v1/flight-reservation/{booking_id}": {
+        "status": "success",
+        "reservation": {"passenger_id": "P000042", "flight_number": "FL000042", "booking_date": date(2025, 6, 3),
+                        "status": "Confirmed", "total_price": Decimal("250.00"), "departure": "SYD",
+                        "destination": "MEL"},
+    },
+    "/api/v1/search-flight/{departure}/{destination}/{date}": {
+        "status": "success", "flights": flights(50), "next_cursor": "WyIyMDI1LTA2LTA4VDA5OjQ5OjAwIiwiRkwwMDAwNDkiXQ",
+    },
+    "/api/v1/flight-offers/": {"status": "success", "offers": offers(50), "next_cursor": None},
+    "/api/v1/trip-details/{trip_id}": {
+        "status": "success",
+        "trip_details": {"total_price": Decimal("500.00"), "status": "Confirmed",
+                         "components": [{"component_type": "Flight", "flight_number": "FL000042",
+                                         "price": Decimal("250.00")}] * 2},
+    },
+    "/api/v1/search-trip/{departure}/{destination}/{date}": {
+        "status": "success", "next_cursor": None,
+        "trips": [{"trip_id": f"T{i:07d}", "total_price": Decimal("500.00"),
+                   "departure_time": DEPARTURE + timedelta(minutes=i)} for i in range(50)],
+    },
+}
+
+
+def run_old(content):
+    samples = []
+    for _ in range(ITERATIONS):
+        with Timer() as timer:
+            JSONResponse(jsonable_encoder(content)).body
+        samples.append(timer.elapsed)
+    return samples
+
+
+async def run_new(field, response_class, content):
+    samples = []
+    for _ in range(ITERATIONS):
+        with Timer() as timer:
+            response_class(await serialize_response(field=field, response_content=content)).body
+        samples.append(timer.elapsed)
+    return samples
+
+
+async def main():
+    routes = {route.path: route for route in app.routes if getattr(route, "path", None) in SAMPLES}
+    for path, content in SAMPLES.items():
+        route = routes[path]
+        report(f"{path} (jsonable_encoder + json)", run_old(content))
+        report(f"{path} (model + orjson)", await run_new(route.response_field, route.response_class, content))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,42 @@
+# benchmarks/common.py
+import os
+import statistics
+import sys
+import time
+
+# Add the repository root to the Python path to find config.py and src/
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import *
+
+if "uselocaldb" in sys.argv:  # same convention as db_infra/scripts
+    os.environ[const_fieldname_db_host] = const_localhost
+    os.environ[const_fieldname_db_user] = const_db_user
+    os.environ[const_fieldname_db_pass] = const_db_pass
+
+
+def benchmark_dsn() -> str:
+    from src.db.connection import make_dsn
+    return make_dsn(os.getenv(const_fieldname_db_host, db_host), os.getenv(const_fieldname_db_port, db_port))
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def report(label: str, samples_seconds):
+    """Print mean/p50/p99 of per-call latencies given in seconds."""
+    ms = [s * 1000 for s in samples_seconds]
+    print(f"{label:<40} n={len(ms):<6} mean={statistics.mean(ms):8.3f}ms "
+          f"p50={percentile(ms, 50):8.3f}ms p99={percentile(ms, 99):8.3f}ms")
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
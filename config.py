@@ -1,4 +1,5 @@
 # config.py
+import json
 import os
 
 #constant
@@ -56,3 +57,153 @@ db_testname = os.getenv("db_testname", "test_hopjetairline_db")
 aws_region = os.getenv(const_fieldname_aws_region, "us-east-1")
 
 
+
+# Database pool sizing (see src/db/pool_controller.py)
+const_fieldname_db_pool_min_size = "db_pool_min_size"
+const_fieldname_db_pool_max_size = "db_pool_max_size"
+const_fieldname_db_pool_timeout = "db_pool_timeout"
+const_fieldname_db_pool_max_idle = "db_pool_max_idle"
+const_fieldname_db_workers = "db_workers"
+const_fieldname_db_tasks = "db_tasks"
+const_fieldname_db_reserved_connections = "db_reserved_connections"
+const_fieldname_db_pool_tune_interval = "db_pool_tune_interval"
+const_fieldname_db_pool_wait_threshold_ms = "db_pool_wait_threshold_ms"
+
+db_pool_min_size = int(os.getenv(const_fieldname_db_pool_min_size, "2"))
+db_pool_max_size = int(os.getenv(const_fieldname_db_pool_max_size, "20"))
+db_pool_timeout = float(os.getenv(const_fieldname_db_pool_timeout, "30"))
+db_pool_max_idle = float(os.getenv(const_fieldname_db_pool_max_idle, "120"))
+# uvicorn workers per task (WEB_CONCURRENCY is what uvicorn itself reads) and ECS tasks in the service;
+# together they decide how many pools share the server's max_connections
+db_workers = int(os.getenv(const_fieldname_db_workers, os.getenv("WEB_CONCURRENCY", "1")))
+db_tasks = int(os.getenv(const_fieldname_db_tasks, "1"))
+# connections kept free on the server for admin sessions, migrations and the data scripts
+db_reserved_connections = int(os.getenv(const_fieldname_db_reserved_connections, "10"))
+db_pool_tune_interval = float(os.getenv(const_fieldname_db_pool_tune_interval, "5"))
+db_pool_wait_threshold_ms = float(os.getenv(const_fieldname_db_pool_wait_threshold_ms, "50"))
+
+# Read replicas: comma separated host or host:port list, same database and credentials as the primary
+const_fieldname_db_replica_hosts = "db_replica_hosts"
+const_fieldname_db_replica_pool_max_size = "db_replica_pool_max_size"
+const_fieldname_db_replica_timeout = "db_replica_timeout"
+const_fieldname_db_replica_retry_after = "db_replica_retry_after"
+
+db_replica_hosts = [host.strip() for host in os.getenv(const_fieldname_db_replica_hosts, "").split(",") if host.strip()]
+db_replica_pool_max_size = int(os.getenv(const_fieldname_db_replica_pool_max_size, "20"))
+# how long a read waits for a replica connection before falling back to the primary
+db_replica_timeout = float(os.getenv(const_fieldname_db_replica_timeout, "2"))
+# how long a failed replica is skipped before it is tried again
+db_replica_retry_after = float(os.getenv(const_fieldname_db_replica_retry_after, "30"))
+
+# Server-side prepared statements (src/db/statements.py); turn off behind PgBouncer in transaction mode
+const_fieldname_db_prepared_statements = "db_prepared_statements"
+db_prepared_statements = os.getenv(const_fieldname_db_prepared_statements, "True").lower() == "true"
+
+# Admission control (src/db/admission.py): fail fast with 503 + Retry-After when the pool is saturated
+const_fieldname_db_max_waiting = "db_max_waiting"
+const_fieldname_db_acquire_deadline = "db_acquire_deadline"
+const_fieldname_db_route_acquire_deadlines = "db_route_acquire_deadlines"
+const_fieldname_db_critical_routes = "db_critical_routes"
+const_fieldname_db_critical_acquire_deadline = "db_critical_acquire_deadline"
+const_fieldname_db_reserved_for_critical = "db_reserved_for_critical"
+const_fieldname_db_retry_after = "db_retry_after"
+
+# requests allowed to queue for a primary connection before new ones are turned away
+db_max_waiting = int(os.getenv(const_fieldname_db_max_waiting, "50"))
+db_acquire_deadline = float(os.getenv(const_fieldname_db_acquire_deadline, "1.0"))
+# per-route overrides keyed by route template, e.g. {"/api/v1/search-flight/{departure}/{destination}/{date}": 2.0}
+db_route_acquire_deadlines = json.loads(os.getenv(const_fieldname_db_route_acquire_deadlines, "{}"))
+db_critical_routes = [route.strip() for route in os.getenv(
+    const_fieldname_db_critical_routes, "/api/v1/book-flight/,/api/v1/check-in/{booking_id}").split(",") if route.strip()]
+db_critical_acquire_deadline = float(os.getenv(const_fieldname_db_critical_acquire_deadline, "5.0"))
+# primary connections only critical routes may take
+db_reserved_for_critical = int(os.getenv(const_fieldname_db_reserved_for_critical, "2"))
+db_retry_after = int(os.getenv(const_fieldname_db_retry_after, "1"))
+
+# Secrets (src/utils/secretload.py): aws, env or file:<path to json>; defaults to env in nonprod, aws otherwise
+const_fieldname_secrets_backend = "secrets_backend"
+const_fieldname_secrets_ttl = "secrets_ttl"
+
+secrets_ttl = float(os.getenv(const_fieldname_secrets_ttl, "300"))
+
+# LISTEN/NOTIFY cache invalidation (src/db/listener.py); caches stay off when this is disabled
+const_fieldname_db_listen_notifications = "db_listen_notifications"
+db_listen_notifications = os.getenv(const_fieldname_db_listen_notifications, "True").lower() == "true"
+
+# Offer cache (src/db/cache.py): NOTIFY offers_changed drops it on change; the TTL bounds
+# staleness when that trigger from db_infra/scripts/migrations isn't installed
+const_fieldname_offer_cache_ttl = "offer_cache_ttl"
+offer_cache_ttl = float(os.getenv(const_fieldname_offer_cache_ttl, "60"))
+
+# Flight snapshot cache (src/db/cache.py)
+const_fieldname_flight_snapshot_cache_size = "flight_snapshot_cache_size"
+const_fieldname_flight_snapshot_cache_ttl = "flight_snapshot_cache_ttl"
+
+flight_snapshot_cache_size = int(os.getenv(const_fieldname_flight_snapshot_cache_size, "10000"))
+flight_snapshot_cache_ttl = float(os.getenv(const_fieldname_flight_snapshot_cache_ttl, "5"))
+
+# Booking overview cache (src/db/cache.py)
+const_fieldname_booking_overview_cache_size = "booking_overview_cache_size"
+const_fieldname_booking_overview_cache_ttl = "booking_overview_cache_ttl"
+
+booking_overview_cache_size = int(os.getenv(const_fieldname_booking_overview_cache_size, "10000"))
+booking_overview_cache_ttl = float(os.getenv(const_fieldname_booking_overview_cache_ttl, "5"))
+
+# Share one query between identical concurrent reads (src/db/coalesce.py)
+const_fieldname_db_coalesce_reads = "db_coalesce_reads"
+db_coalesce_reads = os.getenv(const_fieldname_db_coalesce_reads, "True").lower() == "true"
+
+# Negative cache for lookups of IDs that don't exist (src/db/cache.py)
+const_fieldname_not_found_cache_size = "not_found_cache_size"
+const_fieldname_not_found_cache_ttl = "not_found_cache_ttl"
+
+not_found_cache_size = int(os.getenv(const_fieldname_not_found_cache_size, "10000"))
+not_found_cache_ttl = float(os.getenv(const_fieldname_not_found_cache_ttl, "5"))
+
+# In-process route index for flight searches (src/db/route_index.py); needs the
+# flights_changed trigger from db_infra/scripts/migrations and the notification listener
+const_fieldname_route_index_enabled = "route_index_enabled"
+const_fieldname_route_index_verify_interval = "route_index_verify_interval"
+
+route_index_enabled = os.getenv(const_fieldname_route_index_enabled, "False").lower() == "true"
+route_index_verify_interval = float(os.getenv(const_fieldname_route_index_verify_interval, "0"))
+
+# Booking, trip and insurance IDs (src/db/ids.py): numbers leased from id_block_seq this many at a time
+const_fieldname_id_block_size = "id_block_size"
+id_block_size = int(os.getenv(const_fieldname_id_block_size, "1000"))
+
+# Idempotency-Key stored responses (src/api/idempotency.py), kept this many seconds;
+# each worker purges expired ones every idempotency_purge_interval seconds (0 turns that off)
+const_fieldname_idempotency_key_ttl = "idempotency_key_ttl"
+const_fieldname_idempotency_purge_interval = "idempotency_purge_interval"
+const_fieldname_idempotency_purge_batch = "idempotency_purge_batch"
+
+idempotency_key_ttl = float(os.getenv(const_fieldname_idempotency_key_ttl, "86400"))
+idempotency_purge_interval = float(os.getenv(const_fieldname_idempotency_purge_interval, "300"))
+idempotency_purge_batch = int(os.getenv(const_fieldname_idempotency_purge_batch, "1000"))
+
+# Keyset pagination for search and offer endpoints (src/api/pagination.py): page size used
+# when a request gives no limit, and the most rows one page may hold whatever it asks for
+const_fieldname_page_size_default = "page_size_default"
+const_fieldname_page_size_max = "page_size_max"
+
+page_size_default = int(os.getenv(const_fieldname_page_size_default, "50"))
+page_size_max = int(os.getenv(const_fieldname_page_size_max, "200"))
+
+# NDJSON streaming search endpoints (src/api/streaming.py): rows fetched from the server-side cursor per batch
+const_fieldname_stream_batch_size = "stream_batch_size"
+stream_batch_size = int(os.getenv(const_fieldname_stream_batch_size, "500"))
+
+# Batch lookup endpoints (/api/v1/batch/...): most IDs one request may ask for
+const_fieldname_batch_lookup_max = "batch_lookup_max"
+batch_lookup_max = int(os.getenv(const_fieldname_batch_lookup_max, "50"))
+
+# Tool batch endpoint (src/api/batch.py): most operations one batch may hold, how many of
+# them run at once (each may hold a pooled connection), and the deadline in seconds for the lot
+const_fieldname_batch_max_operations = "batch_max_operations"
+const_fieldname_batch_concurrency = "batch_concurrency"
+const_fieldname_batch_deadline = "batch_deadline"
+
+batch_max_operations = int(os.getenv(const_fieldname_batch_max_operations, "20"))
+batch_concurrency = int(os.getenv(const_fieldname_batch_concurrency, "4"))
+batch_deadline = float(os.getenv(const_fieldname_batch_deadline, "10"))
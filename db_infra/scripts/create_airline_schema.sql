@@ -39,7 +39,7 @@ CREATE TABLE Bookings (
 
 -- Boarding_Passes Table: Stores boarding pass details
 CREATE TABLE Boarding_Passes (
-    boarding_pass_id VARCHAR(10) PRIMARY KEY,
+    boarding_pass_id VARCHAR(24) PRIMARY KEY, -- 'BP' || boarding_pass_id_seq, see migrations/004
     booking_id VARCHAR(10) NOT NULL,
     gate VARCHAR(10),
     seat VARCHAR(5),
@@ -49,6 +49,11 @@ CREATE TABLE Boarding_Passes (
     FOREIGN KEY (booking_id) REFERENCES Bookings(booking_id)
 );
 
+CREATE SEQUENCE boarding_pass_id_seq AS BIGINT OWNED BY Boarding_Passes.boarding_pass_id;
+
+-- Blocks of booking, trip and insurance IDs, see migrations/005 and src/db/ids.py
+CREATE SEQUENCE id_block_seq AS BIGINT;
+
 -- Trips Table: Stores trip details (e.g., flight + hotel packages)
 CREATE TABLE Trips (
     trip_id VARCHAR(10) PRIMARY KEY,
@@ -117,10 +122,26 @@ CREATE TABLE Offers (
     FOREIGN KEY (trip_id) REFERENCES Trips(trip_id)
 );
 
+-- Idempotency_Keys Table: Stored responses for retried POSTs, see migrations/006
+CREATE TABLE Idempotency_Keys (
+    idempotency_key VARCHAR(255) PRIMARY KEY,
+    request TEXT NOT NULL,
+    status_code INTEGER,
+    response JSONB,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Indexes for frequent queries
 CREATE INDEX idx_bookings_passenger_id ON Bookings(passenger_id);
 CREATE INDEX idx_bookings_flight_number ON Bookings(flight_number);
 CREATE INDEX idx_trips_passenger_id ON Trips(passenger_id);
-CREATE INDEX idx_seats_booking_id ON Seats(booking_id);
+CREATE INDEX idx_seats_booking_seat ON Seats(booking_id, seat_number);
 CREATE INDEX idx_insurance_booking_id ON Insurance(booking_id);
-CREATE INDEX idx_offers_flight_number ON Offers(flight_number);
\ No newline at end of file
+CREATE INDEX idx_offers_flight_number ON Offers(flight_number);
+CREATE INDEX idx_flights_route_departure_number ON Flights(departure, destination, departure_time, flight_number);
+CREATE INDEX idx_boarding_passes_booking_id ON Boarding_Passes(booking_id);
+CREATE INDEX idx_trip_components_trip_id ON Trip_Components(trip_id);
+CREATE INDEX idx_trip_components_flight_number ON Trip_Components(flight_number);
+CREATE INDEX idx_insurance_trip_id ON Insurance(trip_id);
+CREATE INDEX idx_offers_type_id ON Offers(offer_type, offer_id);
+CREATE INDEX idx_idempotency_keys_created_at ON Idempotency_Keys(created_at);
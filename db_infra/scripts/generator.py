@@ -2,6 +2,7 @@
 from datetime import datetime, timedelta
 from faker import Faker
 import random
+import re
 import psycopg2
 import os
 import sys
@@ -92,10 +93,10 @@ class DataGenerator:
         self.offer_types = ["Flight", "Trip"]
 
     def apply_schema_if_needed(self, schema_file="db_infra/scripts/create_airline_schema.sql"):
-        """Apply the schema only for missing tables and indexes."""
+        """Apply the schema only for missing tables, sequences and indexes."""
         print(f"Starting schema application at {datetime.now().strftime('%H:%M:%S')}")
         required_tables = ['passengers', 'flights', 'bookings', 'boarding_passes', 'trips', 
-                          'trip_components', 'seats', 'insurance', 'offers']
+                          'trip_components', 'seats', 'insurance', 'offers', 'idempotency_keys']
         existing_tables = []
         self.cursor.execute("""
             SELECT table_name 
@@ -124,12 +125,24 @@ class DataGenerator:
                         else:
                             print(f"Schema for table {table_match} already exists at {datetime.now().strftime('%H:%M:%S')}")
 
+            # Apply sequences (boarding pass and ID block numbers), checking for existence
+            for statement in statements:
+                statement = statement.strip()
+                match = re.search(r'CREATE SEQUENCE (\w+)', statement, re.IGNORECASE)
+                if match:
+                    sequence_name = match.group(1).lower()
+                    self.cursor.execute("SELECT 1 FROM pg_sequences WHERE schemaname = 'public' AND sequencename = %s", (sequence_name,))
+                    if not self.cursor.fetchone():
+                        print(f"Creating sequence {sequence_name} at {datetime.now().strftime('%H:%M:%S')}")
+                        self.cursor.execute(statement)
+                    else:
+                        print(f"Sequence {sequence_name} already exists at {datetime.now().strftime('%H:%M:%S')}")
+
             # Apply indexes separately, checking for existence
             for statement in statements:
                 statement = statement.strip()
                 if statement and "CREATE INDEX" in statement.upper():
                     # Extract the index name (e.g., idx_bookings_passenger_id)
-                    import re
                     match = re.search(r'CREATE INDEX (\w+)', statement)
                     if match:
                         index_name = match.group(1)
@@ -269,6 +282,8 @@ class DataGenerator:
                 "INSERT INTO Boarding_Passes (boarding_pass_id, booking_id, gate, seat, boarding_time, pdf_url) VALUES (%s, %s, %s, %s, %s, %s)",
                 (boarding_pass_id, booking_id, gate, seat, boarding_time, pdf_url)
             )
+        # Check-in numbers its boarding passes from boarding_pass_id_seq: continue after these
+        self.cursor.execute("SELECT setval('boarding_pass_id_seq', %s)", (len(bookings),))
 
     def generate_trips(self, count=100, passengers=None):
         """Generate a specified number of trip records."""
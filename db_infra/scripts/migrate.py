@@ -0,0 +1,69 @@
+# db_infra/scripts/migrate.py
+import psycopg2
+import os
+import sys
+from datetime import datetime
+
+# Add the parent directory to the Python path to find config.py
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from config import *
+from src.utils.secretload import get_secret
+
+if len(sys.argv) > 1:  # than it is assumed it for localhost
+    os.environ[const_fieldname_db_host] = const_localhost  # "localhost"
+
+    os.environ[const_fieldname_db_user] = const_db_user  # "hopjetair"  # user for the database
+    os.environ[const_fieldname_db_pass] = const_db_pass  # "SecurePass123!"  # password for the databaser
+else:
+    os.environ[const_fieldname_db_host] = const_cloudhost
+    get_secret(const_db_credentials_name)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+
+def pending_migrations(cursor):
+    """Migration files (NNN_name.sql, applied in name order) not yet recorded in schema_migrations."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            name VARCHAR(255) PRIMARY KEY,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("SELECT name FROM schema_migrations")
+    applied = {row[0] for row in cursor.fetchall()}
+    return [name for name in sorted(os.listdir(MIGRATIONS_DIR)) if name.endswith(".sql") and name not in applied]
+
+
+def apply_migrations():
+    print(f"Starting migrations at {datetime.now().strftime('%H:%M:%S')}")
+    print(f"host : {os.getenv(const_fieldname_db_host)}")
+    conn = psycopg2.connect(
+        host=os.getenv(const_fieldname_db_host, db_host),
+        port=os.getenv(const_fieldname_db_port, db_port),
+        database=os.getenv(const_fieldname_db_name, db_name),
+        user=os.getenv(const_fieldname_db_user, db_user),
+        password=os.getenv(const_fieldname_db_pass, db_pass)
+    )
+    try:
+        cursor = conn.cursor()
+        for name in pending_migrations(cursor):
+            print(f"Applying {name} at {datetime.now().strftime('%H:%M:%S')}")
+            with open(os.path.join(MIGRATIONS_DIR, name), "r") as file:
+                # Each file runs as a whole (it may contain function bodies), in its own transaction
+                cursor.execute(file.read())
+            cursor.execute("INSERT INTO schema_migrations (name) VALUES (%s)", (name,))
+            conn.commit()
+            print(f"Finished {name} at {datetime.now().strftime('%H:%M:%S')}")
+        cursor.close()
+    except psycopg2.Error as e:
+        conn.rollback()
+        print(f"Error applying migrations at {datetime.now().strftime('%H:%M:%S')}: {e}")
+        raise
+    finally:
+        conn.close()
+    print(f"Finished migrations at {datetime.now().strftime('%H:%M:%S')}")
+
+
+if __name__ == "__main__":
+    apply_migrations()
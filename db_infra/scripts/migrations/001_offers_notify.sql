@@ -0,0 +1,13 @@
+-- Announce every change to Offers so the API workers drop their in-process offer cache.
+-- Statement level: offers change rarely and the cache reloads whole lists anyway.
+CREATE OR REPLACE FUNCTION notify_offers_changed() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('offers_changed', TG_OP);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS offers_changed ON Offers;
+CREATE TRIGGER offers_changed
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON Offers
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_offers_changed();
@@ -0,0 +1,36 @@
+-- Announce every change to Flights with the changed row, so the API workers can keep
+-- their route index current and drop cached flight snapshots without a query.
+-- Row level: availability changes with every booking and each one is applied on its own.
+CREATE OR REPLACE FUNCTION notify_flights_changed() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        PERFORM pg_notify('flights_changed', json_build_object('op', TG_OP)::text);
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('flights_changed', json_build_object('op', TG_OP, 'flight_number', OLD.flight_number)::text);
+    ELSE
+        IF TG_OP = 'UPDATE' AND OLD.flight_number <> NEW.flight_number THEN
+            PERFORM pg_notify('flights_changed', json_build_object('op', 'DELETE', 'flight_number', OLD.flight_number)::text);
+        END IF;
+        PERFORM pg_notify('flights_changed', json_build_object(
+            'op', TG_OP,
+            'flight_number', NEW.flight_number,
+            'departure', NEW.departure,
+            'destination', NEW.destination,
+            'departure_time', to_char(NEW.departure_time, 'YYYY-MM-DD"T"HH24:MI:SS.US'),
+            'price', NEW.price,
+            'availability', NEW.availability
+        )::text);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS flights_changed ON Flights;
+CREATE TRIGGER flights_changed
+    AFTER INSERT OR UPDATE OR DELETE ON Flights
+    FOR EACH ROW EXECUTE FUNCTION notify_flights_changed();
+
+DROP TRIGGER IF EXISTS flights_truncated ON Flights;
+CREATE TRIGGER flights_truncated
+    AFTER TRUNCATE ON Flights
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_flights_changed();
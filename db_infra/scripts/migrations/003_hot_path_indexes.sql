@@ -0,0 +1,12 @@
+-- Indexes for the predicates the API runs on every request (see the STATEMENTS registry in
+-- src/db/statements.py); tests/test_query_plans.py checks none of them plans a sequential scan.
+CREATE INDEX IF NOT EXISTS idx_flights_route_departure ON Flights(departure, destination, departure_time);
+CREATE INDEX IF NOT EXISTS idx_boarding_passes_booking_id ON Boarding_Passes(booking_id);
+CREATE INDEX IF NOT EXISTS idx_trip_components_trip_id ON Trip_Components(trip_id);
+CREATE INDEX IF NOT EXISTS idx_trip_components_flight_number ON Trip_Components(flight_number);
+CREATE INDEX IF NOT EXISTS idx_insurance_trip_id ON Insurance(trip_id);
+CREATE INDEX IF NOT EXISTS idx_offers_offer_type ON Offers(offer_type);
+
+-- Covers lookups by booking_id alone as well, so the single-column index is redundant
+CREATE INDEX IF NOT EXISTS idx_seats_booking_seat ON Seats(booking_id, seat_number);
+DROP INDEX IF EXISTS idx_seats_booking_id;
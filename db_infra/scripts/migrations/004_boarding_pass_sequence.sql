@@ -0,0 +1,15 @@
+-- Boarding pass IDs come from a sequence: check-in takes one with nextval() inside its
+-- INSERT ... RETURNING, so concurrent check-ins never collide and nothing scans the table.
+-- IDs keep the BP001 format and grow past BP999 (BP1000, ...), so the column is widened.
+ALTER TABLE Boarding_Passes ALTER COLUMN boarding_pass_id TYPE VARCHAR(24);
+
+CREATE SEQUENCE IF NOT EXISTS boarding_pass_id_seq AS BIGINT OWNED BY Boarding_Passes.boarding_pass_id;
+
+-- Continue after the highest existing BP<digits> ID (or start at 1 on an empty table)
+SELECT setval(
+    'boarding_pass_id_seq',
+    GREATEST(COALESCE(MAX(substring(boarding_pass_id FROM 3)::BIGINT), 0), 1),
+    MAX(boarding_pass_id) IS NOT NULL
+)
+FROM Boarding_Passes
+WHERE boarding_pass_id ~ '^BP[0-9]+$';
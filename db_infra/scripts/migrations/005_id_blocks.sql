@@ -0,0 +1,4 @@
+-- Booking, trip and insurance IDs (src/db/ids.py): each API worker leases a block of
+-- numbers with one nextval() and hands them out in-process, so creating a row takes
+-- no extra round trip for its ID and IDs never collide across workers or tasks.
+CREATE SEQUENCE IF NOT EXISTS id_block_seq AS BIGINT;
@@ -0,0 +1,14 @@
+-- Stored responses for POSTs sent with an Idempotency-Key header (src/api/idempotency.py).
+-- A request claims its key with an INSERT in the same transaction as its changes and
+-- stores its response there before committing, so a retry either waits for and replays
+-- that response or, if the first attempt rolled back, runs again. Rows older than
+-- idempotency_key_ttl are reclaimed by a new request or purged in the background.
+CREATE TABLE IF NOT EXISTS Idempotency_Keys (
+    idempotency_key VARCHAR(255) PRIMARY KEY,
+    request TEXT NOT NULL, -- method, route and parameters, to refuse a key reused for something else
+    status_code INTEGER,
+    response JSONB,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created_at ON Idempotency_Keys (created_at);
@@ -0,0 +1,8 @@
+-- Keyset pagination (src/api/pagination.py): each index ends with the page's full sort key,
+-- so fetching the page after a cursor is an index range scan however deep the page is.
+CREATE INDEX IF NOT EXISTS idx_flights_route_departure_number
+    ON Flights(departure, destination, departure_time, flight_number);
+DROP INDEX IF EXISTS idx_flights_route_departure;
+
+CREATE INDEX IF NOT EXISTS idx_offers_type_id ON Offers(offer_type, offer_id);
+DROP INDEX IF EXISTS idx_offers_offer_type;
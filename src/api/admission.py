@@ -0,0 +1,18 @@
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+
+from src.db.admission import set_route_policy
+from src.db.exceptions import PoolSaturatedError
+
+
+async def admission_policy(request: Request):
+    """Bind the matched route's admission policy (critical, acquire deadline) to this request."""
+    set_route_policy(request.scope["route"].path)
+
+
+async def pool_saturated_handler(request: Request, exc: PoolSaturatedError):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "fail", "error": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
@@ -0,0 +1,136 @@
+import asyncio
+import posixpath
+from typing import Any, Dict, List
+from urllib.parse import unquote
+
+import httpx
+from fastapi import APIRouter, HTTPException, Request, status
+from pydantic import BaseModel
+from starlette.routing import Match
+
+from config import *
+
+router = APIRouter()
+
+BATCH_PATH = "/api/v1/batch"
+
+# Headers every operation gets from the batch request itself, and the ones an operation may set
+INHERITED_HEADERS = ("x-api-key", "x-read-your-writes")
+OPERATION_HEADERS = ("idempotency-key", "if-none-match")
+# Response headers worth handing back with an operation's result
+RESULT_HEADERS = ("etag", "idempotent-replayed", "retry-after")
+
+
+class BatchOperation(BaseModel):
+    method: str = "GET"
+    path: str
+    params: Dict[str, Any] = {}
+    headers: Dict[str, str] = {}
+
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation]
+
+
+def operation_result(status_code: int, body, headers: dict = None) -> dict:
+    result = {"status_code": status_code, "body": body}
+    if headers:
+        result["headers"] = headers
+    return result
+
+
+def fail_result(status_code: int, error: str) -> dict:
+    return operation_result(status_code, {"status": "fail", "error": error})
+
+
+def normalise_path(path: str) -> str:
+    """`path` as the router sees it: no query string, percent-decoded, dot segments resolved."""
+    path = unquote(path.split("?", 1)[0])
+    normalised = "/" + posixpath.normpath(path).lstrip("/")
+    if path.endswith("/") and normalised != "/":
+        normalised += "/"
+    return normalised
+
+
+def refused_route(app, method: str, path: str) -> bool:
+    """
+    Whether `path` reaches the batch route itself (no nesting) or a streaming route (it
+    would be buffered whole), directly or through the trailing-slash redirect.
+    """
+    other = path[:-1] if path.endswith("/") else path + "/"
+    for candidate in (path, other):
+        scope = {"type": "http", "method": method, "path": candidate, "root_path": ""}
+        for route in app.routes:
+            route_path = getattr(route, "path", "")
+            if route_path.rstrip("/") == BATCH_PATH or route_path.endswith("/stream"):
+                match, _ = route.matches(scope)
+                if match != Match.NONE:
+                    return True
+    return False
+
+
+async def dispatch(app, client: httpx.AsyncClient, operation: BatchOperation, inherited: dict) -> dict:
+    method = operation.method.upper()
+    if method not in ("GET", "POST"):
+        return fail_result(status.HTTP_400_BAD_REQUEST, f"Unsupported method {operation.method}")
+    path = normalise_path(operation.path)
+    if not path.startswith("/api/v1/") or refused_route(app, method, path):
+        return fail_result(status.HTTP_400_BAD_REQUEST, f"Unsupported path {operation.path}")
+    headers = {name: value for name, value in operation.headers.items() if name.lower() in OPERATION_HEADERS}
+    headers.update(inherited)
+    response = await client.request(method, path, params=operation.params, headers=headers)
+    if response.headers.get("content-type", "").startswith("application/json"):
+        body = response.json()
+    else:
+        body = response.text
+    kept = {name: response.headers[name] for name in RESULT_HEADERS if name in response.headers}
+    return operation_result(response.status_code, body, kept)
+
+
+def task_result(task: asyncio.Task) -> dict:
+    if task.cancelled():
+        return fail_result(status.HTTP_504_GATEWAY_TIMEOUT, "Batch deadline exceeded")
+    if task.exception() is not None:
+        return fail_result(status.HTTP_500_INTERNAL_SERVER_ERROR, str(task.exception()))
+    return task.result()
+
+
+async def run_batch(app, operations: list, inherited: dict) -> list:
+    """
+    Run `operations` against `app` in-process, at most batch_concurrency at a time, each
+    through the same routes, dependencies and pool admission as a request of its own.
+    Every operation gets its own result: one failing doesn't touch the others, and the
+    ones still running at batch_deadline are cancelled and reported as timed out (a
+    cancelled write rolls back; retry it with its Idempotency-Key to find out).
+    """
+    semaphore = asyncio.Semaphore(batch_concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://batch") as client:
+        async def run(operation):
+            async with semaphore:
+                return await dispatch(app, client, operation, inherited)
+
+        # One task each, so one operation's context (read routing, admission policy) isn't another's
+        tasks = [asyncio.ensure_future(run(operation)) for operation in operations]
+        _, pending = await asyncio.wait(tasks, timeout=batch_deadline)
+        for task in pending:
+            task.cancel()
+        # Let the cancelled ones unwind so their connections are back in the pool before we answer
+        await asyncio.gather(*pending, return_exceptions=True)
+    return [task_result(task) for task in tasks]
+
+
+@router.post(BATCH_PATH)
+async def batch(body: BatchRequest, request: Request):
+    """
+    Several API calls in one round trip, e.g. the reservation, boarding pass and offers
+    an agent needs for one turn. Results come back in the order of `operations`.
+    """
+    if not body.operations:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No operations")
+    if len(body.operations) > batch_max_operations:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"At most {batch_max_operations} operations per batch")
+    inherited = {name: request.headers[name] for name in INHERITED_HEADERS if name in request.headers}
+    results = await run_batch(request.app, body.operations, inherited)
+    return {"status": "success", "results": results}
@@ -0,0 +1,14 @@
+from typing import Optional
+
+from fastapi import Header
+
+from src.db.routing import use_primary_for_reads
+
+
+async def read_your_writes(x_read_your_writes: Optional[str] = Header(None)):
+    """
+    Escape hatch for replica lag: a client that has just written sends
+    `X-Read-Your-Writes: true` and that request's reads go to the primary.
+    """
+    if x_read_your_writes and x_read_your_writes.lower() in ("1", "true", "yes"):
+        use_primary_for_reads()
@@ -1,31 +1,43 @@
-from fastapi import APIRouter, HTTPException,status
-from src.db.connection import get_db_connection
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Request, Response, status
+from src.db.cache import booking_overview_cache, not_found_cache
+from src.db.coalesce import coalesced_read
+from src.api.etag import make_etag, not_modified_response
+from src.api.idempotency import remember_response, replay_response
+from src.db.connection import connection_for
 from fastapi.responses import JSONResponse
 from src.db.exceptions import DatabaseQueryError
 from src.db.models import (
-    get_boarding_pass_data, check_in_booking, choose_seat_data, change_seat_data
+    get_boarding_pass_data, get_boarding_pass_version, check_in_booking, choose_seat_data, change_seat_data
 )
+from src.api.responses import FastJSONResponse
+from src.api.schemas import BoardingPassResponse, ChangeSeatResponse, CheckInResponse, ChooseSeatResponse
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
 
-@router.get("/api/v1/boarding-pass/{booking_id}")
-async def get_boarding_pass(booking_id: str):
+@router.get("/api/v1/boarding-pass/{booking_id}", response_model=BoardingPassResponse)
+async def get_boarding_pass(booking_id: str, request: Request, response: Response):
     try:
-        async with get_db_connection() as conn:
-            async with conn.cursor() as cursor:
-                result = await get_boarding_pass_data(cursor, booking_id)
-                await conn.commit()
-                if not result:
-                    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Boarding pass not found")
-                return {
-                    "status": "success",
-                    "boarding_pass": {
-                        "gate": result[5],
-                        "seat": result[6],
-                        "boarding_time": result[7],
-                        "pdf_url": result[8]
-                    }
-                }
+        if not_found_cache.known_missing("boarding_pass", booking_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Boarding pass not found")
+        unchanged = await not_modified_response(request, get_boarding_pass_version, booking_id)
+        if unchanged is not None:
+            return unchanged
+        generation = not_found_cache.generation
+        result = await coalesced_read(get_boarding_pass_data, booking_id)
+        if not result:
+            not_found_cache.record_missing("boarding_pass", booking_id, generation)
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Boarding pass not found")
+        response.headers["ETag"] = make_etag(result.version)
+        return {
+            "status": "success",
+            "boarding_pass": {
+                "gate": result.gate,
+                "seat": result.seat,
+                "boarding_time": result.boarding_time,
+                "pdf_url": result.pdf_url
+            }
+        }
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -33,24 +45,29 @@ async def get_boarding_pass(booking_id: str):
         )
 
 
-@router.get("/api/v1/print-boarding-pass/{booking_id}")
-async def print_boarding_pass(booking_id: str):
+@router.get("/api/v1/print-boarding-pass/{booking_id}", response_model=BoardingPassResponse)
+async def print_boarding_pass(booking_id: str, request: Request, response: Response):
     try:
-        async with get_db_connection() as conn:
-            async with conn.cursor() as cursor:
-                result = await get_boarding_pass_data(cursor, booking_id)
-                await conn.commit()
-                if not result:
-                    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Boarding pass not found")
-                return {
-                    "status": "success",
-                    "boarding_pass": {
-                        "gate": result[5],
-                        "seat": result[6],
-                        "boarding_time": result[7],
-                        "pdf_url": result[8]
-                    }
-                }
+        if not_found_cache.known_missing("boarding_pass", booking_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Boarding pass not found")
+        unchanged = await not_modified_response(request, get_boarding_pass_version, booking_id)
+        if unchanged is not None:
+            return unchanged
+        generation = not_found_cache.generation
+        result = await coalesced_read(get_boarding_pass_data, booking_id)
+        if not result:
+            not_found_cache.record_missing("boarding_pass", booking_id, generation)
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Boarding pass not found")
+        response.headers["ETag"] = make_etag(result.version)
+        return {
+            "status": "success",
+            "boarding_pass": {
+                "gate": result.gate,
+                "seat": result.seat,
+                "boarding_time": result.boarding_time,
+                "pdf_url": result.pdf_url
+            }
+        }
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -58,16 +75,18 @@ async def print_boarding_pass(booking_id: str):
         )
 
 
-@router.post("/api/v1/check-in/{booking_id}")
-async def check_in(booking_id: str):
+@router.post("/api/v1/check-in/{booking_id}", response_model=CheckInResponse)
+async def check_in(booking_id: str, request: Request, idempotency_key: Optional[str] = Header(None)):
     try:
-        async with get_db_connection() as conn:
+        async with connection_for(check_in_booking) as conn:
             async with conn.cursor() as cursor:
+                replayed = await replay_response(cursor, request, idempotency_key)
+                if replayed is not None:
+                    return replayed
                 result = await check_in_booking(cursor, booking_id)
                 if not result["updated"]:
                     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Booking not found")
-                await conn.commit()
-                return {
+                content = {
                     "status": "success",
                     "message": "Check-in successful",
                     "boarding_pass": {
@@ -76,6 +95,11 @@ async def check_in(booking_id: str):
                         "boarding_time": result["boarding_time"]
                     }
                 }
+                await remember_response(cursor, idempotency_key, content)
+                await conn.commit()
+                booking_overview_cache.invalidate(booking_id)
+                not_found_cache.created("boarding_pass", booking_id)
+                return content
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -83,14 +107,16 @@ async def check_in(booking_id: str):
         )
 
 
-@router.post("/api/v1/choose-seat/{booking_id}")
-async def choose_seat(booking_id: str, seat_number: str):
+@router.post("/api/v1/choose-seat/{booking_id}", response_model=ChooseSeatResponse)
+async def choose_seat(booking_id: str, seat_number: str, request: Request, idempotency_key: Optional[str] = Header(None)):
     try:
-        async with get_db_connection() as conn:
+        async with connection_for(choose_seat_data) as conn:
             async with conn.cursor() as cursor:
+                replayed = await replay_response(cursor, request, idempotency_key)
+                if replayed is not None:
+                    return replayed
                 result = await choose_seat_data(cursor, booking_id, seat_number)
-                await conn.commit()
-                return {
+                content = {
                     "status": "success",
                     "seat": {
                         "booking_id": booking_id,
@@ -99,6 +125,10 @@ async def choose_seat(booking_id: str, seat_number: str):
                         "additional_fee": result["additional_fee"]
                     }
                 }
+                await remember_response(cursor, idempotency_key, content)
+                await conn.commit()
+                booking_overview_cache.invalidate(booking_id)
+                return content
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -106,24 +136,30 @@ async def choose_seat(booking_id: str, seat_number: str):
         )
 
 
-@router.post("/api/v1/change-seat/{booking_id}")
-async def change_seat(booking_id: str, seat_number: str):
+@router.post("/api/v1/change-seat/{booking_id}", response_model=ChangeSeatResponse)
+async def change_seat(booking_id: str, seat_number: str, request: Request, idempotency_key: Optional[str] = Header(None)):
     try:
-        async with get_db_connection() as conn:
+        async with connection_for(change_seat_data) as conn:
             async with conn.cursor() as cursor:
+                replayed = await replay_response(cursor, request, idempotency_key)
+                if replayed is not None:
+                    return replayed
                 result = await change_seat_data(cursor, booking_id, seat_number)
                 if not result:
                     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Seat not found")
-                await conn.commit()
-                return {
+                content = {
                     "status": "success",
                     "seat": {
-                        "flight_number": result[0],
-                        "seat_number": result[1],
-                        "additional_fee": result[2]
+                        "flight_number": result.flight_number,
+                        "seat_number": result.seat_number,
+                        "additional_fee": result.additional_fee
                     },
                     "policy": "$20 fee for changes"
                 }
+                await remember_response(cursor, idempotency_key, content)
+                await conn.commit()
+                booking_overview_cache.invalidate(booking_id)
+                return content
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,26 +1,156 @@
-from fastapi import APIRouter, HTTPException, Query, status
-from src.db.connection import get_db_connection
+from typing import List, Optional
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response, status
+from src.db.cache import booking_overview_cache, flight_snapshot_cache, not_found_cache, offer_cache
+from src.db.coalesce import coalesced_read, single_flight
+from src.db.connection import connection_for, get_read_connection
 from fastapi.responses import JSONResponse
 from src.db.exceptions import DatabaseQueryError
+from config import *
 from src.db.models import (
-    book_flight_data, get_flight_offers_data, get_flight_prices_data,
-    get_flight_reservation_data, get_flight_status_data, search_flights_data,
+    book_flight_data, get_booking_overview_data, get_flight_offers_data, get_flight_snapshot_data, get_flight_snapshots_data,
+    get_flight_reservation_data, get_flight_reservations_data, get_flight_reservation_version, search_flights_data, stream_flights_data,
     cancel_flight_data, change_flight_data, purchase_flight_insurance_data,
-    get_refund_data, get_arrival_time_data, get_departure_time_data
+    get_refund_data
 )
+from src.db.route_index import route_index
+from src.db.routing import reads_from_primary
+from src.api.etag import make_etag, not_modified_response
+from src.api.idempotency import remember_response, replay_response
+from src.api.pagination import FLIGHT_KEY, FLIGHT_KEY_TYPES, OFFER_KEY, OFFER_KEY_TYPES, decode_cursor, page_limit, paginate
+from src.api.streaming import ndjson_response
+from src.api.responses import FastJSONResponse
+from src.api.schemas import (
+    ArrivalTimeResponse, BatchFlightPricesResponse, BatchFlightReservationResponse,
+    BatchFlightStatusResponse, BookFlightResponse, BookingOverviewResponse, CancelFlightResponse,
+    ChangeFlightResponse, DepartureTimeResponse, FlightPricesResponse, FlightReservationResponse,
+    FlightSearchResponse, FlightStatusResponse, InsuranceResponse, OffersResponse
+)
+
+router = APIRouter(default_response_class=FastJSONResponse)
+
+
+async def load_flight_snapshot(flight_number: str):
+    """
+    The Flights row behind /flight-status, /flight-prices, /arrival-time and
+    /departure-time, as a FlightSnapshotRow. Served from the flight snapshot
+    cache; concurrent misses for a flight share one load, which reads the primary so a
+    replica lagging behind a booking can't put stale availability back into the cache.
+    """
+    if not reads_from_primary():
+        snapshot = flight_snapshot_cache.get(flight_number)
+        if snapshot is not None:
+            return snapshot
+    if not_found_cache.known_missing("flight", flight_number):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Flight not found")
+
+    async def load():
+        generation = flight_snapshot_cache.generation
+        missing_generation = not_found_cache.generation
+        async with get_read_connection(primary=True) as conn:
+            async with conn.cursor() as cursor:
+                snapshot = await get_flight_snapshot_data(cursor, flight_number)
+        if snapshot:
+            flight_snapshot_cache.put(flight_number, snapshot, generation)
+        else:
+            not_found_cache.record_missing("flight", flight_number, missing_generation)
+        return snapshot
+
+    snapshot = await single_flight.do(("get_flight_snapshot_data", (flight_number,)), load)
+    if not snapshot:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Flight not found")
+    return snapshot
+
+
+async def load_flight_snapshots(flight_numbers: list) -> dict:
+    """
+    load_flight_snapshot for a list of flights: the snapshot of each, or None for the
+    ones that don't exist. Whatever the caches can't answer is read in one query.
+    """
+    snapshots = {}
+    misses = []
+    for flight_number in flight_numbers:
+        snapshot = None if reads_from_primary() else flight_snapshot_cache.get(flight_number)
+        if snapshot is not None:
+            snapshots[flight_number] = snapshot
+        elif not_found_cache.known_missing("flight", flight_number):
+            snapshots[flight_number] = None
+        else:
+            misses.append(flight_number)
+    if misses:
+        generation = flight_snapshot_cache.generation
+        missing_generation = not_found_cache.generation
+        async with get_read_connection(primary=True) as conn:
+            async with conn.cursor() as cursor:
+                found = await get_flight_snapshots_data(cursor, misses)
+        for flight_number in misses:
+            snapshot = found.get(flight_number)
+            if snapshot:
+                flight_snapshot_cache.put(flight_number, snapshot, generation)
+            else:
+                not_found_cache.record_missing("flight", flight_number, missing_generation)
+            snapshots[flight_number] = snapshot
+    return {flight_number: snapshots[flight_number] for flight_number in flight_numbers}
+
+
+def batch_ids(ids: list) -> list:
+    """The IDs of a batch lookup, duplicates dropped, refused past batch_lookup_max."""
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > batch_lookup_max:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"At most {batch_lookup_max} IDs per batch")
+    return ids
+
 
-router = APIRouter()
+NOT_FOUND = {"status": "not_found"}
 
-@router.post("/api/v1/book-flight/")
-async def book_flight(flight_number: str = Query(...), passenger_id: str = Query(...)):
+
+def flight_prices(snapshot) -> dict:
+    return {
+        "price": snapshot.price,
+        "availability": snapshot.availability
+    }
+
+
+def flight_reservation(result) -> dict:
+    return {
+        "passenger_id": result.passenger_id,
+        "flight_number": result.flight_number,
+        "booking_date": result.booking_date,
+        "status": result.status,
+        "total_price": result.total_price,
+        "departure": result.departure,
+        "destination": result.destination
+    }
+
+
+def flight_status(snapshot) -> dict:
+    return {
+        "departure": snapshot.departure,
+        "destination": snapshot.destination,
+        "status": snapshot.status,
+        "departure_time": snapshot.departure_time,
+        "arrival_time": snapshot.arrival_time,
+        "gate": snapshot.gate
+    }
+
+
+@router.post("/api/v1/book-flight/", response_model=BookFlightResponse)
+async def book_flight(request: Request, flight_number: str = Query(...), passenger_id: str = Query(...),
+                      idempotency_key: Optional[str] = Header(None)):
     try:
-        async with get_db_connection() as conn:
+        async with connection_for(book_flight_data) as conn:
             async with conn.cursor() as cursor:
+                replayed = await replay_response(cursor, request, idempotency_key)
+                if replayed is not None:
+                    return replayed
                 booking_id = await book_flight_data(cursor, flight_number, passenger_id)
                 if not booking_id:
                     raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Flight not available")
+                content = {"status": "success", "booking_id": booking_id}
+                await remember_response(cursor, idempotency_key, content)
                 await conn.commit()
-                return {"status": "success", "booking_id": booking_id}
+                flight_snapshot_cache.invalidate(flight_number)
+                return content
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -28,14 +158,30 @@ async def book_flight(flight_number: str = Query(...), passenger_id: str = Query
         )
 
 
-@router.get("/api/v1/flight-offers/")
-async def check_flight_offers():
+async def load_flight_offers(limit: int):
+    generation = offer_cache.generation
+    # Refill from the primary: a replica may not have the change that was just announced
+    async with get_read_connection(primary=True) as conn:
+        async with conn.cursor() as cursor:
+            offers = await get_flight_offers_data(cursor, "", limit + 1)
+    offer_cache.put(("Flight", limit), offers, generation)
+    return offers
+
+
+@router.get("/api/v1/flight-offers/", response_model=OffersResponse)
+async def check_flight_offers(limit: int = Query(page_size_default, ge=1), cursor: Optional[str] = None):
     try:
-        async with get_db_connection() as conn:
-            async with conn.cursor() as cursor:
-                offers = await get_flight_offers_data(cursor)
-                await conn.commit()
-                return {"status": "success", "offers": offers}
+        limit = page_limit(limit)
+        after = decode_cursor(cursor, *OFFER_KEY_TYPES)
+        if after:
+            offers = await coalesced_read(get_flight_offers_data, after[0], limit + 1)
+        else:
+            # First pages are cached; they are what nearly every request asks for
+            offers = offer_cache.get(("Flight", limit))
+            if offers is None:
+                offers = await single_flight.do(("get_flight_offers_data", (limit,)), lambda: load_flight_offers(limit))
+        offers, next_cursor = paginate(offers, limit, *OFFER_KEY)
+        return {"status": "success", "offers": offers, "next_cursor": next_cursor}
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -43,22 +189,11 @@ async def check_flight_offers():
         )
 
 
-@router.get("/api/v1/flight-prices/{flight_number}")
+@router.get("/api/v1/flight-prices/{flight_number}", response_model=FlightPricesResponse)
 async def check_flight_prices(flight_number: str):
     try:
-        async with get_db_connection() as conn:
-            async with conn.cursor() as cursor:
-                result = await get_flight_prices_data(cursor, flight_number)
-                await conn.commit()
-                if not result:
-                    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Flight not found")
-                return {
-                    "status": "success",
-                    "prices": {
-                        "price": result[0],
-                        "availability": result[1]
-                    }
-                }
+        snapshot = await load_flight_snapshot(flight_number)
+        return {"status": "success", "prices": flight_prices(snapshot)}
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -66,27 +201,54 @@ async def check_flight_prices(flight_number: str):
         )
 
 
-@router.get("/api/v1/flight-reservation/{booking_id}")
-async def check_flight_reservation(booking_id: str):
+@router.get("/api/v1/flight-reservation/{booking_id}", response_model=FlightReservationResponse)
+async def check_flight_reservation(booking_id: str, request: Request, response: Response):
     try:
-        async with get_db_connection() as conn:
+        unchanged = await not_modified_response(request, get_flight_reservation_version, booking_id)
+        if unchanged is not None:
+            return unchanged
+        result = await coalesced_read(get_flight_reservation_data, booking_id)
+        if not result:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reservation not found")
+        response.headers["ETag"] = make_etag(result.version)
+        return {"status": "success", "reservation": flight_reservation(result)}
+    except DatabaseQueryError as e:
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"status": "fail", "error": str(e)}
+        )
+
+
+async def load_booking_overview(booking_id: str):
+    """
+    Reservation, flight, boarding pass, seats and insurance of a booking in one document,
+    from the booking overview cache or one query. Like flight snapshots, cache fills read
+    the primary so a lagging replica can't undo an invalidation made after a write.
+    """
+    if not reads_from_primary():
+        overview = booking_overview_cache.get(booking_id)
+        if overview is not None:
+            return overview
+
+    async def load():
+        generation = booking_overview_cache.generation
+        async with get_read_connection(primary=True) as conn:
             async with conn.cursor() as cursor:
-                result = await get_flight_reservation_data(cursor, booking_id)
-                await conn.commit()
-                if not result:
-                    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reservation not found")
-                return {
-                    "status": "success",
-                    "reservation": {
-                        "passenger_id": result[0],
-                        "flight_number": result[1],
-                        "booking_date": result[2],
-                        "status": result[3],
-                        "total_price": result[4],
-                        "departure": result[5],
-                        "destination": result[6]
-                    }
-                }
+                overview = await get_booking_overview_data(cursor, booking_id)
+        if overview:
+            booking_overview_cache.put(booking_id, overview, generation)
+        return overview
+
+    return await single_flight.do(("get_booking_overview_data", (booking_id,)), load)
+
+
+@router.get("/api/v1/booking-overview/{booking_id}", response_model=BookingOverviewResponse)
+async def booking_overview(booking_id: str):
+    try:
+        overview = await load_booking_overview(booking_id)
+        if not overview:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Booking not found")
+        return {"status": "success", "booking": overview}
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -94,26 +256,11 @@ async def check_flight_reservation(booking_id: str):
         )
 
 
-@router.get("/api/v1/flight-status/{flight_number}")
+@router.get("/api/v1/flight-status/{flight_number}", response_model=FlightStatusResponse)
 async def check_flight_status(flight_number: str):
     try:
-        async with get_db_connection() as conn:
-            async with conn.cursor() as cursor:
-                result = await get_flight_status_data(cursor, flight_number)
-                await conn.commit()
-                if not result:
-                    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Flight not found")
-                return {
-                    "status": "success",
-                    "flight_status": {
-                        "departure": result[0],
-                        "destination": result[1],
-                        "status": result[2],
-                        "departure_time": result[3],
-                        "arrival_time": result[4],
-                        "gate": result[5]
-                    }
-                }
+        snapshot = await load_flight_snapshot(flight_number)
+        return {"status": "success", "flight_status": flight_status(snapshot)}
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -121,14 +268,17 @@ async def check_flight_status(flight_number: str):
         )
 
 
-@router.get("/api/v1/search-flight/{departure}/{destination}/{date}")
-async def search_flight(departure: str, destination: str, date: str):
+# Batch lookups: ?flight_number=FL000042&flight_number=FL000043..., one query for the lot,
+# answered as a map keyed by ID with {"status": "not_found"} for the IDs that don't exist
+
+@router.get("/api/v1/batch/flight-prices/", response_model=BatchFlightPricesResponse)
+async def batch_flight_prices(flight_number: List[str] = Query(...)):
     try:
-        async with get_db_connection() as conn:
-            async with conn.cursor() as cursor:
-                flights = await search_flights_data(cursor, departure, destination, date)
-                await conn.commit()
-                return {"status": "success", "flights": flights}
+        snapshots = await load_flight_snapshots(batch_ids(flight_number))
+        return {
+            "status": "success",
+            "prices": {key: flight_prices(snapshot) if snapshot else NOT_FOUND for key, snapshot in snapshots.items()}
+        }
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -136,20 +286,91 @@ async def search_flight(departure: str, destination: str, date: str):
         )
 
 
-@router.post("/api/v1/cancel-flight/{booking_id}")
-async def cancel_flight(booking_id: str):
+@router.get("/api/v1/batch/flight-reservation/", response_model=BatchFlightReservationResponse)
+async def batch_flight_reservation(booking_id: List[str] = Query(...)):
     try:
-        async with get_db_connection() as conn:
+        booking_ids = batch_ids(booking_id)
+        results = await coalesced_read(get_flight_reservations_data, tuple(booking_ids))
+        return {
+            "status": "success",
+            "reservations": {
+                key: flight_reservation(results[key]) if key in results else NOT_FOUND for key in booking_ids
+            }
+        }
+    except DatabaseQueryError as e:
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"status": "fail", "error": str(e)}
+        )
+
+
+@router.get("/api/v1/batch/flight-status/", response_model=BatchFlightStatusResponse)
+async def batch_flight_status(flight_number: List[str] = Query(...)):
+    try:
+        snapshots = await load_flight_snapshots(batch_ids(flight_number))
+        return {
+            "status": "success",
+            "flight_status": {
+                key: flight_status(snapshot) if snapshot else NOT_FOUND for key, snapshot in snapshots.items()
+            }
+        }
+    except DatabaseQueryError as e:
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"status": "fail", "error": str(e)}
+        )
+
+
+@router.get("/api/v1/search-flight/{departure}/{destination}/{date}", response_model=FlightSearchResponse)
+async def search_flight(departure: str, destination: str, date: str,
+                        limit: int = Query(page_size_default, ge=1), cursor: Optional[str] = None):
+    try:
+        limit = page_limit(limit)
+        after = decode_cursor(cursor, *FLIGHT_KEY_TYPES)
+        flights = route_index.search(departure, destination, date, after, limit + 1)
+        if flights is None:
+            flights = await coalesced_read(search_flights_data, departure, destination, date, after, limit + 1)
+        flights, next_cursor = paginate(flights, limit, *FLIGHT_KEY)
+        return {"status": "success", "flights": flights, "next_cursor": next_cursor}
+    except DatabaseQueryError as e:
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"status": "fail", "error": str(e)}
+        )
+
+
+@router.get("/api/v1/search-flight/{departure}/{destination}/{date}/stream")
+async def stream_search_flight(departure: str, destination: str, date: str):
+    """All results, unpaginated, as NDJSON streamed from a server-side cursor."""
+    try:
+        return await ndjson_response(stream_flights_data, departure, destination, date)
+    except DatabaseQueryError as e:
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"status": "fail", "error": str(e)}
+        )
+
+
+@router.post("/api/v1/cancel-flight/{booking_id}", response_model=CancelFlightResponse)
+async def cancel_flight(booking_id: str, request: Request, idempotency_key: Optional[str] = Header(None)):
+    try:
+        async with connection_for(cancel_flight_data) as conn:
             async with conn.cursor() as cursor:
+                replayed = await replay_response(cursor, request, idempotency_key)
+                if replayed is not None:
+                    return replayed
                 updated = await cancel_flight_data(cursor, booking_id)
                 if not updated:
                     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Booking not found")
-                await conn.commit()
-                return {
+                content = {
                     "status": "success",
                     "booking_status": "Cancelled",
                     "policy": "Free within 24 hours, $50 fee after"
                 }
+                await remember_response(cursor, idempotency_key, content)
+                await conn.commit()
+                booking_overview_cache.invalidate(booking_id)
+                return content
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -157,26 +378,34 @@ async def cancel_flight(booking_id: str):
         )
 
 
-@router.post("/api/v1/change-flight/{booking_id}")
-async def change_flight(booking_id: str, new_flight_number: str = Query(...)):
+@router.post("/api/v1/change-flight/{booking_id}", response_model=ChangeFlightResponse)
+async def change_flight(booking_id: str, request: Request, new_flight_number: str = Query(...),
+                        idempotency_key: Optional[str] = Header(None)):
     try:
-        async with get_db_connection() as conn:
+        async with connection_for(change_flight_data) as conn:
             async with conn.cursor() as cursor:
+                replayed = await replay_response(cursor, request, idempotency_key)
+                if replayed is not None:
+                    return replayed
                 result = await change_flight_data(cursor, booking_id, new_flight_number)
                 if not result:
                     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Booking not found")
-                await conn.commit()
-                return {
+                content = {
                     "status": "success",
                     "booking": {
-                        "passenger_id": result[0],
-                        "flight_number": result[1],
-                        "booking_date": result[2],
-                        "status": result[3],
-                        "total_price": result[4]
+                        "passenger_id": result.passenger_id,
+                        "flight_number": result.flight_number,
+                        "booking_date": result.booking_date,
+                        "status": result.status,
+                        "total_price": result.total_price
                     },
                     "policy": "Free within 24 hours, $75 fee after"
                 }
+                await remember_response(cursor, idempotency_key, content)
+                await conn.commit()
+                booking_overview_cache.invalidate(booking_id)
+                flight_snapshot_cache.invalidate(new_flight_number)
+                return content
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -184,18 +413,24 @@ async def change_flight(booking_id: str, new_flight_number: str = Query(...)):
         )
 
 
-@router.post("/api/v1/purchase-flight-insurance/{booking_id}")
-async def purchase_flight_insurance(booking_id: str):
+@router.post("/api/v1/purchase-flight-insurance/{booking_id}", response_model=InsuranceResponse)
+async def purchase_flight_insurance(booking_id: str, request: Request, idempotency_key: Optional[str] = Header(None)):
     try:
-        async with get_db_connection() as conn:
+        async with connection_for(purchase_flight_insurance_data) as conn:
             async with conn.cursor() as cursor:
+                replayed = await replay_response(cursor, request, idempotency_key)
+                if replayed is not None:
+                    return replayed
                 insurance_id = await purchase_flight_insurance_data(cursor, booking_id)
-                await conn.commit()
-                return {
+                content = {
                     "status": "success",
                     "insurance_id": insurance_id,
                     "terms": "Covers cancellation up to $1,000"
                 }
+                await remember_response(cursor, idempotency_key, content)
+                await conn.commit()
+                booking_overview_cache.invalidate(booking_id)
+                return content
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -203,20 +438,26 @@ async def purchase_flight_insurance(booking_id: str):
         )
 
 
-@router.post("/api/v1/get-refund/{booking_id}")
-async def get_refund(booking_id: str):
+@router.post("/api/v1/get-refund/{booking_id}", response_model=CancelFlightResponse)
+async def get_refund(booking_id: str, request: Request, idempotency_key: Optional[str] = Header(None)):
     try:
-        async with get_db_connection() as conn:
+        async with connection_for(get_refund_data) as conn:
             async with conn.cursor() as cursor:
+                replayed = await replay_response(cursor, request, idempotency_key)
+                if replayed is not None:
+                    return replayed
                 updated = await get_refund_data(cursor, booking_id)
                 if not updated:
                     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Booking not found")
-                await conn.commit()
-                return {
+                content = {
                     "status": "success",
                     "booking_status": "Refunded",
                     "policy": "Processed in 5-7 days, 50% penalty for non-refundable"
                 }
+                await remember_response(cursor, idempotency_key, content)
+                await conn.commit()
+                booking_overview_cache.invalidate(booking_id)
+                return content
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -224,16 +465,11 @@ async def get_refund(booking_id: str):
         )
 
 
-@router.get("/api/v1/arrival-time/{flight_number}")
+@router.get("/api/v1/arrival-time/{flight_number}", response_model=ArrivalTimeResponse)
 async def check_arrival_time(flight_number: str):
     try:
-        async with get_db_connection() as conn:
-            async with conn.cursor() as cursor:
-                result = await get_arrival_time_data(cursor, flight_number)
-                await conn.commit()
-                if not result:
-                    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Flight not found")
-                return {"status": "success", "arrival_time": result}
+        snapshot = await load_flight_snapshot(flight_number)
+        return {"status": "success", "arrival_time": snapshot.arrival_time}
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -241,16 +477,11 @@ async def check_arrival_time(flight_number: str):
         )
 
 
-@router.get("/api/v1/departure-time/{flight_number}")
+@router.get("/api/v1/departure-time/{flight_number}", response_model=DepartureTimeResponse)
 async def check_departure_time(flight_number: str):
     try:
-        async with get_db_connection() as conn:
-            async with conn.cursor() as cursor:
-                result = await get_departure_time_data(cursor, flight_number)
-                await conn.commit()
-                if not result:
-                    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Flight not found")
-                return {"status": "success", "departure_time": result}
+        snapshot = await load_flight_snapshot(flight_number)
+        return {"status": "success", "departure_time": snapshot.departure_time}
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
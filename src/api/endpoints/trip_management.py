@@ -1,30 +1,44 @@
-from fastapi import APIRouter, HTTPException, Query, status
-from src.db.connection import get_db_connection
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response, status
+from src.db.cache import not_found_cache, offer_cache
+from src.db.coalesce import coalesced_read, single_flight
+from src.api.etag import make_etag, not_modified_response
+from src.api.idempotency import remember_response, replay_response
+from src.api.pagination import OFFER_KEY, OFFER_KEY_TYPES, TRIP_KEY, TRIP_KEY_TYPES, decode_cursor, page_limit, paginate
+from src.api.streaming import ndjson_response
+from src.db.connection import connection_for, get_read_connection
 from fastapi.responses import JSONResponse
 from src.db.exceptions import DatabaseQueryError
+from config import *
 from src.db.models import (
-    get_trip_prices_data, book_trip_data, get_trip_details_data, get_trip_offers_data,
-    get_trip_plan_data, search_trips_data, cancel_trip_data, change_trip_data,
+    get_trip_prices_data, book_trip_data, get_trip_details_data, get_trip_details_version,
+    get_trip_offers_data, get_trip_plan_data, search_trips_data, stream_trips_data, cancel_trip_data, change_trip_data,
     purchase_trip_insurance_data
 )
+from src.api.responses import FastJSONResponse
+from src.api.schemas import (
+    BookTripResponse, CancelTripResponse, ChangeTripResponse, InsuranceResponse, OffersResponse,
+    TripDetailsResponse, TripPlanResponse, TripPricesResponse, TripSearchResponse
+)
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
 
-@router.get("/api/v1/trip-prices/{trip_id}")
+@router.get("/api/v1/trip-prices/{trip_id}", response_model=TripPricesResponse)
 async def check_trip_prices(trip_id: str):
     try:
-        async with get_db_connection() as conn:
-            async with conn.cursor() as cursor:
-                result = await get_trip_prices_data(cursor, trip_id)
-                await conn.commit()
-                if not result:
-                    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
-                return {
-                    "status": "success",
-                    "trip_prices": {
-                        "total_price": result[0]
-                    }
-                }
+        if not_found_cache.known_missing("trip", trip_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
+        generation = not_found_cache.generation
+        result = await coalesced_read(get_trip_prices_data, trip_id)
+        if not result:
+            not_found_cache.record_missing("trip", trip_id, generation)
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
+        return {
+            "status": "success",
+            "trip_prices": {
+                "total_price": result.total_price
+            }
+        }
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -32,14 +46,20 @@ async def check_trip_prices(trip_id: str):
         )
 
 
-@router.post("/api/v1/book-trip/")
-async def book_trip(passenger_id: str = Query(...)):
+@router.post("/api/v1/book-trip/", response_model=BookTripResponse)
+async def book_trip(request: Request, passenger_id: str = Query(...), idempotency_key: Optional[str] = Header(None)):
     try:
-        async with get_db_connection() as conn:
+        async with connection_for(book_trip_data) as conn:
             async with conn.cursor() as cursor:
+                replayed = await replay_response(cursor, request, idempotency_key)
+                if replayed is not None:
+                    return replayed
                 trip_id = await book_trip_data(cursor, passenger_id)
+                content = {"status": "success", "trip_id": trip_id}
+                await remember_response(cursor, idempotency_key, content)
                 await conn.commit()
-                return {"status": "success", "trip_id": trip_id}
+                not_found_cache.created("trip", trip_id)
+                return content
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -47,23 +67,24 @@ async def book_trip(passenger_id: str = Query(...)):
         )
 
 
-@router.get("/api/v1/trip-details/{trip_id}")
-async def check_trip_details(trip_id: str):
+@router.get("/api/v1/trip-details/{trip_id}", response_model=TripDetailsResponse)
+async def check_trip_details(trip_id: str, request: Request, response: Response):
     try:
-        async with get_db_connection() as conn:
-            async with conn.cursor() as cursor:
-                result = await get_trip_details_data(cursor, trip_id)
-                await conn.commit()
-                if not result:
-                    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
-                return {
-                    "status": "success",
-                    "trip_details": {
-                        "total_price": result["total_price"],
-                        "status": result["status"],
-                        "components": result["components"]
-                    }
-                }
+        unchanged = await not_modified_response(request, get_trip_details_version, trip_id)
+        if unchanged is not None:
+            return unchanged
+        result = await coalesced_read(get_trip_details_data, trip_id)
+        if not result:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
+        response.headers["ETag"] = make_etag(result["version"])
+        return {
+            "status": "success",
+            "trip_details": {
+                "total_price": result["total_price"],
+                "status": result["status"],
+                "components": result["components"]
+            }
+        }
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -71,14 +92,30 @@ async def check_trip_details(trip_id: str):
         )
 
 
-@router.get("/api/v1/trip-offers/")
-async def check_trip_offers():
+async def load_trip_offers(limit: int):
+    generation = offer_cache.generation
+    # Refill from the primary: a replica may not have the change that was just announced
+    async with get_read_connection(primary=True) as conn:
+        async with conn.cursor() as cursor:
+            offers = await get_trip_offers_data(cursor, "", limit + 1)
+    offer_cache.put(("Trip", limit), offers, generation)
+    return offers
+
+
+@router.get("/api/v1/trip-offers/", response_model=OffersResponse)
+async def check_trip_offers(limit: int = Query(page_size_default, ge=1), cursor: Optional[str] = None):
     try:
-        async with get_db_connection() as conn:
-            async with conn.cursor() as cursor:
-                offers = await get_trip_offers_data(cursor)
-                await conn.commit()
-                return {"status": "success", "offers": offers}
+        limit = page_limit(limit)
+        after = decode_cursor(cursor, *OFFER_KEY_TYPES)
+        if after:
+            offers = await coalesced_read(get_trip_offers_data, after[0], limit + 1)
+        else:
+            # First pages are cached; they are what nearly every request asks for
+            offers = offer_cache.get(("Trip", limit))
+            if offers is None:
+                offers = await single_flight.do(("get_trip_offers_data", (limit,)), lambda: load_trip_offers(limit))
+        offers, next_cursor = paginate(offers, limit, *OFFER_KEY)
+        return {"status": "success", "offers": offers, "next_cursor": next_cursor}
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -86,16 +123,13 @@ async def check_trip_offers():
         )
 
 
-@router.get("/api/v1/trip-plan/{trip_id}")
+@router.get("/api/v1/trip-plan/{trip_id}", response_model=TripPlanResponse)
 async def check_trip_plan(trip_id: str):
     try:
-        async with get_db_connection() as conn:
-            async with conn.cursor() as cursor:
-                plan = await get_trip_plan_data(cursor, trip_id)
-                await conn.commit()
-                if not plan:
-                    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip plan not found")
-                return {"status": "success", "trip_plan": plan}
+        plan = await coalesced_read(get_trip_plan_data, trip_id)
+        if not plan:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip plan not found")
+        return {"status": "success", "trip_plan": plan}
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -103,14 +137,15 @@ async def check_trip_plan(trip_id: str):
         )
 
 
-@router.get("/api/v1/search-trip/{departure}/{destination}/{date}")
-async def search_trip(departure: str, destination: str, date: str):
+@router.get("/api/v1/search-trip/{departure}/{destination}/{date}", response_model=TripSearchResponse)
+async def search_trip(departure: str, destination: str, date: str,
+                      limit: int = Query(page_size_default, ge=1), cursor: Optional[str] = None):
     try:
-        async with get_db_connection() as conn:
-            async with conn.cursor() as cursor:
-                trips = await search_trips_data(cursor, departure, destination, date)
-                await conn.commit()
-                return {"status": "success", "trips": trips}
+        limit = page_limit(limit)
+        after = decode_cursor(cursor, *TRIP_KEY_TYPES)
+        trips = await coalesced_read(search_trips_data, departure, destination, date, after, limit + 1)
+        trips, next_cursor = paginate(trips, limit, *TRIP_KEY)
+        return {"status": "success", "trips": trips, "next_cursor": next_cursor}
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -118,20 +153,37 @@ async def search_trip(departure: str, destination: str, date: str):
         )
 
 
-@router.post("/api/v1/cancel-trip/{trip_id}")
-async def cancel_trip(trip_id: str):
+@router.get("/api/v1/search-trip/{departure}/{destination}/{date}/stream")
+async def stream_search_trip(departure: str, destination: str, date: str):
+    """All results, unpaginated, as NDJSON streamed from a server-side cursor."""
     try:
-        async with get_db_connection() as conn:
+        return await ndjson_response(stream_trips_data, departure, destination, date)
+    except DatabaseQueryError as e:
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"status": "fail", "error": str(e)}
+        )
+
+
+@router.post("/api/v1/cancel-trip/{trip_id}", response_model=CancelTripResponse)
+async def cancel_trip(trip_id: str, request: Request, idempotency_key: Optional[str] = Header(None)):
+    try:
+        async with connection_for(cancel_trip_data) as conn:
             async with conn.cursor() as cursor:
+                replayed = await replay_response(cursor, request, idempotency_key)
+                if replayed is not None:
+                    return replayed
                 updated = await cancel_trip_data(cursor, trip_id)
                 if not updated:
                     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
-                await conn.commit()
-                return {
+                content = {
                     "status": "success",
                     "trip_status": "Cancelled",
                     "policy": "Free within 48 hours, $100 fee after"
                 }
+                await remember_response(cursor, idempotency_key, content)
+                await conn.commit()
+                return content
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -139,24 +191,30 @@ async def cancel_trip(trip_id: str):
         )
 
 
-@router.post("/api/v1/change-trip/{trip_id}")
-async def change_trip(trip_id: str, new_flight_number: str = Query(...)):
+@router.post("/api/v1/change-trip/{trip_id}", response_model=ChangeTripResponse)
+async def change_trip(trip_id: str, request: Request, new_flight_number: str = Query(...),
+                      idempotency_key: Optional[str] = Header(None)):
     try:
-        async with get_db_connection() as conn:
+        async with connection_for(change_trip_data) as conn:
             async with conn.cursor() as cursor:
+                replayed = await replay_response(cursor, request, idempotency_key)
+                if replayed is not None:
+                    return replayed
                 result = await change_trip_data(cursor, trip_id, new_flight_number)
                 if not result:
                     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip component not found")
-                await conn.commit()
-                return {
+                content = {
                     "status": "success",
                     "trip_component": {
-                        "component_type": result[0],
-                        "flight_number": result[1],
-                        "price": result[2]
+                        "component_type": result.component_type,
+                        "flight_number": result.flight_number,
+                        "price": result.price
                     },
                     "policy": "Free within 48 hours, $100 fee after"
                 }
+                await remember_response(cursor, idempotency_key, content)
+                await conn.commit()
+                return content
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -164,18 +222,23 @@ async def change_trip(trip_id: str, new_flight_number: str = Query(...)):
         )
 
 
-@router.post("/api/v1/purchase-trip-insurance/{trip_id}")
-async def purchase_trip_insurance(trip_id: str):
+@router.post("/api/v1/purchase-trip-insurance/{trip_id}", response_model=InsuranceResponse)
+async def purchase_trip_insurance(trip_id: str, request: Request, idempotency_key: Optional[str] = Header(None)):
     try:
-        async with get_db_connection() as conn:
+        async with connection_for(purchase_trip_insurance_data) as conn:
             async with conn.cursor() as cursor:
+                replayed = await replay_response(cursor, request, idempotency_key)
+                if replayed is not None:
+                    return replayed
                 insurance_id = await purchase_trip_insurance_data(cursor, trip_id)
-                await conn.commit()
-                return {
+                content = {
                     "status": "success",
                     "insurance_id": insurance_id,
                     "terms": "Covers cancellation up to $2,000"
                 }
+                await remember_response(cursor, idempotency_key, content)
+                await conn.commit()
+                return content
     except DatabaseQueryError as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -0,0 +1,38 @@
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+from src.db.coalesce import coalesced_read
+
+
+def make_etag(version: str) -> str:
+    """Strong ETag for a row version from src/db/statements.py."""
+    return f'"{version}"'
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match uses the weak comparison: W/ prefixes are ignored."""
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+async def not_modified_response(request: Request, version_func, *args) -> Optional[Response]:
+    """
+    304 for a conditional GET whose If-None-Match still matches, checked with the
+    version-only query `version_func` instead of building the full response.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    version = await coalesced_read(version_func, *args)
+    if version is None:
+        return None
+    etag = make_etag(version)
+    return not_modified(etag) if etag_matches(header, etag) else None
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+from typing import Optional
+
+from fastapi import HTTPException, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from psycopg import AsyncCursor
+
+from config import *
+from src.db.connection import connection_for
+from src.db.models import (
+    claim_idempotency_key, get_idempotent_response, save_idempotent_response, purge_idempotency_keys
+)
+from src.utils.metrics import registry, Counter
+
+logger = logging.getLogger(__name__)
+
+idempotent_replays = registry.register(Counter(
+    "accip_idempotent_replays_total", "POSTs answered with the stored response of an earlier attempt.", labels=("route",)))
+
+
+def request_fingerprint(request: Request) -> str:
+    """What a key was first used for: method, route template and every parameter."""
+    params = sorted(request.path_params.items()) + sorted(request.query_params.multi_items())
+    return f"{request.method} {request.scope['route'].path} {params}"
+
+
+async def replay_response(cursor: AsyncCursor, request: Request, idempotency_key: Optional[str]) -> Optional[JSONResponse]:
+    """
+    Claim `idempotency_key` in the handler's transaction. None means the handler should go
+    ahead, and store its response with `remember_response` before committing; otherwise
+    this is the response of the attempt that already used the key.
+
+    A duplicate arriving while the first attempt is still running waits here, on the
+    first attempt's uncommitted claim, and then replays its response or, if it rolled
+    back, claims the key itself.
+    """
+    if not idempotency_key:
+        return None
+    fingerprint = request_fingerprint(request)
+    if await claim_idempotency_key(cursor, idempotency_key, fingerprint, idempotency_key_ttl):
+        return None
+    stored = await get_idempotent_response(cursor, idempotency_key)
+    if stored is None or stored[1] is None:
+        # Purged in between, or stored by a handler that committed before remembering
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Idempotency-Key is in use, retry")
+    if stored[0] != fingerprint:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail="Idempotency-Key was already used for a different request")
+    idempotent_replays.inc((request.scope["route"].path,))
+    return JSONResponse(status_code=stored[1], content=stored[2], headers={"Idempotent-Replayed": "true"})
+
+
+async def remember_response(cursor: AsyncCursor, idempotency_key: Optional[str], content: dict,
+                            status_code: int = status.HTTP_200_OK):
+    """Store the response for the claimed key; call it before the handler commits."""
+    if idempotency_key:
+        await save_idempotent_response(cursor, idempotency_key, status_code, jsonable_encoder(content))
+
+
+async def purge_expired_keys() -> int:
+    """Delete expired keys in batches, one transaction each, so no batch holds locks for long."""
+    purged = 0
+    while True:
+        async with connection_for(purge_idempotency_keys) as conn:
+            async with conn.cursor() as cursor:
+                deleted = await purge_idempotency_keys(cursor, idempotency_key_ttl, idempotency_purge_batch)
+                await conn.commit()
+        purged += deleted
+        if deleted < idempotency_purge_batch:
+            return purged
+
+
+async def purge_expired_keys_forever(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            purged = await purge_expired_keys()
+            if purged:
+                logger.info("purged %d expired idempotency keys", purged)
+        except Exception as e:
+            logger.warning("purging idempotency keys failed: %s", e)
@@ -1,35 +1,60 @@
 
 from fastapi import FastAPI, Depends, status
 from fastapi.responses import JSONResponse
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+import asyncio
 
 from src.api.endpoints.boarding import router as boarding_router
 from src.api.endpoints.flight_management import router as flight_router
 from src.api.endpoints.trip_management import router as trip_router
 from fastapi.openapi.utils import get_openapi
 from src.api.auth import get_api_key
+from src.api.admission import admission_policy, pool_saturated_handler
+from src.api.batch import router as batch_router
+from src.api.consistency import read_your_writes
+from src.api.idempotency import purge_expired_keys_forever
+from src.api.metrics import MetricsMiddleware, router as metrics_router
 
 
 from src.db.connection import get_db_connection, open_db_pool, close_db_pool
+from src.db.exceptions import PoolSaturatedError
+from src.utils.secretload import get_provider
+from config import *
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Manages the application's startup and shutdown events.
-    Opens the database pool on startup and closes it on shutdown.
+    Opens the database pool on startup and closes it on shutdown, keeps the
+    API key secret cached and refreshed in the background, and purges expired
+    idempotency keys.
     """
-    print("Application startup: Initializing database pool...")
+    print("Application startup: Loading secrets and initializing database pool...")
+    secrets = get_provider()
+    await secrets.refresh(const_api_key_secret_name)
+    secrets_refresher = asyncio.create_task(secrets.refresh_forever([const_api_key_secret_name]))
     await open_db_pool()
+    idempotency_purger = None
+    if idempotency_purge_interval:
+        idempotency_purger = asyncio.create_task(purge_expired_keys_forever(idempotency_purge_interval))
     
     yield  # The application runs after this point
     
     print("Application shutdown: Closing database pool...")
+    for task in (secrets_refresher, idempotency_purger):
+        if task:
+            task.cancel()
+            # Wait for it to stop, so nothing is still using the pool when it closes
+            with suppress(asyncio.CancelledError):
+                await task
     await close_db_pool()
 
 
 
 app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+app.add_exception_handler(PoolSaturatedError, pool_saturated_handler)
 
 
 @app.get("/health")
@@ -53,9 +78,13 @@ async def health_deep():
             content={"status": "fail", "error": str(e)}
         )
 
-app.include_router(boarding_router, dependencies=[Depends(get_api_key)])
-app.include_router(flight_router, dependencies=[Depends(get_api_key)])
-app.include_router(trip_router, dependencies=[Depends(get_api_key)])
+# Pool, replica and query stats: same API key as the endpoints they describe
+app.include_router(metrics_router, dependencies=[Depends(get_api_key)])
+app.include_router(boarding_router, dependencies=[Depends(get_api_key), Depends(read_your_writes), Depends(admission_policy)])
+app.include_router(flight_router, dependencies=[Depends(get_api_key), Depends(read_your_writes), Depends(admission_policy)])
+app.include_router(trip_router, dependencies=[Depends(get_api_key), Depends(read_your_writes), Depends(admission_policy)])
+# No admission policy: the batch holds no connection itself, each operation is admitted on its own
+app.include_router(batch_router, dependencies=[Depends(get_api_key)])
 
 def custom_openapi():
     if app.openapi_schema:
@@ -80,4 +109,4 @@ app.openapi = custom_openapi
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8003)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8003)
@@ -0,0 +1,88 @@
+import time
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.db import connection
+from src.utils.metrics import registry, http_request_duration, http_requests
+
+router = APIRouter()
+
+# AsyncConnectionPool.get_stats() keys: point-in-time values are gauges, the rest are
+# counters that psycopg keeps accumulating for the life of the pool
+POOL_GAUGES = ("pool_min", "pool_max", "pool_size", "pool_available", "requests_waiting")
+POOL_COUNTERS = ("requests_num", "requests_queued", "requests_wait_ms", "requests_errors",
+                 "usage_ms", "returns_bad", "connections_num", "connections_ms",
+                 "connections_errors", "connections_lost")
+
+
+class PoolStatsCollector:
+    """Reads the pool and pool-controller state at scrape time, so requests pay nothing for it."""
+
+    def render(self, lines: list):
+        pool = connection.db_pool
+        if pool is None:
+            return
+        stats = pool.get_stats()
+        for key in POOL_GAUGES:
+            lines.append(f"# TYPE accip_db_{key} gauge")
+            lines.append(f"accip_db_{key} {stats.get(key, 0)}")
+        for key in POOL_COUNTERS:
+            lines.append(f"# TYPE accip_db_{key}_total counter")
+            lines.append(f"accip_db_{key}_total {stats.get(key, 0)}")
+        controller = connection.pool_controller
+        if controller is not None:
+            lines.append("# TYPE accip_db_pool_ceiling gauge")
+            lines.append(f"accip_db_pool_ceiling {controller.ceiling}")
+            lines.append("# TYPE accip_db_pool_resizes_total counter")
+            lines.append(f"accip_db_pool_resizes_total {controller.resize_count}")
+        replicas = connection.replica_set
+        if replicas is not None:
+            replica_stats = {host: replica_pool.get_stats() for host, replica_pool in replicas.pools.items()}
+            lines.append("# TYPE accip_db_replica_up gauge")
+            for host in replicas.pools:
+                lines.append(f'accip_db_replica_up{{host="{host}"}} {int(replicas.is_up(host))}')
+            for key in ("pool_size", "pool_available", "requests_waiting"):
+                lines.append(f"# TYPE accip_db_replica_{key} gauge")
+                for host, stats in replica_stats.items():
+                    lines.append(f'accip_db_replica_{key}{{host="{host}"}} {stats.get(key, 0)}')
+
+registry.register(PoolStatsCollector())
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing every request by its route template (never the raw path,
+    which would explode the label space) and counting responses by status code.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_code[0] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the (shared) scope
+            route = scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            key = (scope["method"], path)
+            http_request_duration.observe(key, time.perf_counter() - start)
+            http_requests.inc(key + (status_code[0],))
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,54 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+
+from config import *
+
+
+def page_limit(limit: int) -> int:
+    """The page size to use: what the client asked for, up to page_size_max."""
+    return min(limit, page_size_max)
+
+
+def encode_cursor(*key) -> str:
+    """Opaque cursor for the page after the row with sort key `key`."""
+    raw = json.dumps(jsonable_encoder(key), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], *types) -> Optional[tuple]:
+    """The sort key in `cursor`, each part converted by the matching entry of `types`."""
+    if not cursor:
+        return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(key, list) or len(key) != len(types):
+            raise ValueError("wrong number of key parts")
+        return tuple(convert(part) for convert, part in zip(types, key))
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def paginate(rows: list, limit: int, *key_fields):
+    """
+    Split `rows` (records from src/db/records.py), fetched with limit + 1, into the page and the cursor for the next one
+    (None on the last page), built from the page's last row.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(*(getattr(page[-1], field) for field in key_fields))
+
+
+# Sort keys of the paginated endpoints, and how to read each part back from a cursor
+FLIGHT_KEY = ("departure_time", "flight_number")
+FLIGHT_KEY_TYPES = (datetime.fromisoformat, str)
+TRIP_KEY = ("departure_time", "trip_id")
+TRIP_KEY_TYPES = (datetime.fromisoformat, str)
+OFFER_KEY = ("offer_id",)
+OFFER_KEY_TYPES = (str,)
@@ -0,0 +1,23 @@
+from decimal import Decimal
+
+import orjson
+from fastapi.encoders import decimal_encoder
+from fastapi.responses import JSONResponse
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return decimal_encoder(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered by orjson, the default for the boarding, flight and trip
+    routers. Routes with a response model (src/api/schemas.py) hand it JSON-ready data;
+    for anything else Decimals are encoded as jsonable_encoder would, and datetimes are
+    ISO 8601 as before.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,299 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Annotated, Dict, List, Literal, Optional, Union
+
+from fastapi.encoders import decimal_encoder
+from pydantic import BaseModel, PlainSerializer
+
+# Response models of the boarding, flight and trip routers. FastAPI serializes the
+# handlers' dicts through these in pydantic-core instead of jsonable_encoder; the output
+# is the same JSON as before.
+
+# Prices come back from psycopg as Decimal: encoded as a float, or an int when whole,
+# exactly as jsonable_encoder did
+Money = Annotated[Decimal, PlainSerializer(decimal_encoder, when_used="json")]
+
+
+class NotFound(BaseModel):
+    status: Literal["not_found"]
+
+
+# -- boarding ----------------------------------------------------------------------
+
+class BoardingPass(BaseModel):
+    gate: Optional[str]
+    seat: Optional[str]
+    boarding_time: Optional[datetime]
+    pdf_url: Optional[str]
+
+
+class BoardingPassResponse(BaseModel):
+    status: str
+    boarding_pass: BoardingPass
+
+
+class CheckedInBoardingPass(BaseModel):
+    gate: str
+    seat: str
+    boarding_time: datetime
+
+
+class CheckInResponse(BaseModel):
+    status: str
+    message: str
+    boarding_pass: CheckedInBoardingPass
+
+
+class ChosenSeat(BaseModel):
+    booking_id: str
+    flight_number: str
+    seat_number: str
+    additional_fee: Money
+
+
+class ChooseSeatResponse(BaseModel):
+    status: str
+    seat: ChosenSeat
+
+
+class ChangedSeat(BaseModel):
+    flight_number: str
+    seat_number: str
+    additional_fee: Optional[Money]
+
+
+class ChangeSeatResponse(BaseModel):
+    status: str
+    seat: ChangedSeat
+    policy: str
+
+
+# -- flights -----------------------------------------------------------------------
+
+class BookFlightResponse(BaseModel):
+    status: str
+    booking_id: str
+
+
+class Offer(BaseModel):
+    offer_id: str
+    description: Optional[str]
+    price: Money
+    discount: Optional[str]
+
+
+class OffersResponse(BaseModel):
+    status: str
+    offers: List[Offer]
+    next_cursor: Optional[str]
+
+
+class FlightPrices(BaseModel):
+    price: Money
+    availability: Optional[int]
+
+
+class FlightPricesResponse(BaseModel):
+    status: str
+    prices: FlightPrices
+
+
+class FlightReservation(BaseModel):
+    passenger_id: str
+    flight_number: str
+    booking_date: date
+    status: Optional[str]
+    total_price: Money
+    departure: str
+    destination: str
+
+
+class FlightReservationResponse(BaseModel):
+    status: str
+    reservation: FlightReservation
+
+
+class FlightStatus(BaseModel):
+    departure: str
+    destination: str
+    status: Optional[str]
+    departure_time: datetime
+    arrival_time: datetime
+    gate: Optional[str]
+
+
+class FlightStatusResponse(BaseModel):
+    status: str
+    flight_status: FlightStatus
+
+
+class BatchFlightPricesResponse(BaseModel):
+    status: str
+    prices: Dict[str, Union[FlightPrices, NotFound]]
+
+
+class BatchFlightReservationResponse(BaseModel):
+    status: str
+    reservations: Dict[str, Union[FlightReservation, NotFound]]
+
+
+class BatchFlightStatusResponse(BaseModel):
+    status: str
+    flight_status: Dict[str, Union[FlightStatus, NotFound]]
+
+
+class OverviewReservation(BaseModel):
+    booking_id: str
+    passenger_id: str
+    booking_date: date
+    status: Optional[str]
+    total_price: Money
+    currency: Optional[str]
+
+
+class OverviewFlight(BaseModel):
+    flight_number: str
+    departure: str
+    destination: str
+    departure_time: datetime
+    arrival_time: datetime
+    gate: Optional[str]
+    status: Optional[str]
+
+
+class OverviewSeat(BaseModel):
+    seat_number: str
+    additional_fee: Optional[Money]
+
+
+class OverviewInsurance(BaseModel):
+    insurance_id: str
+    coverage_type: str
+    coverage_amount: Money
+    premium: Money
+
+
+class BookingOverview(BaseModel):
+    reservation: OverviewReservation
+    flight: OverviewFlight
+    boarding_pass: Optional[BoardingPass]
+    seats: List[OverviewSeat]
+    insurance: List[OverviewInsurance]
+
+
+class BookingOverviewResponse(BaseModel):
+    status: str
+    booking: BookingOverview
+
+
+class FlightSearchResult(BaseModel):
+    flight_number: str
+    departure: str
+    destination: str
+    departure_time: datetime
+    price: Money
+    availability: Optional[int]
+
+
+class FlightSearchResponse(BaseModel):
+    status: str
+    flights: List[FlightSearchResult]
+    next_cursor: Optional[str]
+
+
+class CancelFlightResponse(BaseModel):
+    status: str
+    booking_status: str
+    policy: str
+
+
+class ChangedBooking(BaseModel):
+    passenger_id: str
+    flight_number: str
+    booking_date: date
+    status: Optional[str]
+    total_price: Money
+
+
+class ChangeFlightResponse(BaseModel):
+    status: str
+    booking: ChangedBooking
+    policy: str
+
+
+class InsuranceResponse(BaseModel):
+    status: str
+    insurance_id: str
+    terms: str
+
+
+class ArrivalTimeResponse(BaseModel):
+    status: str
+    arrival_time: datetime
+
+
+class DepartureTimeResponse(BaseModel):
+    status: str
+    departure_time: datetime
+
+
+# -- trips -------------------------------------------------------------------------
+
+class TripPrices(BaseModel):
+    total_price: Money
+
+
+class TripPricesResponse(BaseModel):
+    status: str
+    trip_prices: TripPrices
+
+
+class BookTripResponse(BaseModel):
+    status: str
+    trip_id: str
+
+
+class TripComponent(BaseModel):
+    component_type: str
+    flight_number: Optional[str]
+    price: Optional[Money]
+
+
+class TripDetails(BaseModel):
+    total_price: Money
+    status: Optional[str]
+    components: List[TripComponent]
+
+
+class TripDetailsResponse(BaseModel):
+    status: str
+    trip_details: TripDetails
+
+
+class TripPlanResponse(BaseModel):
+    status: str
+    trip_plan: List[TripComponent]
+
+
+class TripSearchResult(BaseModel):
+    trip_id: str
+    total_price: Money
+    departure_time: datetime
+
+
+class TripSearchResponse(BaseModel):
+    status: str
+    trips: List[TripSearchResult]
+    next_cursor: Optional[str]
+
+
+class CancelTripResponse(BaseModel):
+    status: str
+    trip_status: str
+    policy: str
+
+
+class ChangeTripResponse(BaseModel):
+    status: str
+    trip_component: TripComponent
+    policy: str
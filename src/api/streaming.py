@@ -0,0 +1,72 @@
+import json
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+from config import *
+from src.db.connection import connection_for
+from src.db.exceptions import DatabaseQueryError
+
+
+class NDJSONResponse(StreamingResponse):
+    """
+    Streams the chunks of an async generator and always closes `source` afterwards, also
+    when the client disconnects part-way through (or before the first chunk), so the
+    connection it holds goes back to the pool straight away instead of whenever the
+    generator is garbage collected.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def __init__(self, content, source, **kwargs):
+        super().__init__(content, **kwargs)
+        self.source = source
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.source.aclose()
+
+
+def ndjson_lines(rows: list) -> bytes:
+    """One JSON object per row; rows are records (src/db/records.py) or dicts."""
+    return "".join(json.dumps(jsonable_encoder(row._asdict() if isinstance(row, tuple) else row)) + "\n"
+                   for row in rows).encode()
+
+
+async def _batches(stream_func, *args):
+    # A named cursor only lives inside a transaction, and read connections are in autocommit
+    async with connection_for(stream_func) as conn:
+        async with conn.transaction():
+            async with conn.cursor(name="ndjson_stream") as cursor:
+                async for rows in stream_func(cursor, *args, stream_batch_size):
+                    yield ndjson_lines(rows)
+
+
+async def _chunks(first: bytes, batches):
+    try:
+        yield first
+        async for chunk in batches:
+            yield chunk
+    except DatabaseQueryError as e:
+        # The status line has gone out already; end the stream with a line saying it failed
+        yield ndjson_lines([{"status": "fail", "error": str(e)}])
+
+
+async def ndjson_response(stream_func, *args) -> NDJSONResponse:
+    """
+    Stream the rows of a model stream function (see stream_flights_data) as NDJSON, one
+    object per line, read through a server-side cursor a batch at a time. Memory stays
+    at one batch whatever the size of the result: the next batch is only fetched once
+    the client has taken the previous one.
+
+    The first batch is read before responding, so a failure to get a connection or run
+    the query still gets its own status code instead of a truncated 200.
+    """
+    batches = _batches(stream_func, *args)
+    try:
+        first = await batches.__anext__()
+    except StopAsyncIteration:
+        first = b""
+    return NDJSONResponse(_chunks(first, batches), batches)
@@ -0,0 +1,108 @@
+import asyncio
+from collections import deque
+from contextvars import ContextVar
+
+from psycopg_pool import PoolTimeout
+
+from config import *
+from src.db.exceptions import PoolSaturatedError
+from src.utils.metrics import registry, Counter
+
+admission_rejected = registry.register(Counter(
+    "accip_db_admission_rejected_total", "Requests refused a primary connection.", labels=("reason",)))
+
+# (critical, acquire deadline in seconds) for the route being served; set per request
+_route_policy = ContextVar("route_policy", default=(False, db_acquire_deadline))
+
+_critical_routes = frozenset(db_critical_routes)
+
+
+def policy_for_route(path: str):
+    """Admission policy for a route template: whether it is critical and its acquire deadline."""
+    critical = path in _critical_routes
+    default = db_critical_acquire_deadline if critical else db_acquire_deadline
+    return critical, float(db_route_acquire_deadlines.get(path, default))
+
+
+def set_route_policy(path: str):
+    _route_policy.set(policy_for_route(path))
+
+
+def route_policy():
+    return _route_policy.get()
+
+
+class AdmissionController:
+    """
+    Admission control in front of the primary pool.
+
+    A request is refused straight away when `max_waiting` requests are already queued,
+    and gives up once its route's acquire deadline passes; both surface as
+    PoolSaturatedError (a 503 with Retry-After). Non-critical requests may hold at most
+    `max_size - reserved` connections, so cheap lookups can never take the connections
+    critical writes such as book-flight and check-in rely on.
+    """
+
+    def __init__(self, max_waiting: int, reserved: int, retry_after: int = 1):
+        self.max_waiting = max_waiting
+        self.reserved = reserved
+        self.retry_after = retry_after
+        self.waiting = 0
+        self.non_critical_in_use = 0
+        self._slot_waiters = deque()
+
+    def non_critical_limit(self, pool) -> int:
+        return max(1, pool.max_size - self.reserved)
+
+    def _reject(self, reason: str, message: str):
+        admission_rejected.inc((reason,))
+        return PoolSaturatedError(message, retry_after=self.retry_after)
+
+    async def acquire(self, pool, critical: bool, deadline: float):
+        if self.waiting >= self.max_waiting:
+            raise self._reject("queue_full", "Too many requests waiting for a database connection")
+
+        loop = asyncio.get_running_loop()
+        give_up_at = loop.time() + deadline
+        self.waiting += 1
+        try:
+            if not critical:
+                await self._wait_for_slot(pool, give_up_at)
+                self.non_critical_in_use += 1
+            try:
+                return await pool.getconn(timeout=max(0.001, give_up_at - loop.time()))
+            except BaseException as e:
+                # Timed out, cancelled (client gone) or failed: the slot is not used
+                if not critical:
+                    self.release(False)
+                if isinstance(e, PoolTimeout):
+                    raise self._reject("deadline", "Timed out waiting for a database connection")
+                raise
+        finally:
+            self.waiting -= 1
+
+    async def _wait_for_slot(self, pool, give_up_at: float):
+        loop = asyncio.get_running_loop()
+        while self.non_critical_in_use >= self.non_critical_limit(pool):
+            remaining = give_up_at - loop.time()
+            if remaining <= 0:
+                raise self._reject("deadline", "Timed out waiting for a database connection")
+            waiter = loop.create_future()
+            self._slot_waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                raise self._reject("deadline", "Timed out waiting for a database connection")
+
+    def release(self, critical: bool):
+        if critical:
+            return
+        self.non_critical_in_use -= 1
+        while self._slot_waiters:
+            waiter = self._slot_waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+
+admission = AdmissionController(db_max_waiting, db_reserved_for_critical, db_retry_after)
@@ -0,0 +1,174 @@
+import json
+import time
+from collections import OrderedDict
+
+from config import *
+from src.db.routing import reads_from_primary
+from src.utils.metrics import registry, cache_requests, Gauge
+
+_sized_caches = []
+
+registry.register(Gauge(
+    "accip_cache_entries", "Entries held by the bounded in-process caches.", labels=("cache",),
+    collect=lambda: {(cache.name,): len(cache) for cache in _sized_caches}))
+
+
+class LRUCache:
+    """
+    Bounded per-worker cache: least recently used entries are evicted past `max_size`
+    and entries expire `ttl` seconds after they were loaded. Hits and misses are
+    counted under the cache's name in /metrics.
+    """
+
+    def __init__(self, name: str, max_size: int, ttl: float):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.generation = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._hit = (name, "hit")
+        self._miss = (name, "miss")
+        _sized_caches.append(self)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            cache_requests.inc(self._miss)
+            return None
+        self._entries.move_to_end(key)
+        cache_requests.inc(self._hit)
+        return entry[1]
+
+    def put(self, key, value, generation: int = None):
+        """
+        Store a loaded value. Pass the `generation` read before loading: if anything was
+        invalidated meanwhile the value may predate that change and is not stored.
+        """
+        if generation is not None and generation != self.generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        self.generation += 1
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
+
+
+class NegativeCache(LRUCache):
+    """
+    Lookups that found nothing, keyed by (kind, id), so repeated requests for an ID that
+    doesn't exist are answered 404 without a connection or a query. Handlers that create
+    the row call `created` after commit; other workers only learn of it when the entry
+    expires, so the TTL is kept short and read-your-writes requests skip the cache.
+    """
+
+    def known_missing(self, kind: str, key) -> bool:
+        return not reads_from_primary() and self.get((kind, key)) is not None
+
+    def record_missing(self, kind: str, key, generation: int):
+        self.put((kind, key), True, generation)
+
+    def created(self, kind: str, key):
+        self.invalidate((kind, key))
+
+
+class BookingOverviewCache(LRUCache):
+    """
+    /booking-overview documents keyed by booking_id. Handlers that change a booking, its
+    seats, boarding pass or insurance invalidate it after commit; a change to the flight
+    drops every overview of that flight.
+    """
+
+    def invalidate_flight(self, flight_number: str):
+        self.generation += 1
+        for key, (_, overview) in list(self._entries.items()):
+            if overview["flight"]["flight_number"] == flight_number:
+                del self._entries[key]
+
+
+class OfferCache:
+    """
+    Per-worker copy of the first page of each offer list, keyed by (offer_type, page size).
+
+    Entries are dropped when the trigger on Offers sends NOTIFY offers_changed, and expire
+    `ttl` seconds after they were loaded in case that trigger was never installed. The cache
+    only serves while the notification listener is connected, since a change made while it
+    was down would otherwise go unnoticed.
+    """
+
+    name = "offers"
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.enabled = False
+        self.generation = 0
+        self._offers = {}  # key -> (expires_at, offers)
+        self._hit = (self.name, "hit")
+        self._miss = (self.name, "miss")
+
+    def get(self, key):
+        entry = self._offers.get(key) if self.enabled else None
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._offers[key]
+            entry = None
+        cache_requests.inc(self._miss if entry is None else self._hit)
+        return None if entry is None else entry[1]
+
+    def put(self, key, offers: list, generation: int):
+        """Store a freshly loaded list, unless an invalidation arrived while it was loading."""
+        if self.enabled and generation == self.generation:
+            self._offers[key] = (time.monotonic() + self.ttl, offers)
+
+    def invalidate(self, payload: str = None):
+        self.generation += 1
+        self._offers.clear()
+
+    def enable(self):
+        self.invalidate()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        self.invalidate()
+
+
+offer_cache = OfferCache(offer_cache_ttl)
+
+# One row per flight serving /flight-status, /flight-prices, /arrival-time and /departure-time.
+# The TTL bounds how long another worker's booking can leave availability stale here.
+flight_snapshot_cache = LRUCache("flight_snapshot", flight_snapshot_cache_size, flight_snapshot_cache_ttl)
+
+booking_overview_cache = BookingOverviewCache(
+    "booking_overview", booking_overview_cache_size, booking_overview_cache_ttl)
+
+not_found_cache = NegativeCache("not_found", not_found_cache_size, not_found_cache_ttl)
+
+
+def invalidate_flight(payload: str):
+    flight_number = json.loads(payload).get("flight_number")
+    if flight_number is None:
+        flight_snapshot_cache.clear()
+        booking_overview_cache.clear()
+    else:
+        flight_snapshot_cache.invalidate(flight_number)
+        booking_overview_cache.invalidate_flight(flight_number)
+
+
+def subscribe_caches(listener):
+    """Wire the caches to the NOTIFY channels sent by the triggers in db_infra/scripts/migrations."""
+    listener.subscribe("offers_changed", offer_cache.invalidate)
+    # Also covers changes made through other workers, ahead of the snapshot TTL
+    listener.subscribe("flights_changed", invalidate_flight)
+    listener.on_connect(offer_cache.enable)
+    listener.on_disconnect(offer_cache.disable)
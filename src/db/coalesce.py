@@ -0,0 +1,68 @@
+import asyncio
+
+from config import *
+from src.db.connection import connection_for
+from src.db.routing import reads_from_primary
+from src.utils.metrics import registry, Counter
+
+db_coalesced = registry.register(Counter(
+    "accip_db_coalesced_total", "Reads that joined an identical query already in flight.", labels=("function",)))
+
+
+class SingleFlight:
+    """
+    Runs at most one load per key at a time: callers that arrive while a load for the
+    same key is in flight wait for it and get its result, or its exception. The key is
+    forgotten as soon as the load finishes, so nothing is kept past completion; callers
+    that want that put the result in a cache from inside the load.
+
+    The load runs as its own task, so a caller that is cancelled (client gone, deadline)
+    doesn't cancel the query the others are waiting on. Results are shared between the
+    callers and must not be mutated.
+    """
+
+    def __init__(self):
+        self._calls = {}
+
+    def __len__(self):
+        return len(self._calls)
+
+    async def do(self, key, load):
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(self._run(key, load))
+            task.add_done_callback(_retrieve_exception)
+        else:
+            db_coalesced.inc((key[0],))
+        return await asyncio.shield(task)
+
+    async def _run(self, key, load):
+        try:
+            return await load()
+        finally:
+            self._calls.pop(key, None)
+
+
+def _retrieve_exception(task):
+    # The waiters may all have been cancelled; don't let asyncio log the error as unretrieved
+    if not task.cancelled():
+        task.exception()
+
+
+single_flight = SingleFlight()
+
+
+async def coalesced_read(func, *args):
+    """
+    Run a read-only model function on its own connection, sharing the query with any
+    identical call already in flight. Calls made under read-your-writes only share with
+    each other, since the others may be answered from a replica.
+    """
+    async def load():
+        async with connection_for(func) as conn:
+            async with conn.cursor() as cursor:
+                return await func(cursor, *args)
+
+    if not db_coalesce_reads:
+        return await load()
+    return await single_flight.do((func.__name__, args, reads_from_primary()), load)
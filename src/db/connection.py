@@ -2,44 +2,173 @@ import os
 from psycopg_pool import AsyncConnectionPool
 from contextlib import asynccontextmanager
 from config import *
+from src.db.admission import admission, route_policy
+from src.db.cache import subscribe_caches
+from src.db.exceptions import PoolSaturatedError
+from src.db.listener import NotificationListener
+from src.db.pool_controller import PoolController
+from src.db.routing import ReplicaSet, is_read_only, reads_from_primary, use_primary_for_reads
+from src.db.statements import configure_connection
+
+
+def make_dsn(host: str, port: str) -> str:
+    return (
+        f"host={host} "
+        f"port={port} "
+        f"dbname={os.getenv(const_fieldname_db_name, db_name)} "
+        f"user={os.getenv(const_fieldname_db_user, db_user)} "
+        f"password={os.getenv(const_fieldname_db_pass, db_pass)}"
+    )
+
 
 # Construct DSN from environment or fallback to config values
-dsn = (
-    f"host={os.getenv(const_fieldname_db_host, db_host)} "
-    f"port={os.getenv(const_fieldname_db_port, db_port)} "
-    f"dbname={os.getenv(const_fieldname_db_name, db_name)} "
-    f"user={os.getenv(const_fieldname_db_user, db_user)} "
-    f"password={os.getenv(const_fieldname_db_pass, db_pass)}"
-)
+dsn = make_dsn(os.getenv(const_fieldname_db_host, db_host), os.getenv(const_fieldname_db_port, db_port))
+
 
+# Created in open_db_pool(): the pool needs a running event loop, and its size is
+# decided by the pool controller once the server's max_connections is known.
+db_pool = None
+pool_controller = None
+replica_set = None
 
-db_pool = AsyncConnectionPool(conninfo=dsn, max_size=20, min_size=5)
+# Dedicated LISTEN connection that keeps the in-process caches (src/db/cache.py) current
+listener = NotificationListener(dsn)
+subscribe_caches(listener)
+
+
+def make_replica_set():
+    """One small pool per configured read replica (db_replica_hosts), or None."""
+    if not db_replica_hosts:
+        return None
+    pools = {}
+    for entry in db_replica_hosts:
+        host, _, port = entry.partition(":")
+        pools[entry] = AsyncConnectionPool(
+            conninfo=make_dsn(host, port or os.getenv(const_fieldname_db_port, db_port)),
+            min_size=1,
+            max_size=db_replica_pool_max_size,
+            timeout=db_replica_timeout,
+            max_idle=db_pool_max_idle,
+            name=f"replica-{entry}",
+            configure=configure_connection,
+            open=False,
+        )
+    return ReplicaSet(pools, timeout=db_replica_timeout, retry_after=db_replica_retry_after)
 
 
 async def open_db_pool():
-    """Open the database connection pool"""
-    if db_pool:
-        await db_pool.open()
+    """Open the database connection pool and start its size controller"""
+    global db_pool, pool_controller, replica_set
+    if db_pool is None:
+        db_pool = AsyncConnectionPool(
+            conninfo=dsn,
+            min_size=db_pool_min_size,
+            max_size=max(db_pool_min_size, db_pool_max_size),
+            timeout=db_pool_timeout,
+            max_idle=db_pool_max_idle,
+            configure=configure_connection,
+            open=False,
+        )
+    await db_pool.open()
+    pool_controller = PoolController(
+        db_pool,
+        floor=db_pool_min_size,
+        configured_max=db_pool_max_size,
+        peers=db_workers * db_tasks,
+        reserved=db_reserved_connections,
+        interval=db_pool_tune_interval,
+        wait_threshold_ms=db_pool_wait_threshold_ms,
+    )
+    await pool_controller.start()
+    if replica_set is None:
+        replica_set = make_replica_set()
+    if replica_set:
+        await replica_set.open()
+    if db_listen_notifications:
+        listener.start()
 
 
 async def close_db_pool():
     """Close the database connection pool"""
+    global db_pool, pool_controller, replica_set
+    await listener.stop()
+    if replica_set:
+        await replica_set.close()
+        replica_set = None
+    if pool_controller:
+        await pool_controller.stop()
+        pool_controller = None
     if db_pool:
         await db_pool.close()
+        db_pool = None
 
 
 @asynccontextmanager
 async def get_db_connection():
     """
-    Acquire a connection from the async pool. (No changes needed here)
+    Acquire a connection from the async pool, subject to admission control: raises
+    PoolSaturatedError when the wait queue is full or the route's deadline passes.
     """
+    critical, deadline = route_policy()
     try:
-        conn = await db_pool.getconn()
+        conn = await admission.acquire(db_pool, critical, deadline)
+    except PoolSaturatedError:
+        raise
     except Exception as e:
         raise Exception(f"Failed to acquire DB connection: {e}")
-    
+
     try:
         yield conn
     finally:
         await db_pool.putconn(conn)
+        admission.release(critical)
+
+
+@asynccontextmanager
+async def get_read_connection(primary: bool = False):
+    """
+    Acquire a connection for lookups: from a read replica when one is configured and
+    healthy, otherwise (after a write in this request, or when asked with `primary`,
+    e.g. to refill a cache right after a change was announced) from the primary.
+
+    The connection runs in autocommit, so a SELECT is a single round trip with no
+    BEGIN/COMMIT around it; callers must not commit.
+    """
+    acquired = None
+    if replica_set is not None and not primary and not reads_from_primary():
+        acquired = await replica_set.getconn()
+    if acquired is None:
+        async with get_db_connection() as conn:
+            async with autocommit(conn):
+                yield conn
+        return
+
+    pool, conn = acquired
+    try:
+        async with autocommit(conn):
+            yield conn
+    finally:
+        await pool.putconn(conn)
 
+
+@asynccontextmanager
+async def autocommit(conn):
+    """Switch a pooled connection to autocommit, and back before it returns to the pool."""
+    # Both switches are client-side only: psycopg sends nothing to the server
+    await conn.set_autocommit(True)
+    try:
+        yield conn
+    finally:
+        if not conn.closed:
+            await conn.set_autocommit(False)
+
+
+def connection_for(*model_funcs):
+    """
+    Pick the connection for the model functions a handler is about to run: replicas for
+    functions marked read_only, the primary for anything that writes.
+    """
+    if is_read_only(*model_funcs):
+        return get_read_connection()
+    use_primary_for_reads()
+    return get_db_connection()
@@ -3,3 +3,10 @@ class DatabaseQueryError(Exception):
     def __init__(self, message: str, original_exception: Exception = None):
         super().__init__(message)
         self.original_exception = original_exception
+
+
+class PoolSaturatedError(Exception):
+    """Raised when a request is refused a DB connection because the pool is saturated."""
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
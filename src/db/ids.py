@@ -0,0 +1,53 @@
+import asyncio
+
+from config import *
+
+# Booking, trip and insurance IDs all live in VARCHAR(10) columns
+ID_LENGTH = 10
+ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def base36(value: int, width: int) -> str:
+    """`value` in upper-case base 36, zero-padded to `width` characters."""
+    if value < 0 or value >= 36 ** width:
+        raise ValueError(f"{value} does not fit in {width} base-36 digits")
+    digits = []
+    for _ in range(width):
+        value, digit = divmod(value, 36)
+        digits.append(ALPHABET[digit])
+    return "".join(reversed(digits))
+
+
+class IdAllocator:
+    """
+    Hands out unique IDs from blocks of numbers leased from id_block_seq
+    (db_infra/scripts/migrations/005_id_blocks.sql): block n covers n * block_size up to
+    (n + 1) * block_size - 1. Leasing a block is the only database round trip; a worker
+    that restarts abandons the rest of its block, which only leaves a gap.
+
+    IDs are the prefix plus the number in base 36, padded to the full column width, so
+    they never clash with the shorter IDs from earlier versions or the data generator.
+    """
+
+    def __init__(self, block_size: int):
+        self.block_size = block_size
+        self._next = 0
+        self._end = 0
+        self._lock = None  # created on first use, inside the running loop (Python 3.9)
+
+    async def next_id(self, prefix: str, fetch_block) -> str:
+        """`fetch_block` is a coroutine function returning the next block number."""
+        if self._next >= self._end:
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                # Another caller may have leased a block while this one waited
+                if self._next >= self._end:
+                    block = await fetch_block()
+                    self._next, self._end = block * self.block_size, (block + 1) * self.block_size
+        value = self._next
+        self._next += 1
+        return prefix + base36(value, ID_LENGTH - len(prefix))
+
+
+id_allocator = IdAllocator(id_block_size)
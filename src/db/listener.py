@@ -0,0 +1,82 @@
+import asyncio
+import logging
+
+from psycopg import AsyncConnection, sql
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationListener:
+    """
+    Holds one dedicated autocommit connection to the primary (replicas don't deliver
+    NOTIFY) that LISTENs on the subscribed channels and hands each payload to the
+    channel's callbacks.
+
+    Notifications sent while the connection is down are lost, so `on_disconnect`
+    callbacks run when it drops and `on_connect` callbacks run every time it is
+    (re)established; caches use them to stop serving and to start again from empty.
+    """
+
+    def __init__(self, conninfo: str, retry_interval: float = 5.0):
+        self.conninfo = conninfo
+        self.retry_interval = retry_interval
+        self.connected = False
+        self._channels = {}
+        self._on_connect = []
+        self._on_disconnect = []
+        self._task = None
+
+    def subscribe(self, channel: str, callback):
+        self._channels.setdefault(channel, []).append(callback)
+
+    def on_connect(self, callback):
+        self._on_connect.append(callback)
+
+    def on_disconnect(self, callback):
+        self._on_disconnect.append(callback)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._set_disconnected()
+
+    async def _run(self):
+        while True:
+            try:
+                conn = await AsyncConnection.connect(self.conninfo, autocommit=True)
+                async with conn:
+                    for channel in self._channels:
+                        await conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(channel)))
+                    self.connected = True
+                    for callback in self._on_connect:
+                        callback()
+                    async for notify in conn.notifies():
+                        self.dispatch(notify.channel, notify.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("notification listener disconnected: %s", e)
+            self._set_disconnected()
+            await asyncio.sleep(self.retry_interval)
+
+    def _set_disconnected(self):
+        if self.connected:
+            self.connected = False
+            for callback in self._on_disconnect:
+                callback()
+
+    def dispatch(self, channel: str, payload: str):
+        for callback in self._channels.get(channel, ()):
+            try:
+                callback(payload)
+            except Exception as e:
+                logger.warning("notification callback for %s failed: %s", channel, e)
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+def compute_ceiling(max_connections, peers: int, reserved: int, configured_max: int, floor: int) -> int:
+    """
+    Largest pool this worker may grow to: its share of the server's max_connections
+    (minus the reserved headroom) split across every worker and task, capped by configuration.
+    """
+    if not max_connections:
+        return max(floor, configured_max)
+    share = (max_connections - reserved) // max(1, peers)
+    return max(floor, min(configured_max, share))
+
+
+class PoolController:
+    """
+    Sizes a worker's connection pool from configuration plus live pool statistics.
+
+    The pool itself opens connections on demand up to its max_size and closes connections
+    that stayed idle for max_idle, so the controller only moves that cap: it raises it in steps
+    while requests keep waiting for a connection and lowers it again once the pool has been idle
+    for a while. Every resize is logged and kept in `history` so it can be reported.
+    """
+
+    def __init__(self, pool, floor: int, configured_max: int, peers: int = 1, reserved: int = 0,
+                 interval: float = 5.0, wait_threshold_ms: float = 50.0, step: int = 2,
+                 grow_after: int = 2, shrink_after: int = 6, history_size: int = 50):
+        self.pool = pool
+        self.floor = floor
+        self.configured_max = configured_max
+        self.peers = peers
+        self.reserved = reserved
+        self.interval = interval
+        self.wait_threshold_ms = wait_threshold_ms
+        self.step = step
+        self.grow_after = grow_after
+        self.shrink_after = shrink_after
+        self.server_max_connections = None
+        self.ceiling = max(floor, configured_max)
+        self.history = deque(maxlen=history_size)
+        self.resize_count = 0
+        self._pressure_ticks = 0
+        self._idle_ticks = 0
+        self._last_queued = 0
+        self._last_wait_ms = 0
+        self._task = None
+
+    async def start(self):
+        """Read the server limit, apply the initial size and start the tuning loop."""
+        self.server_max_connections = await self._fetch_max_connections()
+        self.ceiling = compute_ceiling(self.server_max_connections, self.peers, self.reserved,
+                                       self.configured_max, self.floor)
+        stats = self.pool.get_stats()
+        self._last_queued = stats.get("requests_queued", 0)
+        self._last_wait_ms = stats.get("requests_wait_ms", 0)
+        # Start in the middle of the allowed range and let load move it from there
+        initial = max(self.floor, min(self.ceiling, (self.floor + self.ceiling + 1) // 2))
+        await self._resize(initial, "startup")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _fetch_max_connections(self):
+        try:
+            async with self.pool.connection(timeout=self.pool.timeout) as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute("SHOW max_connections")
+                    row = await cursor.fetchone()
+                    return int(row[0])
+        except Exception as e:
+            logger.warning("could not read max_connections, using configured pool size: %s", e)
+            return None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.tune(self.pool.get_stats())
+            except Exception as e:
+                logger.warning("pool tuning failed: %s", e)
+
+    async def tune(self, stats: dict):
+        """Apply one tuning step from a `get_stats()` sample; returns the new cap if it changed."""
+        queued = stats.get("requests_queued", 0) - self._last_queued
+        wait_ms = stats.get("requests_wait_ms", 0) - self._last_wait_ms
+        self._last_queued = stats.get("requests_queued", 0)
+        self._last_wait_ms = stats.get("requests_wait_ms", 0)
+        avg_wait_ms = wait_ms / queued if queued > 0 else 0.0
+
+        waiting = stats.get("requests_waiting", 0)
+        size = stats.get("pool_size", 0)
+        available = stats.get("pool_available", 0)
+        current_max = stats.get("pool_max", self.pool.max_size)
+
+        if waiting > 0 or avg_wait_ms > self.wait_threshold_ms:
+            self._pressure_ticks += 1
+            self._idle_ticks = 0
+        elif queued == 0 and size - available + self.step < current_max:
+            self._idle_ticks += 1
+            self._pressure_ticks = 0
+        else:
+            self._pressure_ticks = 0
+            self._idle_ticks = 0
+
+        if self._pressure_ticks >= self.grow_after and current_max < self.ceiling:
+            self._pressure_ticks = 0
+            new_max = min(self.ceiling, current_max + self.step)
+            return await self._resize(new_max, f"waiting={waiting} avg_wait_ms={avg_wait_ms:.1f}")
+        if self._idle_ticks >= self.shrink_after and current_max > self.floor:
+            self._idle_ticks = 0
+            new_max = max(self.floor, current_max - self.step)
+            return await self._resize(new_max, f"idle in_use={size - available}")
+        return None
+
+    async def _resize(self, new_max: int, reason: str):
+        old_max = self.pool.max_size
+        if new_max == old_max:
+            return None
+        await self.pool.resize(min(self.floor, new_max), new_max)
+        self.history.append({"at": time.time(), "from": old_max, "to": new_max, "reason": reason})
+        self.resize_count += 1
+        logger.info("db pool max_size %s -> %s (%s, ceiling=%s)", old_max, new_max, reason, self.ceiling)
+        return new_max
+
+    def snapshot(self) -> dict:
+        """Current sizing state, for health and metrics reporting."""
+        return {
+            "floor": self.floor,
+            "ceiling": self.ceiling,
+            "max_size": self.pool.max_size,
+            "server_max_connections": self.server_max_connections,
+            "peers": self.peers,
+            "resizes": list(self.history),
+        }
@@ -0,0 +1,154 @@
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from psycopg import AsyncCursor
+
+# Rows as the model functions return them. Named tuples: no per-instance dict, read by
+# field name in the routers (and by position where that is simpler), and accepted as
+# they are by the response models in src/api/schemas.py.
+
+
+class BoardingPassRow(NamedTuple):
+    booking_id: str
+    name: str
+    flight_number: str
+    departure: str
+    destination: str
+    gate: Optional[str]
+    seat: Optional[str]
+    boarding_time: Optional[datetime]
+    pdf_url: Optional[str]
+    version: str
+
+
+class BookedSeatRow(NamedTuple):
+    seat_id: int
+    booking_id: str
+    flight_number: str
+    seat_number: str
+    additional_fee: Optional[Decimal]
+    currency: Optional[str]
+
+
+class BookingRow(NamedTuple):
+    passenger_id: str
+    flight_number: str
+    booking_date: date
+    status: Optional[str]
+    total_price: Decimal
+
+
+class FlightReservationRow(NamedTuple):
+    passenger_id: str
+    flight_number: str
+    booking_date: date
+    status: Optional[str]
+    total_price: Decimal
+    departure: str
+    destination: str
+    version: str
+    booking_id: str
+
+
+class FlightRow(NamedTuple):
+    """A search_flights / route_index row."""
+    flight_number: str
+    departure: str
+    destination: str
+    departure_time: datetime
+    price: Decimal
+    availability: Optional[int]
+
+
+class FlightSnapshotRow(NamedTuple):
+    flight_number: str
+    departure: str
+    destination: str
+    departure_time: datetime
+    arrival_time: datetime
+    gate: Optional[str]
+    status: Optional[str]
+    price: Decimal
+    availability: Optional[int]
+
+
+class OfferRow(NamedTuple):
+    offer_id: str
+    description: Optional[str]
+    price: Decimal
+    discount: Optional[str]
+
+
+class SeatRow(NamedTuple):
+    flight_number: str
+    seat_number: str
+    additional_fee: Optional[Decimal]
+
+
+class TripComponentRow(NamedTuple):
+    component_type: str
+    flight_number: Optional[str]
+    price: Optional[Decimal]
+
+
+class TripPriceRow(NamedTuple):
+    total_price: Decimal
+
+
+class TripRow(NamedTuple):
+    """A search_trips row."""
+    trip_id: str
+    total_price: Decimal
+    departure_time: datetime
+
+
+class TripSummaryRow(NamedTuple):
+    total_price: Decimal
+    status: Optional[str]
+    version: str
+
+
+@lru_cache(maxsize=None)
+def record_row(record):
+    """
+    psycopg row factory making a `record` straight from the values psycopg loaded for
+    each row, without the plain tuple (or dict) in between.
+    """
+    make = tuple.__new__
+
+    def row_maker(cursor):
+        description = cursor.description
+        if description is not None and len(description) != len(record._fields):
+            raise TypeError(f"{record.__name__} has {len(record._fields)} fields, the result {len(description)} columns")
+        return lambda values: make(record, values)
+
+    return row_maker
+
+
+async def fetchone(cursor: AsyncCursor, record):
+    previous = cursor.row_factory
+    cursor.row_factory = record_row(record)
+    try:
+        return await cursor.fetchone()
+    finally:
+        cursor.row_factory = previous
+
+
+async def fetchall(cursor: AsyncCursor, record) -> list:
+    previous = cursor.row_factory
+    cursor.row_factory = record_row(record)
+    try:
+        return await cursor.fetchall()
+    finally:
+        cursor.row_factory = previous
+
+
+async def fetchmany(cursor: AsyncCursor, record, size: int) -> list:
+    previous = cursor.row_factory
+    cursor.row_factory = record_row(record)
+    try:
+        return await cursor.fetchmany(size)
+    finally:
+        cursor.row_factory = previous
@@ -0,0 +1,221 @@
+import asyncio
+import json
+import logging
+import sys
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from decimal import Decimal
+
+from config import *
+from src.db.connection import get_read_connection, listener
+from src.db.models import get_route_index_data
+from src.db.records import FlightRow
+from src.db.routing import reads_from_primary
+from src.utils.metrics import registry, Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+route_index_mismatches = registry.register(Counter(
+    "accip_route_index_mismatches_total", "Flights found out of step with the database by the route index check."))
+
+
+class RouteIndex:
+    """
+    In-process copy of the searchable Flights columns, by (departure, destination), with
+    each route's flights kept sorted by (departure_time, flight_number), the search's
+    page order, so a date-range search or the page after a cursor is a binary search
+    plus a slice.
+
+    It is loaded whole every time the notification listener (re)connects and then kept
+    current from the flights_changed NOTIFY payloads, which carry the changed row.
+    Notifications arriving during a load are queued and replayed on top of it, in commit
+    order. Searches fall back to the database whenever the index isn't ready.
+    """
+
+    def __init__(self, loader, verify_interval: float = 0):
+        self.loader = loader
+        self.verify_interval = verify_interval
+        self.ready = False
+        self._routes = {}  # (departure, destination) -> ([(departure_time, flight_number), ...], [FlightRow, ...])
+        self._flights = {}  # flight_number -> FlightRow
+        self._pending = None
+        self._task = None
+
+    def __len__(self):
+        return len(self._flights)
+
+    # -- searching -----------------------------------------------------------------
+
+    def search(self, departure: str, destination: str, date: str, after: tuple = None, limit: int = None):
+        """
+        Like search_flights_data: flights on the route leaving on or after `date`, after the
+        (departure_time, flight_number) key `after`, at most `limit` of them. None means ask
+        the database.
+        """
+        if not self.ready or reads_from_primary():
+            return None
+        try:
+            since = datetime.fromisoformat(f"{date} 00:00:00")
+        except ValueError:
+            return None
+        route = self._routes.get((departure, destination))
+        if route is None:
+            return []
+        keys, rows = route
+        start = bisect_right(keys, after) if after else bisect_left(keys, (since, ""))
+        end = None if limit is None else start + limit
+        return rows[start:end]
+
+    # -- maintenance ---------------------------------------------------------------
+
+    def build(self, rows):
+        self._routes = {}
+        self._flights = {}
+        for row in sorted(rows, key=_sort_key):
+            self._flights[row[0]] = row
+            keys, route_rows = self._routes.setdefault((row[1], row[2]), ([], []))
+            keys.append(_sort_key(row))
+            route_rows.append(row)
+
+    def upsert(self, row):
+        self.remove(row[0])
+        self._flights[row[0]] = row
+        keys, rows = self._routes.setdefault((row[1], row[2]), ([], []))
+        key = _sort_key(row)
+        position = bisect_left(keys, key)
+        keys.insert(position, key)
+        rows.insert(position, row)
+
+    def remove(self, flight_number: str):
+        row = self._flights.pop(flight_number, None)
+        if row is None:
+            return
+        route = (row[1], row[2])
+        keys, rows = self._routes[route]
+        position = bisect_left(keys, _sort_key(row))
+        del keys[position]
+        del rows[position]
+        if not keys:
+            del self._routes[route]
+
+    def notify(self, payload: str):
+        """flights_changed callback; queued while a load is running."""
+        if self._pending is not None:
+            self._pending.append(payload)
+        elif self.ready:
+            self.apply(payload)
+
+    def apply(self, payload: str):
+        change = json.loads(payload, parse_float=Decimal)
+        if change["op"] == "TRUNCATE":
+            self.build(())
+        elif change["op"] == "DELETE":
+            self.remove(change["flight_number"])
+        else:
+            self.upsert(_row_from_payload(change))
+
+    async def load(self):
+        self._pending = []
+        try:
+            rows = await self.loader()
+            self.build(rows)
+            for payload in self._pending:
+                self.apply(payload)
+            self.ready = True
+            logger.info("route index loaded: %d flights on %d routes", len(self._flights), len(self._routes))
+        except Exception as e:
+            self.ready = False
+            logger.warning("loading the route index failed, searches use the database: %s", e)
+        finally:
+            self._pending = None
+
+    async def verify(self) -> dict:
+        """
+        Compare the index with the database. Differences are counted, logged and fixed by
+        reloading; a few can be transient, from changes whose NOTIFY is still in flight.
+        """
+        rows = await self.loader()
+        current = {row[0]: row for row in rows}
+        report = {
+            "missing": sorted(current.keys() - self._flights.keys()),
+            "extra": sorted(self._flights.keys() - current.keys()),
+            "stale": sorted(number for number, row in current.items()
+                            if number in self._flights and self._flights[number] != row),
+        }
+        mismatches = sum(len(numbers) for numbers in report.values())
+        if mismatches:
+            route_index_mismatches.inc((), mismatches)
+            logger.warning("route index out of step with the database: %s", report)
+            await self.load()
+        return report
+
+    async def verify_forever(self):
+        while True:
+            await asyncio.sleep(self.verify_interval)
+            if self.ready:
+                try:
+                    await self.verify()
+                except Exception as e:
+                    logger.warning("route index check failed: %s", e)
+
+    def memory_bytes(self) -> int:
+        """Approximate size of the index's containers and rows (shared values counted once per row)."""
+        total = sys.getsizeof(self._routes) + sys.getsizeof(self._flights)
+        for route, (keys, rows) in self._routes.items():
+            total += sys.getsizeof(route) + sys.getsizeof(keys) + sys.getsizeof(rows)
+            for key, row in zip(keys, rows):
+                total += sys.getsizeof(key) + sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+        return total
+
+    # -- wiring --------------------------------------------------------------------
+
+    def subscribe(self, listener):
+        listener.subscribe("flights_changed", self.notify)
+        listener.on_connect(self._start)
+        listener.on_disconnect(self._stop)
+
+    def _start(self):
+        self._stop()
+        self._task = asyncio.ensure_future(self._run())
+
+    def _stop(self):
+        self.ready = False
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        await self.load()
+        if self.verify_interval:
+            await self.verify_forever()
+
+
+def _sort_key(row):
+    return row[3], row[0]
+
+
+def _row_from_payload(change: dict):
+    # Same columns and types as get_route_index_data returns
+    return FlightRow(
+        change["flight_number"], change["departure"], change["destination"],
+        datetime.fromisoformat(change["departure_time"]), change["price"], change["availability"],
+    )
+
+
+async def load_flights():
+    # From the primary, which is where the NOTIFY payloads replayed on top come from
+    async with get_read_connection(primary=True) as conn:
+        async with conn.cursor() as cursor:
+            return await get_route_index_data(cursor)
+
+
+route_index = RouteIndex(load_flights, verify_interval=route_index_verify_interval)
+if route_index_enabled:
+    route_index.subscribe(listener)
+
+registry.register(Gauge(
+    "accip_route_index_flights", "Flights held by the in-process route index.",
+    collect=lambda: {(): len(route_index)} if route_index.ready else {}))
+registry.register(Gauge(
+    "accip_route_index_bytes", "Approximate memory used by the in-process route index.",
+    collect=lambda: {(): route_index.memory_bytes()} if route_index.ready else {}))
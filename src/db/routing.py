@@ -0,0 +1,88 @@
+import logging
+import time
+from contextvars import ContextVar
+
+from psycopg import OperationalError
+from psycopg_pool import PoolTimeout
+
+logger = logging.getLogger(__name__)
+
+# Set for the rest of a request once it has written, or when the client asks for
+# read-your-writes, so its reads see the primary rather than a lagging replica.
+_reads_from_primary = ContextVar("reads_from_primary", default=False)
+
+
+def read_only(func):
+    """Mark a model function as a pure lookup that may be served by a read replica."""
+    func.read_only = True
+    return func
+
+
+def is_read_only(*funcs) -> bool:
+    return all(getattr(func, "read_only", False) is True for func in funcs)
+
+
+def use_primary_for_reads():
+    """Route every later read in the current request context to the primary."""
+    _reads_from_primary.set(True)
+
+
+def reads_from_primary() -> bool:
+    return _reads_from_primary.get()
+
+
+def holds_connections(pool) -> bool:
+    """Whether the pool has any connection open, in use or idle."""
+    return pool.get_stats().get("pool_size", 0) > 0
+
+
+class ReplicaSet:
+    """
+    Round-robin over read-replica pools. A replica that can't connect is skipped for
+    `retry_after` seconds; one that is only busy (no free connection within `timeout`)
+    is passed over for this request alone. When none is usable the caller falls back to
+    the primary.
+
+    The pool raises PoolTimeout in both cases, so they are told apart by what it holds:
+    replica pools keep min_size=1, so one without any connection can't reach its server.
+    """
+
+    def __init__(self, pools: dict, timeout: float = 2.0, retry_after: float = 30.0):
+        self.pools = pools  # host -> AsyncConnectionPool
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.down_until = {}
+        self._next = 0
+
+    async def open(self):
+        for pool in self.pools.values():
+            # Don't wait for the minimum connections: a replica being down must not block startup
+            await pool.open(wait=False)
+
+    async def close(self):
+        for pool in self.pools.values():
+            await pool.close()
+
+    def is_up(self, host: str) -> bool:
+        return self.down_until.get(host, 0) <= time.monotonic()
+
+    async def getconn(self):
+        """Return (pool, connection) from the next healthy replica, or None."""
+        hosts = list(self.pools)
+        start = self._next
+        self._next = (self._next + 1) % max(1, len(hosts))
+        for i in range(len(hosts)):
+            host = hosts[(start + i) % len(hosts)]
+            if not self.is_up(host):
+                continue
+            pool = self.pools[host]
+            try:
+                return pool, await pool.getconn(timeout=self.timeout)
+            except OperationalError as e:
+                if isinstance(e, PoolTimeout) and holds_connections(pool):
+                    # Saturated, not broken: try the next one but keep this replica in rotation
+                    logger.info("read replica %s busy: %s", host, e)
+                    continue
+                self.down_until[host] = time.monotonic() + self.retry_after
+                logger.warning("read replica %s unavailable for %ss: %s", host, self.retry_after, e)
+        return None
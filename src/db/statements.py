@@ -0,0 +1,197 @@
+from psycopg import AsyncCursor, AsyncServerCursor
+from config import *
+
+# Every statement src/db/models.py runs, by name. Keeping them in one registry lets
+# psycopg prepare each one server-side the first time a pooled connection runs it
+# and execute it by handle afterwards, and gives tests a complete list to EXPLAIN.
+# Row versions behind the ETags in src/api/etag.py: the xmin of every row a response is
+# built from, so any committed change to one of them yields a different version.
+BOARDING_PASS_VERSION = (
+    "(SELECT string_agg(v.xmin::text, '.' ORDER BY v.ctid) FROM Boarding_Passes v WHERE v.booking_id = {booking_id})"
+)
+RESERVATION_VERSION = "b.xmin::text || '.' || f.xmin::text"
+TRIP_VERSION = (
+    "t.xmin::text || ':' || coalesce((SELECT string_agg(c.xmin::text, '.' ORDER BY c.ctid) "
+    "FROM Trip_Components c WHERE c.trip_id = t.trip_id), '')"
+)
+
+STATEMENTS = {
+    "boarding_pass": f"""
+            SELECT b.booking_id, p.name, f.flight_number, f.departure, f.destination,
+                   bp.gate, bp.seat, bp.boarding_time, bp.pdf_url,
+                   {BOARDING_PASS_VERSION.format(booking_id="b.booking_id")}
+            FROM Bookings b
+            JOIN Passengers p ON b.passenger_id = p.passenger_id
+            JOIN Flights f ON b.flight_number = f.flight_number
+            JOIN Boarding_Passes bp ON b.booking_id = bp.booking_id
+            WHERE b.booking_id = %s
+            """,
+    # Everything about one booking as a JSON document built by the server: one round trip
+    # instead of the reservation, boarding pass, seat and insurance lookups. Subqueries
+    # rather than joins, so several seats and policies don't multiply each other's rows.
+    "booking_overview": """
+            SELECT json_build_object(
+                'reservation', json_build_object(
+                    'booking_id', b.booking_id, 'passenger_id', b.passenger_id, 'booking_date', b.booking_date,
+                    'status', b.status, 'total_price', b.total_price, 'currency', b.currency),
+                'flight', json_build_object(
+                    'flight_number', f.flight_number, 'departure', f.departure, 'destination', f.destination,
+                    'departure_time', f.departure_time, 'arrival_time', f.arrival_time, 'gate', f.gate,
+                    'status', f.status),
+                'boarding_pass', (
+                    SELECT json_build_object('gate', bp.gate, 'seat', bp.seat, 'boarding_time', bp.boarding_time,
+                                             'pdf_url', bp.pdf_url)
+                    FROM Boarding_Passes bp WHERE bp.booking_id = b.booking_id
+                    ORDER BY bp.created_at DESC LIMIT 1),
+                'seats', coalesce((
+                    SELECT json_agg(json_build_object('seat_number', s.seat_number, 'additional_fee', s.additional_fee)
+                                    ORDER BY s.seat_id)
+                    FROM Seats s WHERE s.booking_id = b.booking_id), '[]'),
+                'insurance', coalesce((
+                    SELECT json_agg(json_build_object('insurance_id', i.insurance_id, 'coverage_type', i.coverage_type,
+                                                      'coverage_amount', i.coverage_amount, 'premium', i.premium)
+                                    ORDER BY i.insurance_id)
+                    FROM Insurance i WHERE i.booking_id = b.booking_id), '[]'))
+            FROM Bookings b
+            JOIN Flights f ON b.flight_number = f.flight_number
+            WHERE b.booking_id = %s
+            """,
+    "check_in_booking": "UPDATE Bookings SET status = 'Checked In' WHERE booking_id = %s",
+    # IDs come from boarding_pass_id_seq (db_infra/scripts/migrations/004_boarding_pass_sequence.sql):
+    # BP001 ... BP999, then BP1000 and so on (lpad cuts longer text down to the width, so
+    # the width grows with the number)
+    "insert_boarding_pass":
+        "INSERT INTO Boarding_Passes (boarding_pass_id, booking_id, gate, seat, boarding_time, pdf_url) "
+        "SELECT 'BP' || lpad(n::text, greatest(3, length(n::text)), '0'), %s, %s, %s, %s, %s "
+        "FROM (SELECT nextval('boarding_pass_id_seq') AS n) seq "
+        "RETURNING boarding_pass_id",
+    # One round trip: take a seat only if one is left (the row lock makes concurrent bookings
+    # queue on the flight, and each re-checks availability > 0 once it gets the row), then
+    # insert the booking at the price the seat was taken at.
+    "book_flight": """
+            WITH seat AS (
+                UPDATE Flights SET availability = availability - 1
+                WHERE flight_number = %(flight_number)s AND availability > 0
+                RETURNING price
+            )
+            INSERT INTO Bookings (booking_id, passenger_id, flight_number, booking_date, status, total_price)
+            SELECT %(booking_id)s, %(passenger_id)s, %(flight_number)s, %(booking_date)s, 'Confirmed', price
+            FROM seat
+            RETURNING booking_id
+            """,
+    # Keyset pages (src/api/pagination.py): rows after the previous page's last sort key,
+    # in sort-key order; the indexes from migrations/007 make each one a range scan.
+    "flight_offers":
+        "SELECT offer_id, description, price, discount FROM Offers "
+        "WHERE offer_type = 'Flight' AND offer_id > %s ORDER BY offer_id LIMIT %s",
+    "flight_reservation":
+        f"SELECT b.passenger_id, b.flight_number, b.booking_date, b.status, b.total_price, f.departure, f.destination, "
+        f"{RESERVATION_VERSION}, b.booking_id FROM Bookings b JOIN Flights f ON b.flight_number = f.flight_number "
+        f"WHERE b.booking_id = %s",
+    "flight_reservation_version":
+        f"SELECT {RESERVATION_VERSION} FROM Bookings b JOIN Flights f ON b.flight_number = f.flight_number "
+        "WHERE b.booking_id = %s",
+    "flight_status":
+        "SELECT departure, destination, status, departure_time, arrival_time, gate FROM Flights WHERE flight_number = %s",
+    "flight_snapshot":
+        "SELECT flight_number, departure, destination, departure_time, arrival_time, gate, status, price, availability "
+        "FROM Flights WHERE flight_number = %s",
+    # Batch lookups: one round trip for a list of IDs, same columns as the single-row versions
+    "flight_snapshots":
+        "SELECT flight_number, departure, destination, departure_time, arrival_time, gate, status, price, availability "
+        "FROM Flights WHERE flight_number = ANY(%s)",
+    "flight_reservations":
+        f"SELECT b.passenger_id, b.flight_number, b.booking_date, b.status, b.total_price, f.departure, f.destination, "
+        f"{RESERVATION_VERSION}, b.booking_id FROM Bookings b JOIN Flights f ON b.flight_number = f.flight_number "
+        f"WHERE b.booking_id = ANY(%s)",
+    "route_index": "SELECT flight_number, departure, destination, departure_time, price, availability FROM Flights",
+    "search_flights":
+        "SELECT flight_number, departure, destination, departure_time, price, availability FROM Flights "
+        "WHERE departure = %s AND destination = %s AND (departure_time, flight_number) > (%s, %s) "
+        "ORDER BY departure_time, flight_number LIMIT %s",
+    "trip_price": "SELECT total_price FROM Trips WHERE trip_id = %s",
+    "insert_seat":
+        "INSERT INTO Seats (booking_id, flight_number, seat_number, additional_fee) VALUES (%s, %s, %s, %s)",
+    "random_flight": "SELECT flight_number FROM Flights ORDER BY RANDOM() LIMIT 1",
+    "insert_trip": "INSERT INTO Trips (trip_id, passenger_id, total_price) VALUES (%s, %s, %s)",
+    "insert_trip_component":
+        "INSERT INTO Trip_Components (trip_id, component_type, flight_number, price) VALUES (%s, %s, %s, %s)",
+    "trip_summary": f"SELECT t.total_price, t.status, {TRIP_VERSION} FROM Trips t WHERE t.trip_id = %s",
+    "trip_version": f"SELECT {TRIP_VERSION} FROM Trips t WHERE t.trip_id = %s",
+    "trip_components": "SELECT component_type, flight_number, price FROM Trip_Components WHERE trip_id = %s",
+    "trip_offers":
+        "SELECT offer_id, description, price, discount FROM Offers "
+        "WHERE offer_type = 'Trip' AND offer_id > %s ORDER BY offer_id LIMIT %s",
+    "search_trips":
+        "SELECT t.trip_id, t.total_price, f.departure_time FROM Trips t JOIN Trip_Components tc ON t.trip_id = tc.trip_id "
+        "JOIN Flights f ON tc.flight_number = f.flight_number WHERE f.departure = %s AND f.destination = %s "
+        "AND f.departure_time >= %s AND (f.departure_time, t.trip_id) > (%s, %s) "
+        "ORDER BY f.departure_time, t.trip_id LIMIT %s",
+    "cancel_booking": "UPDATE Bookings SET status = 'Cancelled' WHERE booking_id = %s",
+    "change_booking_flight": "UPDATE Bookings SET flight_number = %s WHERE booking_id = %s",
+    "booking":
+        "SELECT passenger_id, flight_number, booking_date, status, total_price FROM Bookings WHERE booking_id = %s",
+    "insert_booking_insurance":
+        "INSERT INTO Insurance (insurance_id, booking_id, coverage_type, coverage_amount, premium) "
+        "VALUES (%s, %s, %s, %s, %s)",
+    "refund_booking": "UPDATE Bookings SET status = 'Refunded' WHERE booking_id = %s",
+    "change_seat": "UPDATE Seats SET seat_number = %s WHERE booking_id = %s",
+    "booking_seat": "SELECT flight_number, seat_number, additional_fee FROM Seats WHERE booking_id = %s",
+    "cancel_trip": "UPDATE Trips SET status = 'Cancelled' WHERE trip_id = %s",
+    "change_trip_flight":
+        "UPDATE Trip_Components SET flight_number = %s WHERE trip_id = %s AND component_type = 'Flight'",
+    "insert_trip_insurance":
+        "INSERT INTO Insurance (insurance_id, trip_id, coverage_type, coverage_amount, premium) "
+        "VALUES (%s, %s, %s, %s, %s)",
+    # Idempotency-Key claims and stored responses (src/api/idempotency.py). The claim's
+    # INSERT waits on an uncommitted claim of the same key, so parallel duplicates run one
+    # at a time; it returns nothing when the key is taken and still fresh.
+    "claim_idempotency_key": """
+            INSERT INTO Idempotency_Keys (idempotency_key, request) VALUES (%(key)s, %(request)s)
+            ON CONFLICT (idempotency_key) DO UPDATE
+                SET request = EXCLUDED.request, status_code = NULL, response = NULL, created_at = LOCALTIMESTAMP
+                WHERE Idempotency_Keys.created_at < LOCALTIMESTAMP - make_interval(secs => %(ttl)s)
+            RETURNING idempotency_key
+            """,
+    "idempotent_response":
+        "SELECT request, status_code, response FROM Idempotency_Keys WHERE idempotency_key = %s",
+    "save_idempotent_response":
+        "UPDATE Idempotency_Keys SET status_code = %s, response = %s WHERE idempotency_key = %s",
+    "purge_idempotency_keys": """
+            DELETE FROM Idempotency_Keys WHERE idempotency_key IN (
+                SELECT idempotency_key FROM Idempotency_Keys
+                WHERE created_at < LOCALTIMESTAMP - make_interval(secs => %s)
+                ORDER BY created_at LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+            """,
+    # A block of booking, trip and insurance IDs (src/db/ids.py)
+    "id_block": "SELECT nextval('id_block_seq')",
+    "boarding_pass_version": f"SELECT {BOARDING_PASS_VERSION.format(booking_id='%s')}",
+    "booked_seat":
+        "SELECT seat_id, booking_id, flight_number, seat_number, additional_fee, currency "
+        "FROM seats "
+        "WHERE booking_id = %s AND seat_number = %s",
+}
+
+
+async def execute(cursor: AsyncCursor, name: str, params=None):
+    """Run a registered statement, as a server-side prepared statement unless disabled."""
+    if isinstance(cursor, AsyncServerCursor):
+        # A named cursor's DECLARE can't be prepared
+        await cursor.execute(STATEMENTS[name], params)
+    else:
+        await cursor.execute(STATEMENTS[name], params, prepare=db_prepared_statements)
+
+
+async def configure_connection(conn):
+    """
+    Pool `configure` hook. With prepared statements on, make sure the per-connection
+    cache can hold the whole registry; with them off (PgBouncer in transaction mode,
+    where a prepared statement may not exist on the next server connection), also stop
+    psycopg from auto-preparing statements it sees repeatedly.
+    """
+    if db_prepared_statements:
+        conn.prepared_max = max(conn.prepared_max, len(STATEMENTS) * 2)
+    else:
+        conn.prepare_threshold = None
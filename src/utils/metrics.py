@@ -0,0 +1,134 @@
+import functools
+import time
+from bisect import bisect_left
+
+# Latency buckets in seconds, shared by request and query histograms
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Counter:
+    """Monotonic counter keyed by a tuple of label values."""
+
+    def __init__(self, name: str, help_text: str, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.values = {}
+
+    def inc(self, key=(), amount=1):
+        # Plain dict updates: handlers all run on the event loop, so no lock is needed
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self, lines: list):
+        lines.append(f"# HELP {self.name} {self.help_text}")
+        lines.append(f"# TYPE {self.name} counter")
+        for key, value in self.values.items():
+            lines.append(f"{self.name}{_labels(self.labels, key)} {value}")
+
+
+class Histogram:
+    """Fixed-bucket histogram keyed by a tuple of label values."""
+
+    def __init__(self, name: str, help_text: str, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self.series = {}
+
+    def observe(self, key, value: float):
+        series = self.series.get(key)
+        if series is None:
+            # [per-bucket counts..., +Inf count, sum]
+            series = self.series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self, lines: list):
+        lines.append(f"# HELP {self.name} {self.help_text}")
+        lines.append(f"# TYPE {self.name} histogram")
+        for key, series in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(self.labels + ('le',), key + (str(bound),))} {cumulative}")
+            label_text = _labels(self.labels, key)
+            lines.append(f"{self.name}_sum{label_text} {series[-1]}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+
+
+class Gauge:
+    """Gauge whose values are read from a callback at scrape time."""
+
+    def __init__(self, name: str, help_text: str, labels=(), collect=None):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.collect = collect
+
+    def render(self, lines: list):
+        values = self.collect() if self.collect else {}
+        if not values:
+            return
+        lines.append(f"# HELP {self.name} {self.help_text}")
+        lines.append(f"# TYPE {self.name} gauge")
+        for key, value in values.items():
+            lines.append(f"{self.name}{_labels(self.labels, key)} {value}")
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self.metrics:
+            metric.render(lines)
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "accip_http_request_duration_seconds", "HTTP request latency by route.", labels=("method", "route")))
+http_requests = registry.register(Counter(
+    "accip_http_requests_total", "HTTP responses by route and status code.", labels=("method", "route", "status")))
+db_query_duration = registry.register(Histogram(
+    "accip_db_query_duration_seconds", "Latency of src/db/models.py data functions.", labels=("function",)))
+db_query_errors = registry.register(Counter(
+    "accip_db_query_errors_total", "Failed src/db/models.py data function calls.", labels=("function",)))
+cache_requests = registry.register(Counter(
+    "accip_cache_requests_total", "In-process cache lookups by cache and result (hit/miss).", labels=("cache", "result")))
+
+
+def timed_query(func):
+    """Record the latency (and failures) of an async data function under its own name."""
+    key = (func.__name__,)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        except Exception:
+            db_query_errors.inc(key)
+            raise
+        finally:
+            db_query_duration.observe(key, time.perf_counter() - start)
+
+    return wrapper
@@ -1,35 +1,173 @@
 # secretload.py
-import boto3
-from botocore.exceptions import ClientError
-from botocore.exceptions import NoCredentialsError
+import abc
+import asyncio
 import json
+import logging
 import os
+import time
 from config import *
 
+logger = logging.getLogger(__name__)
+
+
+class SecretsProvider(abc.ABC):
+    """
+    Caches secrets (name -> dict of values) for `ttl` seconds.
+
+    `get` blocks and is meant for scripts and startup; request paths use `aget`, which
+    answers from the cache and, once an entry is older than the TTL, serves the old value
+    while a worker thread fetches the new one, so rotated values arrive without a restart.
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self._cache = {}  # secret name -> (fetched_at, values)
+        self._refreshing = {}
+
+    @abc.abstractmethod
+    def fetch(self, secret_name: str) -> dict:
+        """Read a secret from the backend; blocking, called on a worker thread by `refresh`."""
+
+    def get(self, secret_name: str) -> dict:
+        cached = self._cache.get(secret_name)
+        if cached and time.monotonic() - cached[0] < self.ttl:
+            return cached[1]
+        return self._store(secret_name, self.fetch(secret_name))
+
+    async def aget(self, secret_name: str) -> dict:
+        cached = self._cache.get(secret_name)
+        if cached is None:
+            return await self.refresh(secret_name)
+        if time.monotonic() - cached[0] >= self.ttl and secret_name not in self._refreshing:
+            self._refreshing[secret_name] = asyncio.ensure_future(self.refresh(secret_name))
+        return cached[1]
+
+    async def refresh(self, secret_name: str) -> dict:
+        """Fetch a secret on a worker thread so the event loop never waits on the backend."""
+        try:
+            return self._store(secret_name, await asyncio.to_thread(self.fetch, secret_name))
+        except Exception as e:
+            logger.warning("refreshing secret %s failed, keeping the cached value: %s", secret_name, e)
+            cached = self._cache.get(secret_name)
+            if cached is None:
+                raise
+            return cached[1]
+        finally:
+            self._refreshing.pop(secret_name, None)
+
+    async def refresh_forever(self, secret_names, interval: float = None):
+        """Background task: re-fetch the given secrets every `interval` seconds (default: the TTL)."""
+        while True:
+            await asyncio.sleep(interval or self.ttl)
+            for secret_name in secret_names:
+                await self.refresh(secret_name)
+
+    async def value(self, secret_name: str, key: str, default=None):
+        return (await self.aget(secret_name)).get(key, default)
+
+    def _store(self, secret_name: str, values: dict) -> dict:
+        self._cache[secret_name] = (time.monotonic(), values)
+        return values
+
+
+class AwsSecretsProvider(SecretsProvider):
+    """AWS Secrets Manager; boto3 is imported and the client built on first use only."""
+
+    def __init__(self, region_name: str, ttl: float = 300.0):
+        super().__init__(ttl)
+        self.region_name = region_name
+        self._client = None
+
+    def client(self):
+        if self._client is None:
+            import boto3
+            self._client = boto3.session.Session().client(service_name='secretsmanager', region_name=self.region_name)
+        return self._client
+
+    def fetch(self, secret_name: str) -> dict:
+        response = self.client().get_secret_value(SecretId=secret_name)
+        return json.loads(response['SecretString'])
+
+
+class FileSecretsProvider(SecretsProvider):
+    """JSON file shaped like {"<secret name>": {"<key>": "<value>"}}, re-read when the TTL expires."""
+
+    def __init__(self, path: str, ttl: float = 300.0):
+        super().__init__(ttl)
+        self.path = path
+
+    def fetch(self, secret_name: str) -> dict:
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f).get(secret_name, {})
+
+
+class MemorySecretsProvider(SecretsProvider):
+    """In-memory secrets for tests; `put` stands in for a rotation."""
+
+    def __init__(self, secrets: dict = None, ttl: float = 300.0):
+        super().__init__(ttl)
+        self.secrets = dict(secrets or {})
+
+    def put(self, secret_name: str, values: dict):
+        self.secrets[secret_name] = dict(values)
+
+    def fetch(self, secret_name: str) -> dict:
+        return dict(self.secrets.get(secret_name, {}))
+
+
+class EnvSecretsProvider(SecretsProvider):
+    """Nonprod (local development): the values come from the environment with local defaults."""
+
+    def fetch(self, secret_name: str) -> dict:
+        if secret_name == const_db_credentials_name:
+            return {
+                const_fieldname_db_user: os.getenv(const_fieldname_db_user, db_user),
+                const_fieldname_db_pass: os.getenv(const_fieldname_db_pass, db_pass),
+            }
+        if secret_name == const_api_key_secret_name:
+            return {"api_key": os.getenv("api_key", "api_key"), "api_secret": os.getenv("api_secret", "")}
+        return {}
+
+
+def make_provider() -> SecretsProvider:
+    """Pick the backend from `secrets_backend`: aws, env or file:<path>."""
+    backend = os.getenv(const_fieldname_secrets_backend, "env" if nonprod else "aws")
+    if backend.startswith("file:"):
+        return FileSecretsProvider(backend[len("file:"):], ttl=secrets_ttl)
+    if backend == "env":
+        return EnvSecretsProvider(ttl=secrets_ttl)
+    return AwsSecretsProvider(os.getenv(const_fieldname_aws_region, aws_region), ttl=secrets_ttl)
+
+
+_provider = None
+
+
+def get_provider() -> SecretsProvider:
+    global _provider
+    if _provider is None:
+        _provider = make_provider()
+    return _provider
+
+
+def set_provider(provider: SecretsProvider):
+    """Swap the secrets backend, e.g. for a MemorySecretsProvider in tests."""
+    global _provider
+    _provider = provider
+
+
 def get_secret(secret_name):
-    region_name = os.getenv(const_fieldname_aws_region, aws_region)
+    """Load a secret and export its values as environment variables (used by the scripts)."""
     try:
-        if os.getenv(const_fieldname_nonprod, "True").lower() == "true":
-            raise NoCredentialsError()            
-        
-        session = boto3.session.Session()
-        client = session.client(service_name='secretsmanager', region_name=region_name)
-        get_secret_value_response = client.get_secret_value(SecretId=secret_name)
-        secret = get_secret_value_response['SecretString']
-        secret_dict = json.loads(secret)
-        for key, value in secret_dict.items():
-            os.environ[key] = value
-    except NoCredentialsError as e:
+        secret_dict = get_provider().get(secret_name)
+    except Exception as e:
+        # botocore is only imported with the AWS backend, so match the missing-credentials case by name
+        if type(e).__name__ != "NoCredentialsError":
+            raise
         print(f"Error retrieving secret {secret_name}: {e}")
-        if os.getenv(const_fieldname_nonprod, "True").lower() == "true":
-            # Fallback for nonprod environment (local development)
-            if secret_name == const_db_credentials_name:
-                os.environ[const_fieldname_db_user] = os.getenv(const_fieldname_db_user,db_user)
-                os.environ[const_fieldname_db_pass] = os.getenv(const_fieldname_db_pass, db_pass)
-            elif secret_name == const_api_key_secret_name:
-                os.environ["api_key"] = os.getenv("api_key","api_key")
-                os.environ["api_secret"] = os.getenv("api_secret","")
+        return
+    for key, value in secret_dict.items():
+        os.environ[key] = value
 
 if __name__ == "__main__":
     get_secret(const_db_credentials_name)
-    get_secret(const_api_key_secret_name)
\ No newline at end of file
+    get_secret(const_api_key_secret_name)
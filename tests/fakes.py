@@ -0,0 +1,60 @@
+from contextlib import asynccontextmanager
+
+
+class FakeConnection:
+    """Pooled connection stand-in: every cursor is `cursor`, commits and rollbacks are counted."""
+
+    closed = False
+
+    def __init__(self, cursor=None):
+        self._cursor = cursor
+        self.autocommit = False
+        self.commits = 0
+        self.rollbacks = 0
+        self.released = False
+
+    @asynccontextmanager
+    async def cursor(self, name=None):
+        yield self._cursor
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+    async def set_autocommit(self, value):
+        self.autocommit = value
+
+
+def fake_connect(conn=None):
+    """
+    Replacement for connection_for, get_read_connection or get_db_connection that hands
+    out `conn` (a new FakeConnection by default) and marks it released afterwards.
+    """
+    conn = conn or FakeConnection()
+
+    @asynccontextmanager
+    async def connect(*args, **kwargs):
+        try:
+            yield conn
+        finally:
+            conn.released = True
+
+    return connect
+
+
+class FakePool:
+    """Primary pool stand-in that hands out FakeConnections without limit."""
+
+    max_size = 10
+
+    async def getconn(self, timeout=None):
+        return FakeConnection()
+
+    async def putconn(self, conn):
+        conn.released = True
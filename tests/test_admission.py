@@ -0,0 +1,108 @@
+import asyncio
+import unittest
+
+from fastapi.testclient import TestClient
+from psycopg_pool import PoolTimeout
+
+from src.api.main import app
+from src.db import connection
+from src.db.admission import AdmissionController, policy_for_route
+from src.db.exceptions import PoolSaturatedError
+from config import *
+
+
+class FakePool:
+    """Pool with `max_size` connections whose getconn blocks until one is returned."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.free = asyncio.Semaphore(max_size)
+
+    async def getconn(self, timeout=None):
+        try:
+            await asyncio.wait_for(self.free.acquire(), timeout)
+        except asyncio.TimeoutError:
+            raise PoolTimeout("timed out")
+        return object()
+
+    async def putconn(self, conn):
+        self.free.release()
+
+
+class TestRoutePolicy(unittest.TestCase):
+    def test_critical_routes_get_the_long_deadline(self):
+        self.assertEqual(policy_for_route("/api/v1/book-flight/"), (True, db_critical_acquire_deadline))
+        self.assertEqual(policy_for_route("/api/v1/flight-status/{flight_number}"), (False, db_acquire_deadline))
+
+
+class TestAdmissionController(unittest.IsolatedAsyncioTestCase):
+    async def test_full_queue_fails_fast(self):
+        pool = FakePool(1)
+        admission = AdmissionController(max_waiting=1, reserved=0)
+        await admission.acquire(pool, True, 1.0)
+        blocked = asyncio.create_task(admission.acquire(pool, True, 1.0))
+        await asyncio.sleep(0)
+        with self.assertRaises(PoolSaturatedError) as ctx:
+            await admission.acquire(pool, True, 1.0)
+        self.assertEqual(ctx.exception.retry_after, 1)
+        blocked.cancel()
+
+    async def test_deadline_raises_saturated(self):
+        pool = FakePool(1)
+        admission = AdmissionController(max_waiting=10, reserved=0)
+        await admission.acquire(pool, True, 1.0)
+        with self.assertRaises(PoolSaturatedError):
+            await admission.acquire(pool, True, 0.05)
+        self.assertEqual(admission.waiting, 0)
+
+    async def test_lookups_cannot_take_reserved_connections(self):
+        pool = FakePool(3)
+        admission = AdmissionController(max_waiting=10, reserved=1)
+        await admission.acquire(pool, False, 0.05)
+        await admission.acquire(pool, False, 0.05)
+        with self.assertRaises(PoolSaturatedError):
+            await admission.acquire(pool, False, 0.05)
+        # the reserved connection is still there for a critical write
+        await admission.acquire(pool, True, 0.05)
+
+    async def test_released_slot_wakes_a_waiting_lookup(self):
+        pool = FakePool(2)
+        admission = AdmissionController(max_waiting=10, reserved=1)
+        conn = await admission.acquire(pool, False, 1.0)
+        waiting = asyncio.create_task(admission.acquire(pool, False, 1.0))
+        await asyncio.sleep(0.01)
+        self.assertFalse(waiting.done())
+        await pool.putconn(conn)
+        admission.release(False)
+        await asyncio.wait_for(waiting, 1.0)
+
+    async def test_cancelled_lookup_gives_its_slot_back(self):
+        pool = FakePool(2)
+        admission = AdmissionController(max_waiting=10, reserved=0)
+        await admission.acquire(pool, True, 1.0)
+        await admission.acquire(pool, True, 1.0)
+        # A slot is free but the pool is not: the lookup waits in getconn
+        waiting = asyncio.create_task(admission.acquire(pool, False, 1.0))
+        await asyncio.sleep(0.01)
+        self.assertEqual(admission.non_critical_in_use, 1)
+        waiting.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+        self.assertEqual(admission.non_critical_in_use, 0)
+        self.assertEqual(admission.waiting, 0)
+
+
+class TestSaturatedResponse(unittest.TestCase):
+    def test_returns_503_with_retry_after(self):
+        saved = connection.db_pool
+        connection.db_pool = FakePool(0)
+        try:
+            response = TestClient(app).get("/api/v1/flight-status/FL123", headers={"X-API-Key": "api_key"})
+        finally:
+            connection.db_pool = saved
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["Retry-After"], str(db_retry_after))
+
+
+if __name__ == "__main__":
+    unittest.main()
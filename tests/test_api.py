@@ -2,15 +2,22 @@ import pdb
 import unittest
 import os
 import logging
+from datetime import date, datetime
+from decimal import Decimal
 from fastapi.testclient import TestClient
 from src.api.main import app
-from unittest.mock import patch, MagicMock
-
-from src.utils.secretload import get_secret
+from unittest.mock import patch, AsyncMock
+
+from src.db import connection
+from src.db.cache import booking_overview_cache, flight_snapshot_cache, not_found_cache
+from src.db.records import (
+    BoardingPassRow, BookingRow, FlightReservationRow, FlightRow, FlightSnapshotRow, OfferRow, SeatRow,
+    TripComponentRow, TripPriceRow, TripRow
+)
+from src.utils.secretload import MemorySecretsProvider, get_provider, set_provider
+from tests.fakes import FakePool
 from config import *
 
-get_secret(const_api_key_secret_name)
-
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -18,17 +25,39 @@ logger = logging.getLogger(__name__)
 class TestAuthAPI(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        cls.secretvalue = os.getenv(const_api_key_secret_name)
+        cls.secretvalue = "test-api-key"
+        cls.saved_provider = get_provider()
+        set_provider(MemorySecretsProvider({const_api_key_secret_name: {"api_key": cls.secretvalue}}))
+
+    @classmethod
+    def tearDownClass(cls):
+        set_provider(cls.saved_provider)
 
     def setUp(self):
+        # No database: the app starts without opening its pools, and the primary pool hands
+        # out a fake connection to the (mocked) model functions
+        for patcher in (patch("src.api.main.open_db_pool", new_callable=AsyncMock),
+                        patch("src.api.main.close_db_pool", new_callable=AsyncMock),
+                        patch.object(connection, "db_pool", FakePool()),
+                        patch.object(connection, "replica_set", None)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        for cache in (booking_overview_cache, flight_snapshot_cache, not_found_cache):
+            cache.clear()
+            self.addCleanup(cache.clear)
         self.client = TestClient(app)
+        self.client.__enter__()  # runs the lifespan
+        self.addCleanup(self.client.__exit__, None, None, None)
         logger.debug("Test client initialized")
 
     # Boarding Service Tests
-    @patch('src.api.endpoints.boarding.get_boarding_pass_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.boarding.get_boarding_pass_data', autospec=True)
     def test_get_boarding_pass_success(self, mock_get_boarding_pass_data):
         logger.debug("Starting test_get_boarding_pass_success with booking_id B123")
-        mock_get_boarding_pass_data.return_value = ("B5", "5B", "2025-06-08T09:30:00", "https://airline.com/boardingpass/B123.pdf")
+        mock_get_boarding_pass_data.return_value = BoardingPassRow(
+            "B123", "Jane Doe", "FL123", "SYD", "MEL", "B5", "5B", datetime(2025, 6, 8, 9, 30),
+            "https://airline.com/boardingpass/B123.pdf", "1717800000.0"
+        )
         logger.debug(f"Mocked get_boarding_pass_data return value: {mock_get_boarding_pass_data.return_value}")
 
         logger.debug(f"secret value: {self.secretvalue}")
@@ -50,7 +79,7 @@ class TestAuthAPI(unittest.TestCase):
         })
         mock_get_boarding_pass_data.assert_called_once()
 
-    @patch('src.api.endpoints.boarding.get_boarding_pass_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.boarding.get_boarding_pass_data', autospec=True)
     def test_get_boarding_pass_unauthorized(self, mock_get_boarding_pass_data):
         logger.debug("Starting test_get_boarding_pass_unauthorized with booking_id B123")
         response = self.client.get(
@@ -62,10 +91,13 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
-    @patch('src.api.endpoints.boarding.get_boarding_pass_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.boarding.get_boarding_pass_data', autospec=True)
     def test_print_boarding_pass_success(self, mock_get_boarding_pass_data):
         logger.debug("Starting test_print_boarding_pass_success with booking_id B123")
-        mock_get_boarding_pass_data.return_value = ("B5", "5B", "2025-06-08T09:30:00", "https://airline.com/boardingpass/B123.pdf")
+        mock_get_boarding_pass_data.return_value = BoardingPassRow(
+            "B123", "Jane Doe", "FL123", "SYD", "MEL", "B5", "5B", datetime(2025, 6, 8, 9, 30),
+            "https://airline.com/boardingpass/B123.pdf", "1717800000.0"
+        )
         response = self.client.get(
             "/api/v1/print-boarding-pass/B123",
             headers={"X-API-Key": self.secretvalue}
@@ -84,7 +116,7 @@ class TestAuthAPI(unittest.TestCase):
         })
         mock_get_boarding_pass_data.assert_called_once()
 
-    @patch('src.api.endpoints.boarding.get_boarding_pass_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.boarding.get_boarding_pass_data', autospec=True)
     def test_print_boarding_pass_unauthorized(self, mock_get_boarding_pass_data):
         logger.debug("Starting test_print_boarding_pass_unauthorized with booking_id B123")
         response = self.client.get(
@@ -96,7 +128,7 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
-    @patch('src.api.endpoints.boarding.check_in_booking', new_callable=MagicMock)
+    @patch('src.api.endpoints.boarding.check_in_booking', autospec=True)
     def test_check_in_success(self, mock_check_in_booking):
         logger.debug("Starting test_check_in_success with booking_id B123")
         mock_check_in_booking.return_value = {"updated": True, "gate": "B5", "seat": "5B", "boarding_time": "2025-06-08T09:30:00"}
@@ -114,7 +146,7 @@ class TestAuthAPI(unittest.TestCase):
         })
         mock_check_in_booking.assert_called_once()
 
-    @patch('src.api.endpoints.boarding.check_in_booking', new_callable=MagicMock)
+    @patch('src.api.endpoints.boarding.check_in_booking', autospec=True)
     def test_check_in_unauthorized(self, mock_check_in_booking):
         logger.debug("Starting test_check_in_unauthorized with booking_id B123")
         response = self.client.post(
@@ -126,7 +158,7 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
-    @patch('src.api.endpoints.boarding.choose_seat_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.boarding.choose_seat_data', autospec=True)
     def test_choose_seat_success(self, mock_choose_seat_data):
         logger.debug("Starting test_choose_seat_success with booking_id B123")
         mock_choose_seat_data.return_value = {"flight_number": "FL123", "additional_fee": 10.0}
@@ -143,7 +175,7 @@ class TestAuthAPI(unittest.TestCase):
         })
         mock_choose_seat_data.assert_called_once()
 
-    @patch('src.api.endpoints.boarding.choose_seat_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.boarding.choose_seat_data', autospec=True)
     def test_choose_seat_unauthorized(self, mock_choose_seat_data):
         logger.debug("Starting test_choose_seat_unauthorized with booking_id B123")
         response = self.client.post(
@@ -155,10 +187,10 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
-    @patch('src.api.endpoints.boarding.change_seat_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.boarding.change_seat_data', autospec=True)
     def test_change_seat_success(self, mock_change_seat_data):
         logger.debug("Starting test_change_seat_success with booking_id B123")
-        mock_change_seat_data.return_value = ("FL123", "5B", 20.0)
+        mock_change_seat_data.return_value = SeatRow("FL123", "5B", Decimal("20.00"))
         response = self.client.post(
             "/api/v1/change-seat/B123?seat_number=5B",
             headers={"X-API-Key": self.secretvalue}
@@ -173,7 +205,7 @@ class TestAuthAPI(unittest.TestCase):
         })
         mock_change_seat_data.assert_called_once()
 
-    @patch('src.api.endpoints.boarding.change_seat_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.boarding.change_seat_data', autospec=True)
     def test_change_seat_unauthorized(self, mock_change_seat_data):
         logger.debug("Starting test_change_seat_unauthorized with booking_id B123")
         response = self.client.post(
@@ -186,7 +218,7 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
     # Flight Management Service Tests
-    @patch('src.api.endpoints.flight_management.book_flight_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.flight_management.book_flight_data', autospec=True)
     def test_book_flight_success(self, mock_book_flight_data):
         logger.debug("Starting test_book_flight_success with flight_number FL123")
         mock_book_flight_data.return_value = "B124"
@@ -200,7 +232,7 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.json(), {"status": "success", "booking_id": "B124"})
         mock_book_flight_data.assert_called_once()
 
-    @patch('src.api.endpoints.flight_management.book_flight_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.flight_management.book_flight_data', autospec=True)
     def test_book_flight_unauthorized(self, mock_book_flight_data):
         logger.debug("Starting test_book_flight_unauthorized with flight_number FL123")
         response = self.client.post(
@@ -212,10 +244,10 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
-    @patch('src.api.endpoints.flight_management.get_flight_offers_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.flight_management.get_flight_offers_data', autospec=True)
     def test_check_flight_offers_success(self, mock_get_flight_offers_data):
         logger.debug("Starting test_check_flight_offers_success")
-        mock_get_flight_offers_data.return_value = [{"flight_number": "FL123", "price": 200.0}]
+        mock_get_flight_offers_data.return_value = [OfferRow("O123", "Early bird", Decimal("200.00"), "10%")]
         response = self.client.get(
             "/api/v1/flight-offers/",
             headers={"X-API-Key": self.secretvalue}
@@ -223,10 +255,14 @@ class TestAuthAPI(unittest.TestCase):
         logger.debug(f"Response status: {response.status_code}, Response JSON: {response.json()}")
 
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.json(), {"status": "success", "offers": [{"flight_number": "FL123", "price": 200.0}]})
+        self.assertEqual(response.json(), {
+            "status": "success",
+            "offers": [{"offer_id": "O123", "description": "Early bird", "price": 200.0, "discount": "10%"}],
+            "next_cursor": None
+        })
         mock_get_flight_offers_data.assert_called_once()
 
-    @patch('src.api.endpoints.flight_management.get_flight_offers_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.flight_management.get_flight_offers_data', autospec=True)
     def test_check_flight_offers_unauthorized(self, mock_get_flight_offers_data):
         logger.debug("Starting test_check_flight_offers_unauthorized")
         response = self.client.get(
@@ -238,10 +274,12 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
-    @patch('src.api.endpoints.flight_management.get_flight_prices_data', new_callable=MagicMock)
-    def test_check_flight_prices_success(self, mock_get_flight_prices_data):
+    @patch('src.api.endpoints.flight_management.get_flight_snapshot_data', autospec=True)
+    def test_check_flight_prices_success(self, mock_get_flight_snapshot_data):
         logger.debug("Starting test_check_flight_prices_success with flight_number FL123")
-        mock_get_flight_prices_data.return_value = (250.0, True)
+        mock_get_flight_snapshot_data.return_value = FlightSnapshotRow(
+            "FL123", "SYD", "MEL", datetime(2025, 6, 8, 9, 0), datetime(2025, 6, 8, 12, 0), "B5", "On Time", Decimal("250.00"), 12
+        )
         response = self.client.get(
             "/api/v1/flight-prices/FL123",
             headers={"X-API-Key": self.secretvalue}
@@ -249,11 +287,11 @@ class TestAuthAPI(unittest.TestCase):
         logger.debug(f"Response status: {response.status_code}, Response JSON: {response.json()}")
 
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.json(), {"status": "success", "prices": {"price": 250.0, "availability": True}})
-        mock_get_flight_prices_data.assert_called_once()
+        self.assertEqual(response.json(), {"status": "success", "prices": {"price": 250.0, "availability": 12}})
+        mock_get_flight_snapshot_data.assert_called_once()
 
-    @patch('src.api.endpoints.flight_management.get_flight_prices_data', new_callable=MagicMock)
-    def test_check_flight_prices_unauthorized(self, mock_get_flight_prices_data):
+    @patch('src.api.endpoints.flight_management.get_flight_snapshot_data', autospec=True)
+    def test_check_flight_prices_unauthorized(self, mock_get_flight_snapshot_data):
         logger.debug("Starting test_check_flight_prices_unauthorized with flight_number FL123")
         response = self.client.get(
             "/api/v1/flight-prices/FL123",
@@ -264,10 +302,12 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
-    @patch('src.api.endpoints.flight_management.get_flight_reservation_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.flight_management.get_flight_reservation_data', autospec=True)
     def test_check_flight_reservation_success(self, mock_get_flight_reservation_data):
         logger.debug("Starting test_check_flight_reservation_success with booking_id B123")
-        mock_get_flight_reservation_data.return_value = ("P123", "FL123", "2025-06-03", "Confirmed", 300.0, "SYD", "MEL")
+        mock_get_flight_reservation_data.return_value = FlightReservationRow(
+            "P123", "FL123", date(2025, 6, 3), "Confirmed", Decimal("300.00"), "SYD", "MEL", "1717400000.0", "B123"
+        )
         response = self.client.get(
             "/api/v1/flight-reservation/B123",
             headers={"X-API-Key": self.secretvalue}
@@ -289,7 +329,7 @@ class TestAuthAPI(unittest.TestCase):
         })
         mock_get_flight_reservation_data.assert_called_once()
 
-    @patch('src.api.endpoints.flight_management.get_flight_reservation_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.flight_management.get_flight_reservation_data', autospec=True)
     def test_check_flight_reservation_unauthorized(self, mock_get_flight_reservation_data):
         logger.debug("Starting test_check_flight_reservation_unauthorized with booking_id B123")
         response = self.client.get(
@@ -301,10 +341,12 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
-    @patch('src.api.endpoints.flight_management.get_flight_status_data', new_callable=MagicMock)
-    def test_check_flight_status_success(self, mock_get_flight_status_data):
+    @patch('src.api.endpoints.flight_management.get_flight_snapshot_data', autospec=True)
+    def test_check_flight_status_success(self, mock_get_flight_snapshot_data):
         logger.debug("Starting test_check_flight_status_success with flight_number FL123")
-        mock_get_flight_status_data.return_value = ("SYD", "MEL", "On Time", "2025-06-08T09:00:00", "2025-06-08T12:00:00", "B5")
+        mock_get_flight_snapshot_data.return_value = FlightSnapshotRow(
+            "FL123", "SYD", "MEL", datetime(2025, 6, 8, 9, 0), datetime(2025, 6, 8, 12, 0), "B5", "On Time", Decimal("250.00"), 12
+        )
         response = self.client.get(
             "/api/v1/flight-status/FL123",
             headers={"X-API-Key": self.secretvalue}
@@ -323,10 +365,10 @@ class TestAuthAPI(unittest.TestCase):
                 "gate": "B5"
             }
         })
-        mock_get_flight_status_data.assert_called_once()
+        mock_get_flight_snapshot_data.assert_called_once()
 
-    @patch('src.api.endpoints.flight_management.get_flight_status_data', new_callable=MagicMock)
-    def test_check_flight_status_unauthorized(self, mock_get_flight_status_data):
+    @patch('src.api.endpoints.flight_management.get_flight_snapshot_data', autospec=True)
+    def test_check_flight_status_unauthorized(self, mock_get_flight_snapshot_data):
         logger.debug("Starting test_check_flight_status_unauthorized with flight_number FL123")
         response = self.client.get(
             "/api/v1/flight-status/FL123",
@@ -337,10 +379,10 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
-    @patch('src.api.endpoints.flight_management.search_flights_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.flight_management.search_flights_data', autospec=True)
     def test_search_flight_success(self, mock_search_flights_data):
         logger.debug("Starting test_search_flight_success with SYD to MEL on 2025-06-08")
-        mock_search_flights_data.return_value = [{"flight_number": "FL123", "price": 250.0}]
+        mock_search_flights_data.return_value = [FlightRow("FL123", "SYD", "MEL", datetime(2025, 6, 8, 9, 0), Decimal("250.00"), 12)]
         response = self.client.get(
             "/api/v1/search-flight/SYD/MEL/2025-06-08",
             headers={"X-API-Key": self.secretvalue}
@@ -348,10 +390,17 @@ class TestAuthAPI(unittest.TestCase):
         logger.debug(f"Response status: {response.status_code}, Response JSON: {response.json()}")
 
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.json(), {"status": "success", "flights": [{"flight_number": "FL123", "price": 250.0}]})
+        self.assertEqual(response.json(), {
+            "status": "success",
+            "flights": [{
+                "flight_number": "FL123", "departure": "SYD", "destination": "MEL",
+                "departure_time": "2025-06-08T09:00:00", "price": 250.0, "availability": 12
+            }],
+            "next_cursor": None
+        })
         mock_search_flights_data.assert_called_once()
 
-    @patch('src.api.endpoints.flight_management.search_flights_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.flight_management.search_flights_data', autospec=True)
     def test_search_flight_unauthorized(self, mock_search_flights_data):
         logger.debug("Starting test_search_flight_unauthorized with SYD to MEL on 2025-06-08")
         response = self.client.get(
@@ -363,7 +412,7 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
-    @patch('src.api.endpoints.flight_management.cancel_flight_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.flight_management.cancel_flight_data', autospec=True)
     def test_cancel_flight_success(self, mock_cancel_flight_data):
         logger.debug("Starting test_cancel_flight_success with booking_id B123")
         mock_cancel_flight_data.return_value = True
@@ -381,7 +430,7 @@ class TestAuthAPI(unittest.TestCase):
         })
         mock_cancel_flight_data.assert_called_once()
 
-    @patch('src.api.endpoints.flight_management.cancel_flight_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.flight_management.cancel_flight_data', autospec=True)
     def test_cancel_flight_unauthorized(self, mock_cancel_flight_data):
         logger.debug("Starting test_cancel_flight_unauthorized with booking_id B123")
         response = self.client.post(
@@ -393,10 +442,10 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
-    @patch('src.api.endpoints.flight_management.change_flight_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.flight_management.change_flight_data', autospec=True)
     def test_change_flight_success(self, mock_change_flight_data):
         logger.debug("Starting test_change_flight_success with booking_id B123")
-        mock_change_flight_data.return_value = ("P123", "FL124", "2025-06-03", "Confirmed", 300.0)
+        mock_change_flight_data.return_value = BookingRow("P123", "FL124", date(2025, 6, 3), "Confirmed", Decimal("300.00"))
         response = self.client.post(
             "/api/v1/change-flight/B123?new_flight_number=FL124",
             headers={"X-API-Key": self.secretvalue}
@@ -417,7 +466,7 @@ class TestAuthAPI(unittest.TestCase):
         })
         mock_change_flight_data.assert_called_once()
 
-    @patch('src.api.endpoints.flight_management.change_flight_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.flight_management.change_flight_data', autospec=True)
     def test_change_flight_unauthorized(self, mock_change_flight_data):
         logger.debug("Starting test_change_flight_unauthorized with booking_id B123")
         response = self.client.post(
@@ -429,7 +478,7 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
-    @patch('src.api.endpoints.flight_management.purchase_flight_insurance_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.flight_management.purchase_flight_insurance_data', autospec=True)
     def test_purchase_flight_insurance_success(self, mock_purchase_flight_insurance_data):
         logger.debug("Starting test_purchase_flight_insurance_success with booking_id B123")
         mock_purchase_flight_insurance_data.return_value = "INS123"
@@ -447,7 +496,7 @@ class TestAuthAPI(unittest.TestCase):
         })
         mock_purchase_flight_insurance_data.assert_called_once()
 
-    @patch('src.api.endpoints.flight_management.purchase_flight_insurance_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.flight_management.purchase_flight_insurance_data', autospec=True)
     def test_purchase_flight_insurance_unauthorized(self, mock_purchase_flight_insurance_data):
         logger.debug("Starting test_purchase_flight_insurance_unauthorized with booking_id B123")
         response = self.client.post(
@@ -459,7 +508,7 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
-    @patch('src.api.endpoints.flight_management.get_refund_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.flight_management.get_refund_data', autospec=True)
     def test_get_refund_success(self, mock_get_refund_data):
         logger.debug("Starting test_get_refund_success with booking_id B123")
         mock_get_refund_data.return_value = True
@@ -477,7 +526,7 @@ class TestAuthAPI(unittest.TestCase):
         })
         mock_get_refund_data.assert_called_once()
 
-    @patch('src.api.endpoints.flight_management.get_refund_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.flight_management.get_refund_data', autospec=True)
     def test_get_refund_unauthorized(self, mock_get_refund_data):
         logger.debug("Starting test_get_refund_unauthorized with booking_id B123")
         response = self.client.post(
@@ -489,10 +538,12 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
-    @patch('src.api.endpoints.flight_management.get_arrival_time_data', new_callable=MagicMock)
-    def test_check_arrival_time_success(self, mock_get_arrival_time_data):
+    @patch('src.api.endpoints.flight_management.get_flight_snapshot_data', autospec=True)
+    def test_check_arrival_time_success(self, mock_get_flight_snapshot_data):
         logger.debug("Starting test_check_arrival_time_success with flight_number FL123")
-        mock_get_arrival_time_data.return_value = ("2025-06-08T12:00:00")
+        mock_get_flight_snapshot_data.return_value = FlightSnapshotRow(
+            "FL123", "SYD", "MEL", datetime(2025, 6, 8, 9, 0), datetime(2025, 6, 8, 12, 0), "B5", "On Time", Decimal("250.00"), 12
+        )
         response = self.client.get(
             "/api/v1/arrival-time/FL123",
             headers={"X-API-Key": self.secretvalue}
@@ -501,10 +552,10 @@ class TestAuthAPI(unittest.TestCase):
         
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), {"status": "success", "arrival_time": "2025-06-08T12:00:00"})
-        mock_get_arrival_time_data.assert_called_once()
+        mock_get_flight_snapshot_data.assert_called_once()
 
-    @patch('src.api.endpoints.flight_management.get_arrival_time_data', new_callable=MagicMock)
-    def test_check_arrival_time_unauthorized(self, mock_get_arrival_time_data):
+    @patch('src.api.endpoints.flight_management.get_flight_snapshot_data', autospec=True)
+    def test_check_arrival_time_unauthorized(self, mock_get_flight_snapshot_data):
         logger.debug("Starting test_check_arrival_time_unauthorized with flight_number FL123")
         response = self.client.get(
             "/api/v1/arrival-time/FL123",
@@ -515,10 +566,12 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
-    @patch('src.api.endpoints.flight_management.get_departure_time_data', new_callable=MagicMock)
-    def test_check_departure_time_success(self, mock_get_departure_time_data):
+    @patch('src.api.endpoints.flight_management.get_flight_snapshot_data', autospec=True)
+    def test_check_departure_time_success(self, mock_get_flight_snapshot_data):
         logger.debug("Starting test_check_departure_time_success with flight_number FL123")
-        mock_get_departure_time_data.return_value = "2025-06-08T09:00:00"
+        mock_get_flight_snapshot_data.return_value = FlightSnapshotRow(
+            "FL123", "SYD", "MEL", datetime(2025, 6, 8, 9, 0), datetime(2025, 6, 8, 12, 0), "B5", "On Time", Decimal("250.00"), 12
+        )
         response = self.client.get(
             "/api/v1/departure-time/FL123",
             headers={"X-API-Key": self.secretvalue}
@@ -527,10 +580,10 @@ class TestAuthAPI(unittest.TestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), {"status": "success", "departure_time": "2025-06-08T09:00:00"})
-        mock_get_departure_time_data.assert_called_once()
+        mock_get_flight_snapshot_data.assert_called_once()
 
-    @patch('src.api.endpoints.flight_management.get_departure_time_data', new_callable=MagicMock)
-    def test_check_departure_time_unauthorized(self, mock_get_departure_time_data):
+    @patch('src.api.endpoints.flight_management.get_flight_snapshot_data', autospec=True)
+    def test_check_departure_time_unauthorized(self, mock_get_flight_snapshot_data):
         logger.debug("Starting test_check_departure_time_unauthorized with flight_number FL123")
         response = self.client.get(
             "/api/v1/departure-time/FL123",
@@ -542,10 +595,10 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
     # Trip Management Service Tests
-    @patch('src.api.endpoints.trip_management.get_trip_prices_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.trip_management.get_trip_prices_data', autospec=True)
     def test_check_trip_prices_success(self, mock_get_trip_prices_data):
         logger.debug("Starting test_check_trip_prices_success with trip_id T123")
-        mock_get_trip_prices_data.return_value = (500.0,)
+        mock_get_trip_prices_data.return_value = TripPriceRow(Decimal("500.00"))
         response = self.client.get(
             "/api/v1/trip-prices/T123",
             headers={"X-API-Key": self.secretvalue}
@@ -556,7 +609,7 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.json(), {"status": "success", "trip_prices": {"total_price": 500.0}})
         mock_get_trip_prices_data.assert_called_once()
 
-    @patch('src.api.endpoints.trip_management.get_trip_prices_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.trip_management.get_trip_prices_data', autospec=True)
     def test_check_trip_prices_unauthorized(self, mock_get_trip_prices_data):
         logger.debug("Starting test_check_trip_prices_unauthorized with trip_id T123")
         response = self.client.get(
@@ -568,7 +621,7 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
-    @patch('src.api.endpoints.trip_management.book_trip_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.trip_management.book_trip_data', autospec=True)
     def test_book_trip_success(self, mock_book_trip_data):
         logger.debug("Starting test_book_trip_success with passenger_id P124")
         mock_book_trip_data.return_value = "T124"
@@ -582,7 +635,7 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.json(), {"status": "success", "trip_id": "T124"})
         mock_book_trip_data.assert_called_once()
 
-    @patch('src.api.endpoints.trip_management.book_trip_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.trip_management.book_trip_data', autospec=True)
     def test_book_trip_unauthorized(self, mock_book_trip_data):
         logger.debug("Starting test_book_trip_unauthorized with passenger_id P124")
         response = self.client.post(
@@ -594,10 +647,15 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
-    @patch('src.api.endpoints.trip_management.get_trip_details_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.trip_management.get_trip_details_data', autospec=True)
     def test_check_trip_details_success(self, mock_get_trip_details_data):
         logger.debug("Starting test_check_trip_details_success with trip_id T123")
-        mock_get_trip_details_data.return_value = {"total_price": 500.0, "status": "Confirmed", "components": ["FL123", "FL124"]}
+        mock_get_trip_details_data.return_value = {
+            "total_price": Decimal("500.00"),
+            "status": "Confirmed",
+            "version": "1717400000.0",
+            "components": [TripComponentRow("Flight", "FL123", Decimal("250.00")), TripComponentRow("Flight", "FL124", Decimal("250.00"))]
+        }
         response = self.client.get(
             "/api/v1/trip-details/T123",
             headers={"X-API-Key": self.secretvalue}
@@ -607,11 +665,18 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), {
             "status": "success",
-            "trip_details": {"total_price": 500.0, "status": "Confirmed", "components": ["FL123", "FL124"]}
+            "trip_details": {
+                "total_price": 500.0,
+                "status": "Confirmed",
+                "components": [
+                    {"component_type": "Flight", "flight_number": "FL123", "price": 250.0},
+                    {"component_type": "Flight", "flight_number": "FL124", "price": 250.0}
+                ]
+            }
         })
         mock_get_trip_details_data.assert_called_once()
 
-    @patch('src.api.endpoints.trip_management.get_trip_details_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.trip_management.get_trip_details_data', autospec=True)
     def test_check_trip_details_unauthorized(self, mock_get_trip_details_data):
         logger.debug("Starting test_check_trip_details_unauthorized with trip_id T123")
         response = self.client.get(
@@ -623,10 +688,10 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
-    @patch('src.api.endpoints.trip_management.get_trip_offers_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.trip_management.get_trip_offers_data', autospec=True)
     def test_check_trip_offers_success(self, mock_get_trip_offers_data):
         logger.debug("Starting test_check_trip_offers_success")
-        mock_get_trip_offers_data.return_value = [{"trip_id": "T123", "price": 500.0}]
+        mock_get_trip_offers_data.return_value = [OfferRow("O124", "Weekend away", Decimal("500.00"), "15%")]
         response = self.client.get(
             "/api/v1/trip-offers/",
             headers={"X-API-Key": self.secretvalue}
@@ -634,10 +699,14 @@ class TestAuthAPI(unittest.TestCase):
         logger.debug(f"Response status: {response.status_code}, Response JSON: {response.json()}")
 
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.json(), {"status": "success", "offers": [{"trip_id": "T123", "price": 500.0}]})
+        self.assertEqual(response.json(), {
+            "status": "success",
+            "offers": [{"offer_id": "O124", "description": "Weekend away", "price": 500.0, "discount": "15%"}],
+            "next_cursor": None
+        })
         mock_get_trip_offers_data.assert_called_once()
 
-    @patch('src.api.endpoints.trip_management.get_trip_offers_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.trip_management.get_trip_offers_data', autospec=True)
     def test_check_trip_offers_unauthorized(self, mock_get_trip_offers_data):
         logger.debug("Starting test_check_trip_offers_unauthorized")
         response = self.client.get(
@@ -649,10 +718,10 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
-    @patch('src.api.endpoints.trip_management.get_trip_plan_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.trip_management.get_trip_plan_data', autospec=True)
     def test_check_trip_plan_success(self, mock_get_trip_plan_data):
         logger.debug("Starting test_check_trip_plan_success with trip_id T123")
-        mock_get_trip_plan_data.return_value = {"flights": ["FL123", "FL124"], "hotels": ["H123"]}
+        mock_get_trip_plan_data.return_value = [TripComponentRow("Flight", "FL123", Decimal("250.00")), TripComponentRow("Hotel", None, Decimal("180.00"))]
         response = self.client.get(
             "/api/v1/trip-plan/T123",
             headers={"X-API-Key": self.secretvalue}
@@ -660,10 +729,16 @@ class TestAuthAPI(unittest.TestCase):
         logger.debug(f"Response status: {response.status_code}, Response JSON: {response.json()}")
 
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.json(), {"status": "success", "trip_plan": {"flights": ["FL123", "FL124"], "hotels": ["H123"]}})
+        self.assertEqual(response.json(), {
+            "status": "success",
+            "trip_plan": [
+                {"component_type": "Flight", "flight_number": "FL123", "price": 250.0},
+                {"component_type": "Hotel", "flight_number": None, "price": 180.0}
+            ]
+        })
         mock_get_trip_plan_data.assert_called_once()
 
-    @patch('src.api.endpoints.trip_management.get_trip_plan_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.trip_management.get_trip_plan_data', autospec=True)
     def test_check_trip_plan_unauthorized(self, mock_get_trip_plan_data):
         logger.debug("Starting test_check_trip_plan_unauthorized with trip_id T123")
         response = self.client.get(
@@ -675,10 +750,10 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
-    @patch('src.api.endpoints.trip_management.search_trips_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.trip_management.search_trips_data', autospec=True)
     def test_search_trip_success(self, mock_search_trips_data):
         logger.debug("Starting test_search_trip_success with SYD to MEL on 2025-06-08")
-        mock_search_trips_data.return_value = [{"trip_id": "T123", "price": 500.0}]
+        mock_search_trips_data.return_value = [TripRow("T123", Decimal("500.00"), datetime(2025, 6, 8, 9, 0))]
         response = self.client.get(
             "/api/v1/search-trip/SYD/MEL/2025-06-08",
             headers={"X-API-Key": self.secretvalue}
@@ -686,10 +761,14 @@ class TestAuthAPI(unittest.TestCase):
         logger.debug(f"Response status: {response.status_code}, Response JSON: {response.json()}")
 
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.json(), {"status": "success", "trips": [{"trip_id": "T123", "price": 500.0}]})
+        self.assertEqual(response.json(), {
+            "status": "success",
+            "trips": [{"trip_id": "T123", "total_price": 500.0, "departure_time": "2025-06-08T09:00:00"}],
+            "next_cursor": None
+        })
         mock_search_trips_data.assert_called_once()
 
-    @patch('src.api.endpoints.trip_management.search_trips_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.trip_management.search_trips_data', autospec=True)
     def test_search_trip_unauthorized(self, mock_search_trips_data):
         logger.debug("Starting test_search_trip_unauthorized with SYD to MEL on 2025-06-08")
         response = self.client.get(
@@ -701,7 +780,7 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
-    @patch('src.api.endpoints.trip_management.cancel_trip_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.trip_management.cancel_trip_data', autospec=True)
     def test_cancel_trip_success(self, mock_cancel_trip_data):
         logger.debug("Starting test_cancel_trip_success with trip_id T123")
         mock_cancel_trip_data.return_value = True
@@ -719,7 +798,7 @@ class TestAuthAPI(unittest.TestCase):
         })
         mock_cancel_trip_data.assert_called_once()
 
-    @patch('src.api.endpoints.trip_management.cancel_trip_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.trip_management.cancel_trip_data', autospec=True)
     def test_cancel_trip_unauthorized(self, mock_cancel_trip_data):
         logger.debug("Starting test_cancel_trip_unauthorized with trip_id T123")
         response = self.client.post(
@@ -731,10 +810,10 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
-    @patch('src.api.endpoints.trip_management.change_trip_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.trip_management.change_trip_data', autospec=True)
     def test_change_trip_success(self, mock_change_trip_data):
         logger.debug("Starting test_change_trip_success with trip_id T123")
-        mock_change_trip_data.return_value = ("Flight", "FL124", 300.0)
+        mock_change_trip_data.return_value = TripComponentRow("Flight", "FL124", Decimal("300.00"))
         response = self.client.post(
             "/api/v1/change-trip/T123?new_flight_number=FL124",
             headers={"X-API-Key": self.secretvalue}
@@ -749,7 +828,7 @@ class TestAuthAPI(unittest.TestCase):
         })
         mock_change_trip_data.assert_called_once()
 
-    @patch('src.api.endpoints.trip_management.change_trip_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.trip_management.change_trip_data', autospec=True)
     def test_change_trip_unauthorized(self, mock_change_trip_data):
         logger.debug("Starting test_change_trip_unauthorized with trip_id T123")
         response = self.client.post(
@@ -761,7 +840,7 @@ class TestAuthAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json(), {"detail": "Invalid or missing API Key"})
 
-    @patch('src.api.endpoints.trip_management.purchase_trip_insurance_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.trip_management.purchase_trip_insurance_data', autospec=True)
     def test_purchase_trip_insurance_success(self, mock_purchase_trip_insurance_data):
         logger.debug("Starting test_purchase_trip_insurance_success with trip_id T123")
         mock_purchase_trip_insurance_data.return_value = "INS124"
@@ -779,7 +858,7 @@ class TestAuthAPI(unittest.TestCase):
         })
         mock_purchase_trip_insurance_data.assert_called_once()
 
-    @patch('src.api.endpoints.trip_management.purchase_trip_insurance_data', new_callable=MagicMock)
+    @patch('src.api.endpoints.trip_management.purchase_trip_insurance_data', autospec=True)
     def test_purchase_trip_insurance_unauthorized(self, mock_purchase_trip_insurance_data):
         logger.debug("Starting test_purchase_trip_insurance_unauthorized with trip_id T123")
         response = self.client.post(
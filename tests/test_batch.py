@@ -0,0 +1,107 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+import httpx
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import JSONResponse
+
+from src.api import batch
+from src.api.batch import router as batch_router
+
+app = FastAPI()
+app.include_router(batch_router)
+running = {"now": 0, "most": 0}
+
+
+@app.get("/api/v1/flight-status/{flight_number}")
+async def flight_status(flight_number: str, x_api_key: str = Header(None)):
+    running["now"] += 1
+    running["most"] = max(running["most"], running["now"])
+    try:
+        await asyncio.sleep(0.01)
+    finally:
+        running["now"] -= 1
+    if flight_number == "FL404":
+        raise HTTPException(status_code=404, detail="Flight not found")
+    return JSONResponse({"status": "success", "flight_number": flight_number, "key": x_api_key},
+                        headers={"ETag": '"v1"'})
+
+
+@app.get("/api/v1/slow")
+async def slow():
+    await asyncio.sleep(10)
+
+
+@app.get("/api/v1/search/{departure}/stream")
+async def stream(departure: str):
+    return {"status": "success"}
+
+
+@app.get("/api/v1/broken")
+async def broken():
+    raise RuntimeError("boom")
+
+
+class TestBatch(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        running.update(now=0, most=0)
+
+    async def post(self, operations):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/v1/batch", json={"operations": operations}, headers={"X-API-Key": "k"})
+
+    async def test_results_come_back_in_order(self):
+        response = await self.post([{"path": "/api/v1/flight-status/FL1"}, {"path": "/api/v1/flight-status/FL2"}])
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual([result["body"]["flight_number"] for result in results], ["FL1", "FL2"])
+        self.assertEqual(results[0]["body"]["key"], "k")
+        self.assertEqual(results[0]["headers"], {"etag": '"v1"'})
+
+    async def test_failures_stay_with_their_operation(self):
+        response = await self.post([
+            {"path": "/api/v1/flight-status/FL404"},
+            {"path": "/api/v1/broken"},
+            {"path": "/api/v1/batch", "method": "POST"},
+            {"path": "/api/v1/flight-status/FL1"},
+        ])
+        results = response.json()["results"]
+        self.assertEqual([result["status_code"] for result in results], [404, 500, 400, 200])
+        self.assertEqual(results[1]["body"], {"status": "fail", "error": "boom"})
+
+    async def test_batch_and_stream_routes_are_refused_however_spelt(self):
+        response = await self.post([
+            {"path": "/api/v1/%62atch", "method": "POST"},
+            {"path": "/api/v1/./batch", "method": "POST"},
+            {"path": "/api/v1/batch?x=1", "method": "POST"},
+            {"path": "/api/v1/flight-status/../batch/", "method": "POST"},
+            {"path": "/api/v1/search/SYD/stream"},
+            {"path": "/api/v1/search/SYD/%73tream/"},
+        ])
+        self.assertEqual([result["status_code"] for result in response.json()["results"]], [400] * 6)
+
+    async def test_paths_are_sent_normalised(self):
+        response = await self.post([{"path": "/api/v1/flight-status/FL1/../FL2?x=1"}])
+        self.assertEqual(response.json()["results"][0]["body"]["flight_number"], "FL2")
+
+    async def test_concurrency_is_capped(self):
+        with patch.object(batch, "batch_concurrency", 3):
+            await self.post([{"path": f"/api/v1/flight-status/FL{i}"} for i in range(12)])
+        self.assertEqual(running["most"], 3)
+
+    async def test_deadline_cancels_what_is_left(self):
+        with patch.object(batch, "batch_deadline", 0.2):
+            response = await self.post([{"path": "/api/v1/slow"}, {"path": "/api/v1/flight-status/FL1"}])
+        results = response.json()["results"]
+        self.assertEqual([result["status_code"] for result in results], [504, 200])
+
+    async def test_too_many_operations_are_refused(self):
+        with patch.object(batch, "batch_max_operations", 2):
+            response = await self.post([{"path": "/api/v1/flight-status/FL1"}] * 3)
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
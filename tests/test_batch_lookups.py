@@ -0,0 +1,58 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from fastapi import HTTPException
+
+from config import *
+from src.api.endpoints import flight_management
+from src.api.endpoints.flight_management import batch_flight_status, batch_ids, load_flight_snapshots
+from src.db.cache import flight_snapshot_cache, not_found_cache
+from src.db.records import FlightSnapshotRow
+from tests.fakes import fake_connect
+
+
+def snapshot(flight_number):
+    return FlightSnapshotRow(flight_number, "SYD", "MEL", "2025-06-08T09:00:00", "2025-06-08T10:30:00", "A1",
+                             "On Time", 250, 10)
+
+
+class TestBatchLookups(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        flight_snapshot_cache.clear()
+        not_found_cache.clear()
+        self.addCleanup(flight_snapshot_cache.clear)
+        self.addCleanup(not_found_cache.clear)
+        patcher = patch.object(flight_management, "get_read_connection", fake_connect())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_ids_are_deduplicated_and_capped(self):
+        self.assertEqual(batch_ids(["FL2", "FL1", "FL2"]), ["FL2", "FL1"])
+        with self.assertRaises(HTTPException) as raised:
+            batch_ids([f"FL{i}" for i in range(batch_lookup_max + 1)])
+        self.assertEqual(raised.exception.status_code, 400)
+
+    async def test_misses_are_read_in_one_query(self):
+        flight_snapshot_cache.put("FL1", snapshot("FL1"), flight_snapshot_cache.generation)
+        lookup = AsyncMock(return_value={"FL3": snapshot("FL3")})
+        with patch.object(flight_management, "get_flight_snapshots_data", lookup):
+            snapshots = await load_flight_snapshots(["FL3", "FL1", "FL9"])
+        lookup.assert_awaited_once_with(None, ["FL3", "FL9"])
+        self.assertEqual(list(snapshots), ["FL3", "FL1", "FL9"])
+        self.assertEqual(snapshots["FL1"], snapshot("FL1"))
+        self.assertIsNone(snapshots["FL9"])
+        # Both outcomes are cached for the next batch
+        self.assertEqual(flight_snapshot_cache.get("FL3"), snapshot("FL3"))
+        self.assertTrue(not_found_cache.known_missing("flight", "FL9"))
+
+    async def test_missing_flights_are_marked_not_found(self):
+        lookup = AsyncMock(return_value={"FL1": snapshot("FL1")})
+        with patch.object(flight_management, "get_flight_snapshots_data", lookup):
+            response = await batch_flight_status(["FL1", "FL9"])
+        self.assertEqual(response["status"], "success")
+        self.assertEqual(response["flight_status"]["FL1"]["gate"], "A1")
+        self.assertEqual(response["flight_status"]["FL9"], {"status": "not_found"})
+
+
+if __name__ == "__main__":
+    unittest.main()
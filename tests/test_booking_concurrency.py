@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import os
+import time
+import unittest
+
+import psycopg
+from psycopg_pool import AsyncConnectionPool
+
+from config import *
+from src.db.connection import make_dsn
+from src.db.exceptions import DatabaseQueryError
+from src.db.models import book_flight_data
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "db_infra", "scripts")
+
+SEATS = 50
+BOOKINGS = 400
+CONNECTIONS = 32
+
+logger = logging.getLogger(__name__)
+
+
+@unittest.skipUnless(os.getenv("stress_tests"), "set stress_tests=1 with a local Postgres to run")
+class TestBookingConcurrency(unittest.IsolatedAsyncioTestCase):
+    """
+    Hundreds of concurrent bookings on one flight with few seats, each in its own
+    transaction, in a scratch schema that is dropped afterwards. Migrations are not
+    applied there, so no NOTIFY from these rows reaches running API workers.
+    """
+
+    def setUp(self):
+        self.dsn = make_dsn(os.getenv(const_fieldname_db_host, db_host), os.getenv(const_fieldname_db_port, db_port))
+        self.schema = f"stress_test_{os.getpid()}"
+        with psycopg.connect(self.dsn) as conn:
+            conn.execute(f"CREATE SCHEMA {self.schema}")
+            conn.execute(f"SET search_path TO {self.schema}")
+            with open(os.path.join(SCRIPTS_DIR, "create_airline_schema.sql"), "r") as file:
+                conn.execute(file.read())
+            conn.execute(
+                "INSERT INTO Passengers (passenger_id, name) "
+                "SELECT 'P' || lpad(i::text, 6, '0'), 'Passenger ' || i FROM generate_series(1, %s) i",
+                (BOOKINGS,))
+            conn.execute(
+                "INSERT INTO Flights (flight_number, departure, destination, departure_time, arrival_time, price, availability) "
+                "VALUES ('FL001', 'SYD', 'MEL', '2025-06-08 09:00', '2025-06-08 10:30', 250, %s)",
+                (SEATS,))
+
+    def tearDown(self):
+        with psycopg.connect(self.dsn) as conn:
+            conn.execute(f"DROP SCHEMA {self.schema} CASCADE")
+
+    async def test_no_overselling(self):
+        pool = AsyncConnectionPool(
+            conninfo=f"{self.dsn} options='-c search_path={self.schema}'",
+            min_size=CONNECTIONS, max_size=CONNECTIONS, open=False)
+        await pool.open(wait=True)
+        outcomes = {"booked": 0, "sold_out": 0, "error": 0}
+
+        async def book(i: int):
+            async with pool.connection() as conn:
+                async with conn.cursor() as cursor:
+                    try:
+                        booking_id = await book_flight_data(cursor, "FL001", f"P{i:06d}")
+                    except DatabaseQueryError:
+                        outcomes["error"] += 1
+                        return
+                outcomes["booked" if booking_id else "sold_out"] += 1
+
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*(book(i) for i in range(1, BOOKINGS + 1)))
+        finally:
+            elapsed = time.perf_counter() - start
+            async with pool.connection() as conn:
+                availability = (await (await conn.execute("SELECT availability FROM Flights")).fetchone())[0]
+                booked = (await (await conn.execute("SELECT count(*) FROM Bookings")).fetchone())[0]
+            await pool.close()
+
+        logger.debug("%d bookings over %d connections in %.2fs (%.0f/s): %s",
+                     BOOKINGS, CONNECTIONS, elapsed, BOOKINGS / elapsed, outcomes)
+        self.assertGreaterEqual(availability, 0)
+        self.assertEqual(booked, SEATS - availability)
+        self.assertEqual(outcomes["booked"], booked)
+        self.assertEqual(booked, SEATS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+import contextvars
+import unittest
+from unittest.mock import patch
+
+from src.db.cache import (
+    BookingOverviewCache, LRUCache, NegativeCache, OfferCache, booking_overview_cache, flight_snapshot_cache,
+    subscribe_caches
+)
+from src.db.routing import use_primary_for_reads
+from src.db.listener import NotificationListener
+
+
+class TestOfferCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = OfferCache(ttl=60)
+        self.cache.enable()
+
+    def test_serves_until_invalidated(self):
+        self.assertIsNone(self.cache.get("Flight"))
+        self.cache.put("Flight", [{"description": "10% off"}], self.cache.generation)
+        self.assertEqual(self.cache.get("Flight"), [{"description": "10% off"}])
+        self.cache.invalidate("UPDATE")
+        self.assertIsNone(self.cache.get("Flight"))
+
+    def test_load_racing_an_invalidation_is_not_stored(self):
+        generation = self.cache.generation
+        self.cache.invalidate("INSERT")
+        self.cache.put("Flight", [{"description": "stale"}], generation)
+        self.assertIsNone(self.cache.get("Flight"))
+
+    def test_disabled_while_listener_is_down(self):
+        self.cache.put("Trip", [], self.cache.generation)
+        self.cache.disable()
+        self.assertIsNone(self.cache.get("Trip"))
+        self.cache.put("Trip", [], self.cache.generation)
+        self.assertIsNone(self.cache.get("Trip"))
+
+    def test_entries_expire_without_a_notification(self):
+        with patch("src.db.cache.time.monotonic", return_value=100.0):
+            self.cache.put("Flight", [{"description": "10% off"}], self.cache.generation)
+        with patch("src.db.cache.time.monotonic", return_value=159.0):
+            self.assertEqual(self.cache.get("Flight"), [{"description": "10% off"}])
+        with patch("src.db.cache.time.monotonic", return_value=160.0):
+            self.assertIsNone(self.cache.get("Flight"))
+
+
+class TestLRUCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = LRUCache("test", max_size=2, ttl=5)
+
+    def test_evicts_least_recently_used(self):
+        self.cache.put("FL1", 1)
+        self.cache.put("FL2", 2)
+        self.assertEqual(self.cache.get("FL1"), 1)
+        self.cache.put("FL3", 3)
+        self.assertIsNone(self.cache.get("FL2"))
+        self.assertEqual(self.cache.get("FL1"), 1)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_entries_expire(self):
+        with patch("src.db.cache.time.monotonic", return_value=100.0):
+            self.cache.put("FL1", 1)
+        with patch("src.db.cache.time.monotonic", return_value=104.0):
+            self.assertEqual(self.cache.get("FL1"), 1)
+        with patch("src.db.cache.time.monotonic", return_value=105.0):
+            self.assertIsNone(self.cache.get("FL1"))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_invalidate_drops_key_and_racing_load(self):
+        self.cache.put("FL1", 1)
+        generation = self.cache.generation
+        self.cache.invalidate("FL1")
+        self.assertIsNone(self.cache.get("FL1"))
+        self.cache.put("FL1", "stale", generation)
+        self.assertIsNone(self.cache.get("FL1"))
+
+    def test_counts_hits_and_misses(self):
+        from src.utils.metrics import cache_requests
+        hits = cache_requests.values.get(("test", "hit"), 0)
+        misses = cache_requests.values.get(("test", "miss"), 0)
+        self.cache.get("FL1")
+        self.cache.put("FL1", 1)
+        self.cache.get("FL1")
+        self.assertEqual(cache_requests.values[("test", "hit")], hits + 1)
+        self.assertEqual(cache_requests.values[("test", "miss")], misses + 1)
+
+
+class TestNegativeCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = NegativeCache("test_not_found", max_size=10, ttl=5)
+
+    def test_remembers_missing_until_created(self):
+        self.assertFalse(self.cache.known_missing("trip", "T404"))
+        self.cache.record_missing("trip", "T404", self.cache.generation)
+        self.assertTrue(self.cache.known_missing("trip", "T404"))
+        self.assertFalse(self.cache.known_missing("boarding_pass", "T404"))
+        self.cache.created("trip", "T404")
+        self.assertFalse(self.cache.known_missing("trip", "T404"))
+
+    def test_miss_racing_a_creation_is_not_recorded(self):
+        generation = self.cache.generation
+        self.cache.created("boarding_pass", "B123")
+        self.cache.record_missing("boarding_pass", "B123", generation)
+        self.assertFalse(self.cache.known_missing("boarding_pass", "B123"))
+
+    def test_read_your_writes_skips_the_cache(self):
+        self.cache.record_missing("flight", "FL404", self.cache.generation)
+
+        def known_missing_on_primary():
+            use_primary_for_reads()
+            return self.cache.known_missing("flight", "FL404")
+
+        self.assertFalse(contextvars.copy_context().run(known_missing_on_primary))
+        self.assertTrue(self.cache.known_missing("flight", "FL404"))
+
+
+class TestBookingOverviewCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = BookingOverviewCache("test_booking_overview", max_size=10, ttl=5)
+
+    def test_flight_change_drops_only_that_flights_bookings(self):
+        self.cache.put("B001", {"flight": {"flight_number": "FL123"}})
+        self.cache.put("B002", {"flight": {"flight_number": "FL456"}})
+        generation = self.cache.generation
+        self.cache.invalidate_flight("FL123")
+        self.assertIsNone(self.cache.get("B001"))
+        self.assertIsNotNone(self.cache.get("B002"))
+        # A load that started before the change isn't stored
+        self.cache.put("B001", {"flight": {"flight_number": "FL123"}}, generation)
+        self.assertIsNone(self.cache.get("B001"))
+
+
+class TestListenerWiring(unittest.TestCase):
+    def test_notify_drops_cached_offers(self):
+        listener = NotificationListener("")
+        cache = OfferCache(ttl=60)
+        listener.subscribe("offers_changed", cache.invalidate)
+        listener.on_connect(cache.enable)
+        for callback in listener._on_connect:
+            callback()
+        cache.put("Flight", [], cache.generation)
+        listener.dispatch("offers_changed", "DELETE")
+        self.assertIsNone(cache.get("Flight"))
+
+    def test_flight_change_drops_the_snapshot(self):
+        listener = NotificationListener("")
+        subscribe_caches(listener)
+        flight_snapshot_cache.put("FL123", ("FL123",))
+        booking_overview_cache.put("B001", {"flight": {"flight_number": "FL123"}})
+        listener.dispatch("flights_changed", '{"op": "UPDATE", "flight_number": "FL123"}')
+        self.assertIsNone(flight_snapshot_cache.get("FL123"))
+        self.assertIsNone(booking_overview_cache.get("B001"))
+
+    def test_default_caches_are_subscribed(self):
+        listener = NotificationListener("")
+        subscribe_caches(listener)
+        self.assertIn("offers_changed", listener._channels)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import asyncio
+import unittest
+
+from src.db.coalesce import SingleFlight
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.flight = SingleFlight()
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def load(self):
+        self.calls += 1
+        await self.release.wait()
+        return ("SYD", "MEL", self.calls)
+
+    async def test_identical_calls_share_one_load(self):
+        key = ("get_flight_status_data", ("FL123",))
+        waiters = [asyncio.ensure_future(self.flight.do(key, self.load)) for _ in range(50)]
+        await asyncio.sleep(0)
+        self.release.set()
+        results = await asyncio.gather(*waiters)
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(result == ("SYD", "MEL", 1) for result in results))
+
+    async def test_different_arguments_load_separately(self):
+        self.release.set()
+        await asyncio.gather(
+            self.flight.do(("get_flight_status_data", ("FL1",)), self.load),
+            self.flight.do(("get_flight_status_data", ("FL2",)), self.load))
+        self.assertEqual(self.calls, 2)
+
+    async def test_nothing_is_kept_after_completion(self):
+        self.release.set()
+        key = ("get_flight_status_data", ("FL123",))
+        await self.flight.do(key, self.load)
+        self.assertEqual(len(self.flight), 0)
+        self.assertEqual(await self.flight.do(key, self.load), ("SYD", "MEL", 2))
+
+    async def test_errors_reach_every_waiter(self):
+        async def failing():
+            await self.release.wait()
+            raise RuntimeError("connection lost")
+
+        key = ("get_flight_status_data", ("FL123",))
+        waiters = [asyncio.ensure_future(self.flight.do(key, failing)) for _ in range(3)]
+        await asyncio.sleep(0)
+        self.release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        self.assertEqual(len(self.flight), 0)
+
+    async def test_cancelled_waiter_does_not_cancel_the_load(self):
+        key = ("get_flight_status_data", ("FL123",))
+        first = asyncio.ensure_future(self.flight.do(key, self.load))
+        second = asyncio.ensure_future(self.flight.do(key, self.load))
+        await asyncio.sleep(0)
+        first.cancel()
+        self.release.set()
+        self.assertEqual(await second, ("SYD", "MEL", 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
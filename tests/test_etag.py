@@ -0,0 +1,70 @@
+import unittest
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import Response
+
+from src.api.endpoints import trip_management
+from src.api.etag import etag_matches, make_etag, not_modified_response
+from src.db import coalesce
+from tests.fakes import fake_connect
+
+
+class TestEtagMatching(unittest.TestCase):
+    def test_strong_etag_is_quoted_version(self):
+        self.assertEqual(make_etag("1234.5678"), '"1234.5678"')
+
+    def test_matches_any_listed_etag(self):
+        etag = make_etag("1234.5678")
+        self.assertTrue(etag_matches('"1.2", "1234.5678"', etag))
+        self.assertTrue(etag_matches('W/"1234.5678"', etag))
+        self.assertTrue(etag_matches("*", etag))
+        self.assertFalse(etag_matches('"1234.5679"', etag))
+
+
+class TestNotModifiedResponse(unittest.IsolatedAsyncioTestCase):
+    def request(self, headers):
+        request = MagicMock()
+        request.headers = headers
+        return request
+
+    @patch("src.api.etag.coalesced_read", new_callable=AsyncMock)
+    async def test_unconditional_request_skips_version_query(self, mock_read):
+        self.assertIsNone(await not_modified_response(self.request({}), None, "B123"))
+        mock_read.assert_not_called()
+
+    @patch("src.api.etag.coalesced_read", new_callable=AsyncMock)
+    async def test_current_etag_gets_304(self, mock_read):
+        mock_read.return_value = "1234"
+        response = await not_modified_response(self.request({"if-none-match": '"1234"'}), None, "B123")
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["etag"], '"1234"')
+
+    @patch("src.api.etag.coalesced_read", new_callable=AsyncMock)
+    async def test_changed_or_missing_row_gets_full_response(self, mock_read):
+        mock_read.return_value = "1235"
+        self.assertIsNone(await not_modified_response(self.request({"if-none-match": '"1234"'}), None, "B123"))
+        mock_read.return_value = None
+        self.assertIsNone(await not_modified_response(self.request({"if-none-match": "*"}), None, "B123"))
+
+
+
+class TestTripDetailsHandler(unittest.IsolatedAsyncioTestCase):
+    @patch.object(coalesce, "connection_for", fake_connect())
+    async def test_full_response_carries_etag(self):
+        details = AsyncMock(return_value={"total_price": Decimal("500.00"), "status": "Confirmed",
+                                          "components": [], "version": "1234.5678"})
+        details.__name__ = "get_trip_details_data"
+        request = MagicMock()
+        request.headers = {}
+        response = Response()
+        with patch.object(trip_management, "get_trip_details_data", details):
+            result = await trip_management.check_trip_details("T123", request, response)
+        details.assert_awaited_once_with(None, "T123")
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["trip_details"]["total_price"], Decimal("500.00"))
+        self.assertEqual(response.headers["etag"], '"1234.5678"')
+
+
+if __name__ == "__main__":
+    unittest.main()
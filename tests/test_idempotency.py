@@ -0,0 +1,131 @@
+import asyncio
+import os
+import unittest
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import psycopg
+from fastapi import HTTPException
+from psycopg_pool import AsyncConnectionPool
+from starlette.requests import Request
+
+from config import *
+from src.api import idempotency
+from src.api.idempotency import remember_response, replay_response, request_fingerprint
+from src.db.connection import make_dsn
+from src.db.models import book_flight_data
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "db_infra", "scripts")
+
+
+def make_request(path="/api/v1/book-flight/", query=b"flight_number=FL123&passenger_id=P001", path_params=None):
+    return Request({
+        "type": "http", "method": "POST", "path": path, "query_string": query, "headers": [],
+        "path_params": path_params or {}, "route": SimpleNamespace(path=path),
+    })
+
+
+class TestIdempotency(unittest.IsolatedAsyncioTestCase):
+    def test_fingerprint_ignores_parameter_order(self):
+        self.assertEqual(request_fingerprint(make_request()),
+                         request_fingerprint(make_request(query=b"passenger_id=P001&flight_number=FL123")))
+        self.assertNotEqual(request_fingerprint(make_request()),
+                            request_fingerprint(make_request(query=b"flight_number=FL124&passenger_id=P001")))
+
+    async def test_requests_without_a_key_touch_nothing(self):
+        with patch.object(idempotency, "claim_idempotency_key", new_callable=AsyncMock) as claim:
+            self.assertIsNone(await replay_response(None, make_request(), None))
+            await remember_response(None, None, {"status": "success"})
+        claim.assert_not_awaited()
+
+    async def test_first_attempt_goes_ahead(self):
+        with patch.object(idempotency, "claim_idempotency_key", new=AsyncMock(return_value=True)):
+            self.assertIsNone(await replay_response(None, make_request(), "key-1"))
+
+    async def test_retry_replays_the_stored_response(self):
+        request = make_request()
+        stored = (request_fingerprint(request), 200, {"status": "success", "booking_id": "B000000RS0"})
+        with patch.object(idempotency, "claim_idempotency_key", new=AsyncMock(return_value=False)), \
+                patch.object(idempotency, "get_idempotent_response", new=AsyncMock(return_value=stored)):
+            response = await replay_response(None, request, "key-1")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.body, b'{"status":"success","booking_id":"B000000RS0"}')
+        self.assertEqual(response.headers["Idempotent-Replayed"], "true")
+
+    async def test_key_reused_for_another_request_is_refused(self):
+        stored = (request_fingerprint(make_request(query=b"flight_number=FL999")), 200, {})
+        with patch.object(idempotency, "claim_idempotency_key", new=AsyncMock(return_value=False)), \
+                patch.object(idempotency, "get_idempotent_response", new=AsyncMock(return_value=stored)):
+            with self.assertRaises(HTTPException) as raised:
+                await replay_response(None, make_request(), "key-1")
+        self.assertEqual(raised.exception.status_code, 422)
+
+    async def test_stored_responses_are_json(self):
+        with patch.object(idempotency, "save_idempotent_response", new_callable=AsyncMock) as save:
+            await remember_response(None, "key-1", {"total_price": Decimal("250.00"), "booking_date": date(2025, 6, 3)})
+        save.assert_awaited_once_with(None, "key-1", 200, {"total_price": 250.0, "booking_date": "2025-06-03"})
+
+
+@unittest.skipUnless(os.getenv("stress_tests"), "set stress_tests=1 with a local Postgres to run")
+class TestIdempotencyConcurrency(unittest.IsolatedAsyncioTestCase):
+    """
+    Parallel duplicates of one book-flight request, all with the same Idempotency-Key,
+    in a scratch schema that is dropped afterwards: the booking is made once and every
+    duplicate gets its response.
+    """
+
+    def setUp(self):
+        self.dsn = make_dsn(os.getenv(const_fieldname_db_host, db_host), os.getenv(const_fieldname_db_port, db_port))
+        self.schema = f"idempotency_test_{os.getpid()}"
+        with psycopg.connect(self.dsn) as conn:
+            conn.execute(f"CREATE SCHEMA {self.schema}")
+            conn.execute(f"SET search_path TO {self.schema}")
+            with open(os.path.join(SCRIPTS_DIR, "create_airline_schema.sql"), "r") as file:
+                conn.execute(file.read())
+            conn.execute("INSERT INTO Passengers (passenger_id, name) VALUES ('P001', 'Passenger')")
+            conn.execute(
+                "INSERT INTO Flights (flight_number, departure, destination, departure_time, arrival_time, price, availability) "
+                "VALUES ('FL123', 'SYD', 'MEL', '2025-06-08 09:00', '2025-06-08 10:30', 250, 10)")
+
+    def tearDown(self):
+        with psycopg.connect(self.dsn) as conn:
+            conn.execute(f"DROP SCHEMA {self.schema} CASCADE")
+
+    async def test_parallel_duplicates_book_once(self):
+        pool = AsyncConnectionPool(conninfo=f"{self.dsn} options='-c search_path={self.schema}'",
+                                   min_size=10, max_size=10, open=False)
+        await pool.open(wait=True)
+
+        async def book():
+            async with pool.connection() as conn:
+                async with conn.cursor() as cursor:
+                    replayed = await replay_response(cursor, make_request(), "agent-retry-1")
+                    if replayed is not None:
+                        return replayed.body
+                    booking_id = await book_flight_data(cursor, "FL123", "P001")
+                    await asyncio.sleep(0.05)  # keep the claim open while the duplicates arrive
+                    content = {"status": "success", "booking_id": booking_id}
+                    await remember_response(cursor, "agent-retry-1", content)
+                    await conn.commit()
+                    return content
+
+        try:
+            results = await asyncio.gather(*(book() for _ in range(20)))
+            async with pool.connection() as conn:
+                booked = (await (await conn.execute("SELECT count(*) FROM Bookings")).fetchone())[0]
+                availability = (await (await conn.execute("SELECT availability FROM Flights")).fetchone())[0]
+        finally:
+            await pool.close()
+
+        originals = [result for result in results if isinstance(result, dict)]
+        self.assertEqual(len(originals), 1)
+        self.assertEqual(booked, 1)
+        self.assertEqual(availability, 9)
+        replay = f'{{"status":"success","booking_id":"{originals[0]["booking_id"]}"}}'.encode()
+        self.assertEqual([result for result in results if not isinstance(result, dict)], [replay] * 19)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.db import models
+from src.db.ids import IdAllocator, base36
+from src.db.statements import STATEMENTS
+
+
+class TestIdAllocator(unittest.IsolatedAsyncioTestCase):
+    async def test_hands_out_a_block_per_round_trip(self):
+        fetch_block = AsyncMock(side_effect=[7, 8])
+        allocator = IdAllocator(block_size=3)
+        ids = [await allocator.next_id("INS", fetch_block) for _ in range(4)]
+        self.assertEqual(ids, ["INS000000L", "INS000000M", "INS000000N", "INS000000O"])
+        self.assertEqual(fetch_block.await_count, 2)
+
+    async def test_concurrent_callers_share_one_lease(self):
+        async def fetch_block():
+            await asyncio.sleep(0)
+            return 1
+
+        allocator = IdAllocator(block_size=100)
+        ids = await asyncio.gather(*(allocator.next_id("B", fetch_block) for _ in range(50)))
+        self.assertEqual(len(set(ids)), 50)
+        self.assertTrue(all(len(booking_id) == 10 for booking_id in ids))
+
+    def test_overflow_is_refused(self):
+        with self.assertRaises(ValueError):
+            base36(36 ** 7, 7)
+
+
+class TestModelIds(unittest.IsolatedAsyncioTestCase):
+    @patch.object(models, "id_allocator", IdAllocator(block_size=10))
+    async def test_trip_gets_an_allocated_id(self):
+        cursor = MagicMock()
+        cursor.execute = AsyncMock()
+        cursor.fetchone = AsyncMock(side_effect=[(2,), ("FL123",)])
+        trip_id = await models.book_trip_data(cursor, "P001")
+        self.assertEqual(trip_id, "T" + base36(20, 9))
+        sent = [call.args[0] for call in cursor.execute.await_args_list]
+        self.assertEqual(sent, [STATEMENTS["id_block"], STATEMENTS["random_flight"], STATEMENTS["insert_trip"],
+                                STATEMENTS["insert_trip_component"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+from fastapi.testclient import TestClient
+
+from src.api.main import app
+from src.utils.secretload import MemorySecretsProvider, get_provider, set_provider
+from config import const_api_key_secret_name
+from src.utils.metrics import Counter, Histogram, Registry, timed_query
+
+
+class TestMetricPrimitives(unittest.TestCase):
+    def test_histogram_renders_cumulative_buckets(self):
+        histogram = Histogram("latency_seconds", "Latency.", labels=("route",), buckets=(0.1, 1.0))
+        histogram.observe(("/a",), 0.05)
+        histogram.observe(("/a",), 0.5)
+        histogram.observe(("/a",), 3.0)
+        lines = []
+        histogram.render(lines)
+        self.assertIn('latency_seconds_bucket{route="/a",le="0.1"} 1', lines)
+        self.assertIn('latency_seconds_bucket{route="/a",le="1.0"} 2', lines)
+        self.assertIn('latency_seconds_bucket{route="/a",le="+Inf"} 3', lines)
+        self.assertIn('latency_seconds_count{route="/a"} 3', lines)
+
+    def test_counter_escapes_label_values(self):
+        registry = Registry()
+        counter = registry.register(Counter("hits_total", "Hits.", labels=("path",)))
+        counter.inc(('say "hi"',))
+        counter.inc(('say "hi"',))
+        self.assertIn('hits_total{path="say \\"hi\\""} 2', registry.render())
+
+
+class TestTimedQuery(unittest.IsolatedAsyncioTestCase):
+    async def test_records_latency_and_errors(self):
+        from src.utils.metrics import db_query_duration, db_query_errors
+
+        @timed_query
+        async def fails_data():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            await fails_data()
+        self.assertEqual(db_query_errors.values[("fails_data",)], 1)
+        self.assertIn(("fails_data",), db_query_duration.series)
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    def setUp(self):
+        saved_provider = get_provider()
+        set_provider(MemorySecretsProvider({const_api_key_secret_name: {"api_key": "test-api-key"}}))
+        self.addCleanup(set_provider, saved_provider)
+        self.client = TestClient(app)
+
+    def test_requests_are_recorded_by_route_template(self):
+        self.client.get("/health")
+        body = self.client.get("/metrics", headers={"X-API-Key": "test-api-key"}).text
+        self.assertIn('accip_http_requests_total{method="GET",route="/health",status="200"}', body)
+        self.assertIn('accip_http_request_duration_seconds_bucket{method="GET",route="/health",le="+Inf"}', body)
+
+    def test_requires_the_api_key(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 401)
+        self.assertEqual(self.client.get("/metrics", headers={"X-API-Key": "invalid-key"}).status_code, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
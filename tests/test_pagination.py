@@ -0,0 +1,44 @@
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from fastapi import HTTPException
+
+from src.api.pagination import (
+    FLIGHT_KEY, FLIGHT_KEY_TYPES, decode_cursor, encode_cursor, page_limit, paginate
+)
+from config import page_size_max
+from src.db.records import FlightRow
+
+FLIGHTS = [
+    FlightRow(f"FL{i}", "SYD", "MEL", datetime(2025, 6, 8, 9 + i), Decimal("250.00"), 10) for i in range(5)
+]
+
+
+class TestPagination(unittest.TestCase):
+    def test_cursor_round_trip(self):
+        cursor = encode_cursor(datetime(2025, 6, 8, 9, 30), "FL123")
+        self.assertNotIn("=", cursor)
+        self.assertEqual(decode_cursor(cursor, *FLIGHT_KEY_TYPES), (datetime(2025, 6, 8, 9, 30), "FL123"))
+        self.assertIsNone(decode_cursor(None, *FLIGHT_KEY_TYPES))
+
+    def test_bad_cursors_are_a_client_error(self):
+        for cursor in ("not base64!", encode_cursor("FL123"), encode_cursor("yesterday", "FL123"), "e30"):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(HTTPException) as raised:
+                    decode_cursor(cursor, *FLIGHT_KEY_TYPES)
+                self.assertEqual(raised.exception.status_code, 400)
+
+    def test_next_cursor_points_after_the_last_row(self):
+        page, next_cursor = paginate(FLIGHTS[:3], 2, *FLIGHT_KEY)
+        self.assertEqual(page, FLIGHTS[:2])
+        self.assertEqual(decode_cursor(next_cursor, *FLIGHT_KEY_TYPES), (FLIGHTS[1].departure_time, "FL1"))
+        self.assertEqual(paginate(FLIGHTS[:2], 2, *FLIGHT_KEY), (FLIGHTS[:2], None))
+
+    def test_page_size_is_capped(self):
+        self.assertEqual(page_limit(10), 10)
+        self.assertEqual(page_limit(page_size_max * 10), page_size_max)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+
+from src.db.pool_controller import PoolController, compute_ceiling
+
+
+class FakePool:
+    """Minimal stand-in for AsyncConnectionPool's sizing surface."""
+
+    def __init__(self, min_size, max_size):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = 1.0
+        self.resizes = []
+
+    async def resize(self, min_size, max_size=None):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.resizes.append((min_size, max_size))
+
+    def get_stats(self):
+        return {"pool_min": self.min_size, "pool_max": self.max_size}
+
+
+def sample(pool, waiting=0, size=0, available=0, queued=0, wait_ms=0):
+    return {
+        "pool_max": pool.max_size,
+        "pool_size": size,
+        "pool_available": available,
+        "requests_waiting": waiting,
+        "requests_queued": queued,
+        "requests_wait_ms": wait_ms,
+    }
+
+
+class TestComputeCeiling(unittest.TestCase):
+    def test_share_of_max_connections_across_peers(self):
+        # (100 - 10) // 4 workers = 22, capped by the configured 20
+        self.assertEqual(compute_ceiling(100, peers=4, reserved=10, configured_max=20, floor=2), 20)
+        # (100 - 10) // 9 = 10
+        self.assertEqual(compute_ceiling(100, peers=9, reserved=10, configured_max=20, floor=2), 10)
+
+    def test_never_below_floor(self):
+        self.assertEqual(compute_ceiling(20, peers=50, reserved=10, configured_max=20, floor=2), 2)
+
+    def test_unknown_server_limit_uses_configuration(self):
+        self.assertEqual(compute_ceiling(None, peers=4, reserved=10, configured_max=20, floor=2), 20)
+
+
+class TestPoolController(unittest.IsolatedAsyncioTestCase):
+    def make_controller(self):
+        pool = FakePool(2, 10)
+        controller = PoolController(pool, floor=2, configured_max=20, step=2, grow_after=2, shrink_after=3)
+        controller.ceiling = 16
+        return pool, controller
+
+    async def test_grows_under_sustained_wait_pressure(self):
+        pool, controller = self.make_controller()
+        self.assertIsNone(await controller.tune(sample(pool, waiting=3, size=10)))
+        self.assertEqual(await controller.tune(sample(pool, waiting=3, size=10)), 12)
+        self.assertEqual(pool.max_size, 12)
+        self.assertEqual(len(controller.history), 1)
+
+    async def test_single_spike_does_not_grow(self):
+        pool, controller = self.make_controller()
+        await controller.tune(sample(pool, waiting=3, size=10))
+        await controller.tune(sample(pool, size=10, available=8))
+        await controller.tune(sample(pool, waiting=3, size=10))
+        self.assertEqual(pool.resizes, [])
+
+    async def test_grows_on_slow_acquire_without_waiters(self):
+        pool, controller = self.make_controller()
+        await controller.tune(sample(pool, size=10, queued=10, wait_ms=2000))
+        self.assertEqual(await controller.tune(sample(pool, size=10, queued=20, wait_ms=4000)), 12)
+
+    async def test_stops_at_ceiling(self):
+        pool, controller = self.make_controller()
+        for _ in range(20):
+            await controller.tune(sample(pool, waiting=5, size=pool.max_size))
+        self.assertEqual(pool.max_size, 16)
+
+    async def test_shrinks_when_idle(self):
+        pool, controller = self.make_controller()
+        for _ in range(3):
+            await controller.tune(sample(pool, size=4, available=4))
+        self.assertEqual(pool.max_size, 8)
+        for _ in range(30):
+            await controller.tune(sample(pool, size=2, available=2))
+        self.assertEqual(pool.max_size, 2)
+
+    async def test_snapshot_reports_resizes(self):
+        pool, controller = self.make_controller()
+        for _ in range(2):
+            await controller.tune(sample(pool, waiting=1, size=10))
+        snapshot = controller.snapshot()
+        self.assertEqual(snapshot["max_size"], 12)
+        self.assertEqual(snapshot["resizes"][0]["from"], 10)
+        self.assertEqual(snapshot["resizes"][0]["to"], 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,180 @@
+import json
+import os
+import unittest
+
+import psycopg
+
+from config import *
+from src.db.connection import make_dsn
+from src.db.statements import STATEMENTS
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "db_infra", "scripts")
+MIGRATIONS_DIR = os.path.join(SCRIPTS_DIR, "migrations")
+
+# Enough rows per table that the planner prefers an index wherever one applies
+SEED = """
+INSERT INTO Passengers (passenger_id, name, email)
+    SELECT 'P' || lpad(i::text, 6, '0'), 'Passenger ' || i, 'p' || i || '@example.com'
+    FROM generate_series(1, 100000) i;
+INSERT INTO Flights (flight_number, departure, destination, departure_time, arrival_time, gate, price, availability)
+    SELECT 'FL' || lpad(i::text, 6, '0'),
+           (ARRAY['SYD','MEL','BNE','PER','ADL','CBR','HBA','DRW','OOL','CNS'])[1 + i % 10],
+           (ARRAY['SYD','MEL','BNE','PER','ADL','CBR','HBA','DRW','OOL','CNS'])[1 + (i / 10) % 10],
+           TIMESTAMP '2025-01-01' + i * INTERVAL '13 minutes',
+           TIMESTAMP '2025-01-01' + i * INTERVAL '13 minutes' + INTERVAL '2 hours',
+           'G' || i % 40, 100 + i % 400, i % 180
+    FROM generate_series(1, 50000) i;
+INSERT INTO Bookings (booking_id, passenger_id, flight_number, booking_date, total_price)
+    SELECT 'B' || lpad(i::text, 7, '0'), 'P' || lpad((1 + i % 100000)::text, 6, '0'),
+           'FL' || lpad((1 + i % 50000)::text, 6, '0'), DATE '2025-01-01' + i % 365, 100 + i % 400
+    FROM generate_series(1, 200000) i;
+INSERT INTO Boarding_Passes (boarding_pass_id, booking_id, gate, seat, boarding_time, pdf_url)
+    SELECT 'BP' || lpad(i::text, 6, '0'), 'B' || lpad(i::text, 7, '0'), 'G1', '5B', TIMESTAMP '2025-06-08 09:30', 'url'
+    FROM generate_series(1, 100000) i;
+INSERT INTO Trips (trip_id, passenger_id, total_price)
+    SELECT 'T' || lpad(i::text, 7, '0'), 'P' || lpad((1 + i % 100000)::text, 6, '0'), 500
+    FROM generate_series(1, 100000) i;
+INSERT INTO Trip_Components (trip_id, component_type, flight_number, price)
+    SELECT 'T' || lpad((1 + i % 100000)::text, 7, '0'), 'Flight', 'FL' || lpad((1 + i % 50000)::text, 6, '0'), 250
+    FROM generate_series(1, 200000) i;
+INSERT INTO Seats (booking_id, flight_number, seat_number, additional_fee)
+    SELECT 'B' || lpad(i::text, 7, '0'), 'FL' || lpad((1 + i % 50000)::text, 6, '0'), (1 + i % 30) || 'A', 20
+    FROM generate_series(1, 200000) i;
+INSERT INTO Insurance (insurance_id, booking_id, trip_id, coverage_type, coverage_amount, premium)
+    SELECT 'INS' || lpad(i::text, 6, '0'),
+           CASE WHEN i % 2 = 0 THEN 'B' || lpad(i::text, 7, '0') END,
+           CASE WHEN i % 2 = 1 THEN 'T' || lpad(i::text, 7, '0') END,
+           CASE WHEN i % 2 = 0 THEN 'Flight' ELSE 'Trip' END, 1000, 50
+    FROM generate_series(1, 100000) i;
+INSERT INTO Offers (offer_id, offer_type, flight_number, description, price, discount)
+    SELECT 'O' || lpad(i::text, 6, '0'), CASE WHEN i % 2 = 0 THEN 'Flight' ELSE 'Trip' END,
+           'FL' || lpad((1 + i % 50000)::text, 6, '0'), 'Offer ' || i, 99, '10%'
+    FROM generate_series(1, 20000) i;
+INSERT INTO Idempotency_Keys (idempotency_key, request, status_code, response, created_at)
+    SELECT 'key-' || i, 'POST /api/v1/book-flight/ []', 200, '{"status": "success"}',
+           TIMESTAMP '2025-01-01' + i * INTERVAL '1 minute'
+    FROM generate_series(1, 50000) i;
+"""
+
+BOOKING, FLIGHT, TRIP, PASSENGER = "B0000042", "FL000042", "T0000042", "P000042"
+
+# Sample parameters for every registered statement; a new statement needs an entry here
+PARAMS = {
+    "boarding_pass": (BOOKING,),
+    "boarding_pass_version": (BOOKING,),
+    "book_flight": {"booking_id": "B9999999", "passenger_id": PASSENGER, "flight_number": FLIGHT,
+                    "booking_date": "2025-06-03"},
+    "booked_seat": (BOOKING, "13A"),
+    "booking": (BOOKING,),
+    "booking_overview": (BOOKING,),
+    "booking_seat": (BOOKING,),
+    "cancel_booking": (BOOKING,),
+    "cancel_trip": (TRIP,),
+    "change_booking_flight": (FLIGHT, BOOKING),
+    "change_seat": ("14A", BOOKING),
+    "change_trip_flight": (FLIGHT, TRIP),
+    "check_in_booking": (BOOKING,),
+    "claim_idempotency_key": {"key": "key-42", "request": "POST /api/v1/book-flight/ []", "ttl": 86400.0},
+    "flight_offers": ("O000042", 51),
+    "flight_reservation": (BOOKING,),
+    "flight_reservations": ([BOOKING, "B0000043"],),
+    "flight_reservation_version": (BOOKING,),
+    "flight_snapshot": (FLIGHT,),
+    "flight_snapshots": ([FLIGHT, "FL000043"],),
+    "flight_status": (FLIGHT,),
+    "id_block": None,
+    "idempotent_response": ("key-42",),
+    "insert_boarding_pass": (BOOKING, "B5", "5B", "2025-06-08T09:30:00", "url"),
+    "insert_booking_insurance": ("INS999999", BOOKING, "Flight", 1000, 50),
+    "insert_seat": (BOOKING, FLIGHT, "5A", 20),
+    "insert_trip": ("T9999999", PASSENGER, 500),
+    "insert_trip_component": (TRIP, "Flight", FLIGHT, 250),
+    "insert_trip_insurance": ("INS999998", TRIP, "Trip", 1000, 50),
+    "purge_idempotency_keys": (86400.0, 1000),
+    "random_flight": None,
+    "refund_booking": (BOOKING,),
+    "route_index": None,
+    "save_idempotent_response": (200, '{"status": "success"}', "key-42"),
+    "search_flights": ("SYD", "MEL", "2025-12-01 00:00:00", "FL000042", 51),
+    "search_trips": ("SYD", "MEL", "2025-12-01 00:00:00", "2025-12-01 00:00:00", TRIP, 51),
+    "trip_components": (TRIP,),
+    "trip_offers": ("O000042", 51),
+    "trip_price": (TRIP,),
+    "trip_summary": (TRIP,),
+    "trip_version": (TRIP,),
+}
+
+# Statements that read whole tables by design, or are served from an in-process cache
+FULL_SCANS = {
+    "random_flight",  # ORDER BY RANDOM()
+    "route_index",  # loads the route index (src/db/route_index.py)
+}
+
+
+def sequential_scans(plan: dict):
+    """Relations read by a Seq Scan anywhere in an EXPLAIN (FORMAT JSON) plan tree."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", ()):
+        found.extend(sequential_scans(child))
+    return found
+
+
+class TestPlanWalk(unittest.TestCase):
+    def test_finds_nested_sequential_scans(self):
+        plan = {"Node Type": "Hash Join", "Plans": [
+            {"Node Type": "Index Scan", "Relation Name": "flights"},
+            {"Node Type": "Hash", "Plans": [{"Node Type": "Seq Scan", "Relation Name": "trip_components"}]},
+        ]}
+        self.assertEqual(sequential_scans(plan), ["trip_components"])
+
+    def test_every_statement_has_sample_parameters(self):
+        self.assertEqual(set(PARAMS), set(STATEMENTS))
+
+
+@unittest.skipUnless(os.getenv("plan_tests"), "set plan_tests=1 with a local Postgres to run")
+class TestQueryPlans(unittest.TestCase):
+    """
+    Builds the schema and migrations in a scratch schema, seeds it with a few hundred
+    thousand rows, and checks that no hot statement plans a sequential scan. Everything
+    happens in one transaction that is rolled back at the end.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.conn = psycopg.connect(make_dsn(os.getenv(const_fieldname_db_host, db_host),
+                                            os.getenv(const_fieldname_db_port, db_port)))
+        cursor = cls.conn.cursor()
+        cursor.execute(f"CREATE SCHEMA plan_test_{os.getpid()}")
+        cursor.execute(f"SET LOCAL search_path TO plan_test_{os.getpid()}")
+        with open(os.path.join(SCRIPTS_DIR, "create_airline_schema.sql"), "r") as file:
+            cursor.execute(file.read())
+        cursor.execute(SEED)
+        for name in sorted(os.listdir(MIGRATIONS_DIR)):
+            if name.endswith(".sql"):
+                with open(os.path.join(MIGRATIONS_DIR, name), "r") as file:
+                    cursor.execute(file.read())
+        cursor.execute("ANALYZE Passengers, Flights, Bookings, Boarding_Passes, Trips, Trip_Components, Seats, Insurance, Offers, Idempotency_Keys")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.conn.rollback()
+        cls.conn.close()
+
+    def explain(self, name: str) -> dict:
+        cursor = self.conn.cursor()
+        cursor.execute("EXPLAIN (FORMAT JSON) " + STATEMENTS[name], PARAMS[name])
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]["Plan"]
+
+    def test_hot_statements_use_indexes(self):
+        for name in sorted(set(STATEMENTS) - FULL_SCANS):
+            with self.subTest(statement=name):
+                self.assertEqual(sequential_scans(self.explain(name)), [], STATEMENTS[name])
+
+
+if __name__ == "__main__":
+    unittest.main()
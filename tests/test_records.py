@@ -0,0 +1,46 @@
+import unittest
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+from psycopg.rows import tuple_row
+
+from src.db.records import FlightRow, fetchall, record_row
+
+
+class FakeCursor:
+    """Just enough of a psycopg cursor to run row factories against loaded values."""
+
+    def __init__(self, columns, rows):
+        self.description = [SimpleNamespace(name=column) for column in columns]
+        self.rows = rows
+        self.row_factory = tuple_row
+
+    async def fetchall(self):
+        make_row = self.row_factory(self)
+        return [make_row(list(values)) for values in self.rows]
+
+
+ROW = ("FL1", "SYD", "MEL", datetime(2025, 6, 8, 9, 0), Decimal("250.00"), 10)
+
+
+class TestRecords(unittest.IsolatedAsyncioTestCase):
+    async def test_rows_become_records(self):
+        cursor = FakeCursor(FlightRow._fields, [ROW])
+        rows = await fetchall(cursor, FlightRow)
+        self.assertEqual(rows, [FlightRow(*ROW)])
+        self.assertIs(type(rows[0]), FlightRow)
+        self.assertEqual(rows[0].departure_time, datetime(2025, 6, 8, 9, 0))
+        # The cursor goes back to plain tuples for whatever it runs next
+        self.assertIs(cursor.row_factory, tuple_row)
+
+    def test_records_have_no_instance_dict(self):
+        self.assertFalse(hasattr(FlightRow(*ROW), "__dict__"))
+
+    def test_column_count_must_match(self):
+        with self.assertRaises(TypeError):
+            record_row(FlightRow)(FakeCursor(FlightRow._fields[:5], []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import json
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from src.db.records import FlightRow
+from src.db.route_index import RouteIndex
+
+ROWS = [
+    FlightRow("FL1", "SYD", "MEL", datetime(2025, 6, 8, 9, 0), Decimal("250.00"), 10),
+    FlightRow("FL2", "SYD", "MEL", datetime(2025, 6, 7, 9, 0), Decimal("240.00"), 5),
+    FlightRow("FL3", "SYD", "MEL", datetime(2025, 6, 9, 18, 30), Decimal("199.00"), 0),
+    FlightRow("FL4", "MEL", "SYD", datetime(2025, 6, 8, 12, 0), Decimal("260.00"), 3),
+]
+
+
+def payload(op, row=None, **fields):
+    if row is not None:
+        fields.update(flight_number=row[0], departure=row[1], destination=row[2],
+                      departure_time=row[3].isoformat(), price=float(row[4]), availability=row[5])
+    return json.dumps({"op": op, **fields})
+
+
+class TestRouteIndex(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.rows = list(ROWS)
+
+        async def loader():
+            return list(self.rows)
+
+        self.index = RouteIndex(loader)
+        await self.index.load()
+
+    def numbers(self, departure="SYD", destination="MEL", date="2025-06-08"):
+        return [flight.flight_number for flight in self.index.search(departure, destination, date)]
+
+    def test_date_range_search_is_sorted(self):
+        self.assertEqual(self.numbers(), ["FL1", "FL3"])
+        self.assertEqual(self.numbers(date="2025-06-01"), ["FL2", "FL1", "FL3"])
+        self.assertEqual(self.numbers(date="2025-06-10"), [])
+        self.assertEqual(self.numbers("SYD", "BNE"), [])
+
+    def test_pages_follow_departure_time_then_flight_number(self):
+        self.index.upsert(FlightRow("FL0", "SYD", "MEL", datetime(2025, 6, 8, 9, 0), Decimal("230.00"), 1))
+        first = self.index.search("SYD", "MEL", "2025-06-01", limit=2)
+        self.assertEqual([flight.flight_number for flight in first], ["FL2", "FL0"])
+        after = (first[-1].departure_time, first[-1].flight_number)
+        rest = self.index.search("SYD", "MEL", "2025-06-01", after=after, limit=2)
+        self.assertEqual([flight.flight_number for flight in rest], ["FL1", "FL3"])
+
+    def test_result_matches_search_flights_data(self):
+        self.assertEqual(self.index.search("MEL", "SYD", "2025-06-08"), [FlightRow(
+            flight_number="FL4", departure="MEL", destination="SYD",
+            departure_time=datetime(2025, 6, 8, 12, 0), price=Decimal("260.00"), availability=3,
+        )])
+
+    def test_unusable_search_goes_to_the_database(self):
+        self.assertIsNone(self.index.search("SYD", "MEL", "tomorrow"))
+        self.index.ready = False
+        self.assertIsNone(self.index.search("SYD", "MEL", "2025-06-08"))
+
+    def test_notifications_keep_the_index_current(self):
+        moved = ("FL1", "SYD", "MEL", datetime(2025, 6, 10, 7, 0), Decimal("250.00"), 9)
+        self.index.notify(payload("UPDATE", moved))
+        self.index.notify(payload("INSERT", ("FL5", "SYD", "MEL", datetime(2025, 6, 8, 6, 0), Decimal("99.50"), 1)))
+        self.index.notify(payload("DELETE", flight_number="FL3"))
+        self.assertEqual(self.numbers(), ["FL5", "FL1"])
+        self.assertEqual(self.index.search("SYD", "MEL", "2025-06-10")[0].availability, 9)
+        self.assertEqual(self.index.search("SYD", "MEL", "2025-06-08")[0].price, Decimal("99.50"))
+        self.index.notify(payload("TRUNCATE"))
+        self.assertEqual(len(self.index), 0)
+
+    async def test_changes_during_a_load_are_replayed(self):
+        async def loader():
+            self.index.notify(payload("DELETE", flight_number="FL1"))
+            return list(ROWS)
+
+        self.index.loader = loader
+        await self.index.load()
+        self.assertEqual(self.numbers(), ["FL3"])
+
+    async def test_verify_reports_and_repairs_drift(self):
+        self.rows[0] = ROWS[0]._replace(availability=7)
+        self.rows.append(FlightRow("FL6", "BNE", "SYD", datetime(2025, 6, 8, 8, 0), Decimal("150.00"), 2))
+        del self.rows[1]
+        report = await self.index.verify()
+        self.assertEqual(report, {"missing": ["FL6"], "extra": ["FL2"], "stale": ["FL1"]})
+        self.assertEqual(await self.index.verify(), {"missing": [], "extra": [], "stale": []})
+
+    def test_reports_memory(self):
+        self.assertGreater(self.index.memory_bytes(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
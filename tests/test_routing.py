@@ -0,0 +1,162 @@
+import asyncio
+import contextvars
+import os
+import unittest
+from unittest.mock import AsyncMock
+
+from psycopg import OperationalError
+from psycopg_pool import PoolTimeout
+
+from src.db import connection
+from src.db.models import book_flight_data, get_flight_status_data, search_flights_data
+from src.db.routing import ReplicaSet, is_read_only, reads_from_primary, use_primary_for_reads
+from config import *
+
+
+class FakeConn(str):
+    """Connection stand-in that remembers its autocommit state."""
+
+    closed = False
+    autocommit = False
+
+    async def set_autocommit(self, value):
+        self.autocommit = value
+
+
+class FakePool:
+    def __init__(self, name, fail=False, busy=False):
+        self.name = name
+        self.fail = fail
+        self.busy = busy
+        self.checked_out = 0
+        self.max_size = 10
+
+    async def getconn(self, timeout=None):
+        # As psycopg_pool does: a timeout, whether the server is down or every connection is in use
+        if self.fail or self.busy:
+            raise PoolTimeout(f"couldn't get a connection after {timeout} sec")
+        self.checked_out += 1
+        return FakeConn(f"conn-{self.name}")
+
+    async def putconn(self, conn):
+        self.checked_out -= 1
+
+    def get_stats(self):
+        return {"pool_size": 0 if self.fail else self.max_size}
+
+
+class TestModelRouting(unittest.TestCase):
+    def test_lookups_are_read_only(self):
+        self.assertTrue(is_read_only(get_flight_status_data))
+        self.assertTrue(is_read_only(get_flight_status_data, search_flights_data))
+
+    def test_mutations_go_to_primary(self):
+        self.assertFalse(is_read_only(book_flight_data))
+        self.assertFalse(is_read_only(get_flight_status_data, book_flight_data))
+
+    def test_read_your_writes_is_scoped_to_the_context(self):
+        def after_write():
+            use_primary_for_reads()
+            return reads_from_primary()
+
+        self.assertTrue(contextvars.copy_context().run(after_write))
+        self.assertFalse(reads_from_primary())
+
+
+class TestReplicaSet(unittest.IsolatedAsyncioTestCase):
+    async def test_round_robin(self):
+        replicas = ReplicaSet({"r1": FakePool("r1"), "r2": FakePool("r2")})
+        picked = [(await replicas.getconn())[1] for _ in range(4)]
+        self.assertEqual(picked, ["conn-r1", "conn-r2", "conn-r1", "conn-r2"])
+
+    async def test_failed_replica_is_skipped(self):
+        replicas = ReplicaSet({"r1": FakePool("r1", fail=True), "r2": FakePool("r2")}, retry_after=60)
+        self.assertEqual((await replicas.getconn())[1], "conn-r2")
+        self.assertFalse(replicas.is_up("r1"))
+        self.assertEqual((await replicas.getconn())[1], "conn-r2")
+
+    async def test_busy_replica_stays_in_rotation(self):
+        busy = FakePool("r1", busy=True)
+        replicas = ReplicaSet({"r1": busy, "r2": FakePool("r2")}, retry_after=60)
+        self.assertEqual((await replicas.getconn())[1], "conn-r2")
+        self.assertTrue(replicas.is_up("r1"))
+        busy.busy = False
+        picked = [(await replicas.getconn())[1] for _ in range(2)]
+        self.assertEqual(picked, ["conn-r2", "conn-r1"])
+
+    async def test_refused_connection_marks_replica_down(self):
+        broken = FakePool("r1")
+        broken.getconn = AsyncMock(side_effect=OperationalError("connection refused"))
+        replicas = ReplicaSet({"r1": broken, "r2": FakePool("r2")}, retry_after=60)
+        self.assertEqual((await replicas.getconn())[1], "conn-r2")
+        self.assertFalse(replicas.is_up("r1"))
+
+    async def test_all_down_returns_none(self):
+        replicas = ReplicaSet({"r1": FakePool("r1", fail=True)})
+        self.assertIsNone(await replicas.getconn())
+
+
+class TestReadConnection(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.saved = connection.db_pool, connection.replica_set
+        self.primary = FakePool("primary")
+        connection.db_pool = self.primary
+
+    def tearDown(self):
+        connection.db_pool, connection.replica_set = self.saved
+
+    async def test_reads_use_replica(self):
+        replica = FakePool("r1")
+        connection.replica_set = ReplicaSet({"r1": replica})
+        async with connection.connection_for(get_flight_status_data) as conn:
+            self.assertEqual(conn, "conn-r1")
+        self.assertEqual(replica.checked_out, 0)
+
+    async def test_reads_run_in_autocommit(self):
+        connection.replica_set = None
+        async with connection.connection_for(get_flight_status_data) as conn:
+            self.assertTrue(conn.autocommit)
+        self.assertFalse(conn.autocommit)
+
+    async def test_falls_back_to_primary_when_replicas_down(self):
+        connection.replica_set = ReplicaSet({"r1": FakePool("r1", fail=True)})
+        async with connection.connection_for(get_flight_status_data) as conn:
+            self.assertEqual(conn, "conn-primary")
+        self.assertEqual(self.primary.checked_out, 0)
+
+    async def test_reads_after_a_write_use_primary(self):
+        connection.replica_set = ReplicaSet({"r1": FakePool("r1")})
+
+        async def request():
+            async with connection.connection_for(book_flight_data) as conn:
+                self.assertEqual(conn, "conn-primary")
+            async with connection.connection_for(get_flight_status_data) as conn:
+                return conn
+
+        self.assertEqual(await asyncio.create_task(request()), "conn-primary")
+
+
+@unittest.skipUnless(db_replica_hosts, "set db_replica_hosts to a second local Postgres to run")
+class TestReplicaIntegration(unittest.IsolatedAsyncioTestCase):
+    """Run against two local Postgres instances, e.g. db_replica_hosts=localhost:5433."""
+
+    async def asyncSetUp(self):
+        await connection.open_db_pool()
+
+    async def asyncTearDown(self):
+        await connection.close_db_pool()
+
+    async def server_port(self, model_func):
+        async with connection.connection_for(model_func) as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute("SELECT current_setting('port')")
+                return (await cursor.fetchone())[0]
+
+    async def test_reads_and_writes_hit_different_servers(self):
+        primary_port = os.getenv(const_fieldname_db_port, db_port)
+        self.assertNotEqual(await self.server_port(get_flight_status_data), primary_port)
+        self.assertEqual(await self.server_port(book_flight_data), primary_port)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from datetime import date, datetime
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+from src.api.endpoints.boarding import router as boarding_router
+from src.api.endpoints.flight_management import router as flight_router
+from src.api.endpoints.trip_management import router as trip_router
+from src.api.responses import FastJSONResponse
+
+ROUTES = {route.path: route for router in (boarding_router, flight_router, trip_router) for route in router.routes}
+
+
+class TestResponseModels(unittest.IsolatedAsyncioTestCase):
+    """The typed, orjson-rendered responses must be byte for byte what jsonable_encoder and json produced."""
+
+    async def assertSameJSON(self, path, content):
+        route = ROUTES[path]
+        self.assertIs(route.response_class, FastJSONResponse)
+        body = route.response_class(await serialize_response(field=route.response_field, response_content=content)).body
+        self.assertEqual(body, JSONResponse(jsonable_encoder(content)).body)
+
+    async def test_prices_and_timestamps(self):
+        await self.assertSameJSON("/api/v1/search-flight/{departure}/{destination}/{date}", {
+            "status": "success",
+            "flights": [{"flight_number": "FL000042", "departure": "SYD", "destination": "MEL",
+                         "departure_time": datetime(2025, 6, 8, 9, 0, 0, 120000), "price": Decimal("250.00"),
+                         "availability": 3}],
+            "next_cursor": None,
+        })
+        await self.assertSameJSON("/api/v1/flight-reservation/{booking_id}", {
+            "status": "success",
+            "reservation": {"passenger_id": "P000042", "flight_number": "FL000042", "booking_date": date(2025, 6, 3),
+                            "status": "Confirmed", "total_price": Decimal("1250"), "departure": "SYD",
+                            "destination": "MEL"},
+        })
+
+    async def test_nulls_and_floats(self):
+        await self.assertSameJSON("/api/v1/boarding-pass/{booking_id}", {
+            "status": "success",
+            "boarding_pass": {"gate": None, "seat": "5B", "boarding_time": None, "pdf_url": None},
+        })
+        await self.assertSameJSON("/api/v1/choose-seat/{booking_id}", {
+            "status": "success",
+            "seat": {"booking_id": "B0000042", "flight_number": "FL000042", "seat_number": "5A", "additional_fee": 0.00},
+        })
+
+    async def test_batch_not_found_markers(self):
+        await self.assertSameJSON("/api/v1/batch/flight-prices/", {
+            "status": "success",
+            "prices": {"FL000042": {"price": Decimal("99.50"), "availability": 0}, "FL404": {"status": "not_found"}},
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from src.api.main import app
+from src.utils import secretload
+from src.utils.secretload import FileSecretsProvider, MemorySecretsProvider, get_provider, set_provider
+from config import *
+
+
+class TestSecretsProvider(unittest.IsolatedAsyncioTestCase):
+    async def test_cached_until_ttl(self):
+        provider = MemorySecretsProvider({"api_secrets": {"api_key": "one"}}, ttl=60)
+        self.assertEqual(await provider.value("api_secrets", "api_key"), "one")
+        provider.put("api_secrets", {"api_key": "two"})
+        self.assertEqual(await provider.value("api_secrets", "api_key"), "one")
+
+    async def test_stale_value_served_while_refreshing(self):
+        provider = MemorySecretsProvider({"api_secrets": {"api_key": "one"}}, ttl=0)
+        await provider.aget("api_secrets")
+        provider.put("api_secrets", {"api_key": "two"})
+        # the expired entry is returned immediately and refreshed in the background
+        self.assertEqual(await provider.value("api_secrets", "api_key"), "one")
+        await asyncio.sleep(0.05)
+        provider.ttl = 60
+        self.assertEqual(await provider.value("api_secrets", "api_key"), "two")
+
+    async def test_failed_refresh_keeps_cached_value(self):
+        provider = MemorySecretsProvider({"api_secrets": {"api_key": "one"}})
+        await provider.refresh("api_secrets")
+        with patch.object(provider, "fetch", side_effect=RuntimeError("throttled")):
+            self.assertEqual(await provider.refresh("api_secrets"), {"api_key": "one"})
+
+    async def test_file_backend(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump({"db_credentials": {"db_user": "reader"}}, f)
+        try:
+            provider = FileSecretsProvider(f.name)
+            self.assertEqual(await provider.value("db_credentials", "db_user"), "reader")
+        finally:
+            os.unlink(f.name)
+
+    def test_boto3_is_imported_lazily(self):
+        sys.modules.pop("boto3", None)
+        secretload.AwsSecretsProvider("us-east-1")
+        self.assertNotIn("boto3", sys.modules)
+
+    def test_backends_must_implement_fetch(self):
+        with self.assertRaises(TypeError):
+            secretload.SecretsProvider()
+
+
+class TestApiKeyRotation(unittest.TestCase):
+    def test_rotated_key_is_accepted_without_restart(self):
+        saved = get_provider()
+        provider = MemorySecretsProvider({const_api_key_secret_name: {"api_key": "old-key"}})
+        set_provider(provider)
+        try:
+            client = TestClient(app, raise_server_exceptions=False)
+            self.assertNotEqual(client.get("/api/v1/trip-offers/", headers={"X-API-Key": "old-key"}).status_code, 401)
+            provider.put(const_api_key_secret_name, {"api_key": "new-key"})
+            # what the lifespan's background refresh task does every secrets_ttl seconds
+            asyncio.run(provider.refresh(const_api_key_secret_name))
+            self.assertEqual(client.get("/api/v1/trip-offers/", headers={"X-API-Key": "old-key"}).status_code, 401)
+            self.assertNotEqual(client.get("/api/v1/trip-offers/", headers={"X-API-Key": "new-key"}).status_code, 401)
+        finally:
+            set_provider(saved)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import inspect
+import re
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from psycopg import AsyncServerCursor
+
+from src.db import models, statements
+from src.db.statements import STATEMENTS, configure_connection, execute
+
+
+class TestStatementRegistry(unittest.TestCase):
+    def test_every_registered_statement_is_used(self):
+        source = inspect.getsource(models)
+        used = set(re.findall(r'execute\(\s*cursor, "(\w+)"', source))
+        self.assertEqual(used, set(STATEMENTS))
+
+    def test_models_do_not_send_raw_sql(self):
+        self.assertNotIn("cursor.execute(", inspect.getsource(models))
+
+
+class TestExecute(unittest.IsolatedAsyncioTestCase):
+    async def test_prepares_when_enabled(self):
+        cursor = MagicMock()
+        cursor.execute = AsyncMock()
+        with patch.object(statements, "db_prepared_statements", True):
+            await execute(cursor, "flight_status", ("FL123",))
+        cursor.execute.assert_awaited_once_with(STATEMENTS["flight_status"], ("FL123",), prepare=True)
+
+    async def test_named_cursors_are_not_prepared(self):
+        cursor = MagicMock(spec=AsyncServerCursor)
+        cursor.execute = AsyncMock()
+        with patch.object(statements, "db_prepared_statements", True):
+            await execute(cursor, "search_flights", ("SYD", "MEL", "2025-06-08 00:00:00", "", None))
+        cursor.execute.assert_awaited_once_with(STATEMENTS["search_flights"], ("SYD", "MEL", "2025-06-08 00:00:00", "", None))
+
+    async def test_disabled_for_pgbouncer(self):
+        cursor = MagicMock()
+        cursor.execute = AsyncMock()
+        conn = MagicMock(prepare_threshold=5, prepared_max=100)
+        with patch.object(statements, "db_prepared_statements", False):
+            await execute(cursor, "flight_status", ("FL123",))
+            await configure_connection(conn)
+        cursor.execute.assert_awaited_once_with(STATEMENTS["flight_status"], ("FL123",), prepare=False)
+        self.assertIsNone(conn.prepare_threshold)
+
+
+class TestBoardingPassIds(unittest.IsolatedAsyncioTestCase):
+    async def test_check_in_takes_the_id_from_the_insert(self):
+        cursor = MagicMock(rowcount=1)
+        cursor.execute = AsyncMock()
+        cursor.fetchone = AsyncMock(return_value=("BP1000",))
+        result = await models.check_in_booking(cursor, "B123")
+        self.assertEqual(result["boarding_pass_id"], "BP1000")
+        sent = [call.args[0] for call in cursor.execute.await_args_list]
+        self.assertEqual(sent, [STATEMENTS["check_in_booking"], STATEMENTS["insert_boarding_pass"]])
+        self.assertEqual(STATEMENTS["insert_boarding_pass"].count("nextval('boarding_pass_id_seq')"), 1)
+
+    def test_ids_past_999_are_not_truncated(self):
+        value, width = re.search(r"lpad\((.+?)::text, (.+?), '0'\)", STATEMENTS["insert_boarding_pass"]).groups()
+
+        def boarding_pass_id(n):
+            # Postgres lpad: pad on the left up to the width, or cut the text down to it
+            size = eval(width.replace(f"length({value}::text)", str(len(str(n)))).replace("greatest", "max"))
+            return "BP" + str(n).rjust(size, "0")[:size]
+
+        self.assertEqual([boarding_pass_id(n) for n in (1, 999, 1000, 123456)],
+                         ["BP001", "BP999", "BP1000", "BP123456"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import json
+import unittest
+from unittest.mock import patch
+
+from starlette.requests import ClientDisconnect
+
+from src.api import streaming
+from src.api.streaming import ndjson_response
+from src.db.exceptions import DatabaseQueryError
+from tests.fakes import FakeConnection, fake_connect
+
+
+async def fake_stream(cursor, batches, fail_at, batch_size):
+    for i in range(batches):
+        if i == fail_at:
+            raise DatabaseQueryError("Failed to stream flights", Exception("connection lost"))
+        yield [{"batch": i, "row": row} for row in range(batch_size)]
+
+
+class TestNDJSONStreaming(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.conn = FakeConnection()
+        patcher = patch.object(streaming, "connection_for", fake_connect(self.conn))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        batch_size = patch.object(streaming, "stream_batch_size", 2)
+        batch_size.start()
+        self.addCleanup(batch_size.stop)
+
+    async def send_response(self, response, disconnect_after=None):
+        body = []
+
+        async def send(message):
+            if disconnect_after is not None and len(body) >= disconnect_after:
+                raise OSError("client went away")
+            if message["type"] == "http.response.body":
+                body.append(message["body"])
+
+        async def receive():
+            return {"type": "http.request"}
+
+        await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+        return b"".join(body)
+
+    async def test_streams_every_row_as_a_line(self):
+        response = await ndjson_response(fake_stream, 3, None)
+        self.assertEqual(response.media_type, "application/x-ndjson")
+        lines = (await self.send_response(response)).decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines],
+                         [{"batch": i, "row": row} for i in range(3) for row in range(2)])
+        self.assertTrue(self.conn.released)
+
+    async def test_disconnect_releases_the_connection(self):
+        response = await ndjson_response(fake_stream, 100, None)
+        self.assertFalse(self.conn.released)
+        with self.assertRaises(ClientDisconnect):
+            await self.send_response(response, disconnect_after=2)
+        self.assertTrue(self.conn.released)
+
+    async def test_failure_before_the_first_row_is_raised(self):
+        with self.assertRaises(DatabaseQueryError):
+            await ndjson_response(fake_stream, 3, 0)
+        self.assertTrue(self.conn.released)
+
+    async def test_failure_mid_stream_ends_with_an_error_line(self):
+        response = await ndjson_response(fake_stream, 3, 1)
+        lines = (await self.send_response(response)).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[-1])["status"], "fail")
+        self.assertTrue(self.conn.released)
+
+
+if __name__ == "__main__":
+    unittest.main()